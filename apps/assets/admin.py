@@ -1,5 +1,17 @@
 from django.contrib import admin
-from apps.assets.models import Asset
+from apps.assets.models import Asset, AssetEvent
+
+
+class AssetEventInline(admin.TabularInline):
+    model = AssetEvent
+    fields = ['ts', 'from_status', 'to_status', 'location']
+    readonly_fields = fields
+    ordering = ['-ts', '-id']
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Asset)
@@ -15,3 +27,4 @@ class AssetAdmin(admin.ModelAdmin):
     list_filter = ['status', 'product', 'current_location', 'created_at']
     search_fields = ['inventory_number', 'serial_number', 'product__name']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [AssetEventInline]
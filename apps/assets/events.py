@@ -0,0 +1,126 @@
+"""
+История статусов техники по журналу AssetEvent.
+
+Интервал статуса - от события до следующего события той же единицы:
+LEAD(ts) OVER (PARTITION BY asset_id ORDER BY ts, id). Суммы по статусам
+считаются одним запросом - Django оборачивает запрос с оконной функцией
+в подзапрос и агрегирует над ним (SUM ... FILTER по каждому статусу).
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import (
+    Count, DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Sum, Value, Window
+)
+from django.db.models.functions import Coalesce, Greatest, Lead, Least
+from django.utils import timezone
+
+from apps.assets.models import Asset, AssetEvent
+from apps.core.serializers import datetime_to_representation
+
+
+def _next_ts():
+    return Window(
+        Lead('ts'),
+        partition_by=[F('asset_id')],
+        order_by=[F('ts').asc(), F('id').asc()]
+    )
+
+
+class AssetEventService:
+
+    @staticmethod
+    def timeline(asset: Asset) -> List[Dict[str, Any]]:
+        """События единицы техники с длительностью каждого статуса (до следующего события)"""
+        now = timezone.now()
+        events = AssetEvent.objects.filter(asset=asset).annotate(
+            until=_next_ts()
+        ).order_by('ts', 'id').values(
+            'id', 'from_status', 'to_status', 'location_id', 'location__name', 'ts', 'until'
+        )
+
+        return [
+            {
+                'id': event['id'],
+                'from_status': event['from_status'],
+                'to_status': event['to_status'],
+                'location': event['location_id'],
+                'location_name': event['location__name'],
+                'ts': datetime_to_representation(event['ts']),
+                'until': datetime_to_representation(event['until']),
+                'duration': ((event['until'] or now) - event['ts']).total_seconds(),
+            }
+            for event in events
+        ]
+
+    @staticmethod
+    def time_in_status(assets=None, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Суммарное время в каждом статусе за период [start, end) по парку
+        (или по assets - queryset техники). Интервалы обрезаются границами
+        периода; открытый последний интервал длится до end (по умолчанию - сейчас).
+
+        Returns:
+            {status: {'seconds': float, 'intervals': int}, ...}
+        """
+        end = end or timezone.now()
+        events = AssetEvent.objects.filter(ts__lt=end)
+        if assets is not None:
+            events = events.filter(asset__in=assets.values('id'))
+
+        events = events.annotate(
+            start_at=Greatest('ts', Value(start)) if start else F('ts'),
+            end_at=Least(Coalesce(_next_ts(), Value(end)), Value(end)),
+        )
+        duration = ExpressionWrapper(F('end_at') - F('start_at'), output_field=DurationField())
+
+        aggregates = {}
+        for status in Asset.StatusChoices.values:
+            overlaps = Q(to_status=status, end_at__gt=F('start_at'))
+            aggregates[f'{status}_seconds'] = Sum(duration, filter=overlaps)
+            aggregates[f'{status}_intervals'] = Count('id', filter=overlaps)
+        totals = events.aggregate(**aggregates)
+
+        return {
+            status: {
+                'seconds': (totals[f'{status}_seconds'] or timedelta()).total_seconds(),
+                'intervals': totals[f'{status}_intervals'],
+            }
+            for status in Asset.StatusChoices.values
+        }
+
+    @staticmethod
+    def seed_initial_events(batch_size: int = 1000) -> int:
+        """
+        Начальное событие для техники, созданной до журнала: from_status=None,
+        текущие статус и место, ts=created_at. Техника с событиями пропускается,
+        поэтому повторный запуск безопасен. Обход keyset-пачками по id, на пачку -
+        один SELECT и один bulk_create в своей транзакции.
+
+        Returns:
+            количество записанных событий
+        """
+        seeded = 0
+        last_id = 0
+
+        while True:
+            assets = list(
+                Asset.objects.filter(id__gt=last_id)
+                .exclude(Exists(AssetEvent.objects.filter(asset_id=OuterRef('id'))))
+                .order_by('id')
+                .values_list('id', 'status', 'current_location_id', 'created_at')[:batch_size]
+            )
+            if not assets:
+                break
+            last_id = assets[-1][0]
+
+            with transaction.atomic():
+                AssetEvent.objects.bulk_create([
+                    AssetEvent.build(asset_id, None, status, location_id, ts=created_at)
+                    for asset_id, status, location_id, created_at in assets
+                ])
+            seeded += len(assets)
+
+        return seeded
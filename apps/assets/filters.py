@@ -0,0 +1,18 @@
+from django_filters import rest_framework as filters
+
+from apps.assets.models import Asset
+from apps.core.text import translit_key
+
+
+class AssetFilter(filters.FilterSet):
+    holder = filters.CharFilter(
+        method='filter_holder',
+        help_text='Текущий держатель в любом написании (Иванов И. = Ivanov I.)'
+    )
+
+    class Meta:
+        model = Asset
+        fields = ['product', 'status', 'current_location']
+
+    def filter_holder(self, queryset, name, value):
+        return queryset.filter(holder_key=translit_key(value))
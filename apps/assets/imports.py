@@ -0,0 +1,272 @@
+"""
+Массовый импорт техники из CSV или JSON.
+
+Файл читается потоково: CSV - построчно через csv.DictReader, JSON - по одному
+объекту через JSONDecoder.raw_decode (поддерживаются массив объектов и NDJSON),
+так что в памяти находится только текущая пачка строк.
+
+Каждая пачка проверяется на множествах, загруженных одним запросом на пачку:
+занятые inventory_number, продукты (по id или sku) с флагом is_consumable и
+локации. Корректные строки пишутся одним bulk_create. Сигналы и Asset.save()
+при bulk_create не вызываются, поэтому версия 'assets', поисковый индекс и
+журнал AssetEvent обновляются явно.
+"""
+import codecs
+import csv
+import io
+import json
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from apps.assets.models import Asset, AssetEvent
+from apps.core import versioning
+from apps.products.models import Product
+from apps.references.models import Location
+from apps.search import indexing
+
+logger = logging.getLogger(__name__)
+
+FILE_FORMATS = ('csv', 'json')
+MAX_CODE_LENGTH = 50
+
+
+def iter_csv_rows(stream) -> Iterator[Dict[str, Any]]:
+    """Строки CSV из бинарного потока (UTF-8, BOM допускается)"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Не закрываем загруженный файл вместе с оберткой
+        text.detach()
+
+
+def iter_json_rows(stream, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Объекты из JSON-массива или NDJSON без загрузки файла целиком.
+    Разделители между объектами (скобки массива, запятые, пробелы) пропускаются.
+    """
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    position = 0
+    eof = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            position += 1
+
+        if position < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Значение вплотную к концу буфера могло быть обрезано - дочитываем
+                if end < len(buffer) or eof:
+                    yield item
+                    position = end
+                    continue
+        elif eof:
+            return
+
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + reader.decode(chunk, final=eof)
+        position = 0
+
+
+def iter_rows(stream, file_format: str) -> Iterator[Any]:
+    if file_format == 'csv':
+        return iter_csv_rows(stream)
+    if file_format == 'json':
+        return iter_json_rows(stream)
+    raise ValueError(f'Неизвестный формат {file_format}')
+
+
+def _clean(value) -> str:
+    return '' if value is None else str(value).strip()
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    created: int = 0
+    error_count: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, line: int, error: str):
+        self.error_count += 1
+        if len(self.errors) < AssetImportService.MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': error})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'errors_truncated': self.error_count > len(self.errors),
+        }
+
+
+class AssetImportService:
+    DEFAULT_CHUNK_SIZE = 1000
+    MAX_REPORTED_ERRORS = 1000
+
+    @staticmethod
+    def import_rows(rows: Iterable[Any], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    atomic: bool = False) -> ImportResult:
+        """
+        Импорт строк вида {product | sku, inventory_number, serial_number,
+        current_location}. Номер строки в отчете - порядковый номер записи
+        в файле, начиная с 1.
+
+        atomic=True: весь файл - одна транзакция, при любой ошибке ничего
+        не создается.
+        atomic=False (best-effort): создаются все корректные строки; каждая
+        пачка фиксируется своей транзакцией, поэтому блокировки не держатся
+        до конца файла.
+        """
+        result = ImportResult()
+        seen = set()
+
+        with transaction.atomic() if atomic else nullcontext():
+            chunk = []
+            for line, row in enumerate(rows, start=1):
+                chunk.append((line, row))
+                if len(chunk) >= chunk_size:
+                    AssetImportService._import_chunk(chunk, seen, result)
+                    chunk = []
+            if chunk:
+                AssetImportService._import_chunk(chunk, seen, result)
+
+            if atomic and result.error_count:
+                transaction.set_rollback(True)
+                result.created = 0
+
+        logger.info(
+            f'Импорт техники: строк {result.total}, создано {result.created}, '
+            f'ошибок {result.error_count}'
+        )
+        return result
+
+    @staticmethod
+    def _import_chunk(chunk: List[Tuple[int, Any]], seen: set, result: ImportResult):
+        result.total += len(chunk)
+        parsed = []
+        errors = []
+
+        for line, row in chunk:
+            if not isinstance(row, dict):
+                errors.append((line, 'Строка должна быть объектом'))
+                continue
+
+            inventory_number = _clean(row.get('inventory_number')).upper()
+            serial_number = _clean(row.get('serial_number')) or None
+            product = _clean(row.get('product'))
+            sku = _clean(row.get('sku'))
+            location = _clean(row.get('current_location'))
+
+            if not inventory_number:
+                errors.append((line, 'Инвентарный номер обязателен'))
+            elif len(inventory_number) > MAX_CODE_LENGTH or len(serial_number or '') > MAX_CODE_LENGTH:
+                errors.append((line, f'Номер длиннее {MAX_CODE_LENGTH} символов'))
+            elif not product and not sku:
+                errors.append((line, 'Укажите product или sku'))
+            elif (product and not product.isdigit()) or (location and not location.isdigit()):
+                errors.append((line, 'product и current_location должны быть числовыми id'))
+            elif inventory_number in seen:
+                errors.append((line, f'Инвентарный номер {inventory_number} повторяется в файле'))
+            else:
+                seen.add(inventory_number)
+                parsed.append((
+                    line, inventory_number, serial_number,
+                    int(product) if product else sku,
+                    int(location) if location else None
+                ))
+
+        if parsed:
+            created, create_errors = AssetImportService._create_chunk(parsed)
+            result.created += created
+            errors.extend(create_errors)
+
+        for line, error in sorted(errors):
+            result.add_error(line, error)
+
+    @staticmethod
+    def _create_chunk(parsed: list) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Запись пачки в своей транзакции (savepoint в режиме atomic). Если номер
+        заняли параллельно после проверки, пачка перепроверяется еще раз;
+        повторный конфликт отмечается ошибкой в каждой строке пачки.
+        """
+        for attempt in range(2):
+            try:
+                with transaction.atomic():
+                    created, errors = AssetImportService._create(parsed)
+                    if created:
+                        versioning.bump('assets')
+                    return created, errors
+            except IntegrityError as e:
+                logger.warning(f'Импорт техники: конфликт при записи пачки (попытка {attempt + 1}): {e}')
+
+        return 0, [
+            (line, f'Не удалось записать строку: конфликт с параллельным изменением ({inventory_number})')
+            for line, inventory_number, *_ in parsed
+        ]
+
+    @staticmethod
+    def _create(parsed: list) -> Tuple[int, List[Tuple[int, str]]]:
+        product_ids = {key for _, _, _, key, _ in parsed if isinstance(key, int)}
+        skus = {key for _, _, _, key, _ in parsed if isinstance(key, str)}
+        products = {}
+        for product_id, sku, is_consumable in Product.objects.filter(
+            Q(id__in=product_ids) | Q(sku__in=skus)
+        ).values_list('id', 'sku', 'is_consumable'):
+            products[product_id] = products[sku] = (product_id, is_consumable)
+
+        location_ids = set(Location.objects.filter(
+            id__in={location for *_, location in parsed if location}
+        ).values_list('id', flat=True))
+        taken = set(Asset.objects.filter(
+            inventory_number__in=[inventory_number for _, inventory_number, *_ in parsed]
+        ).values_list('inventory_number', flat=True))
+
+        assets = []
+        errors = []
+        for line, inventory_number, serial_number, product_key, location in parsed:
+            product = products.get(product_key)
+            if product is None:
+                errors.append((line, f'Продукт {product_key} не найден'))
+            elif product[1]:
+                errors.append((line, 'Asset можно создать только для техники (is_consumable=False)'))
+            elif location and location not in location_ids:
+                errors.append((line, f'Локация {location} не найдена'))
+            elif inventory_number in taken:
+                errors.append((line, f'Инвентарный номер {inventory_number} уже существует'))
+            else:
+                assets.append(Asset(
+                    product_id=product[0],
+                    inventory_number=inventory_number,
+                    serial_number=serial_number,
+                    current_location_id=location
+                ))
+
+        Asset.objects.bulk_create(assets)
+        AssetEvent.objects.bulk_create([
+            AssetEvent.build(
+                asset.id, None, asset.status, asset.current_location_id, ts=asset.created_at
+            )
+            for asset in assets
+        ])
+        if assets:
+            indexing.index_assets(Asset.objects.filter(
+                inventory_number__in=[asset.inventory_number for asset in assets]
+            ))
+        return len(assets), errors
@@ -0,0 +1,99 @@
+"""
+Точный поиск техники по инвентарному или серийному номеру для сканеров склада.
+
+Код нормализуется так же, как AssetCreateUpdateSerializer.validate_inventory_number
+(upper/strip), и ищется через равенство по inventory_number (уникальный индекс),
+а для оставшихся кодов - по UPPER(TRIM(serial_number)) (индекс по выражению
+asset_serial_code_idx): серийный номер хранится как введен. Найденные
+соответствия код -> id кэшируются в Redis; при попадании в кэш запись все равно
+читается по первичному ключу и сверяется с кодом, поэтому смена номера или
+удаление техники не дают устаревшего ответа.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models.functions import Trim, Upper
+
+from apps.assets.models import Asset
+from apps.assets.serializers import AssetListValuesSerializer
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'asset_code:'
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def normalize_code(code) -> str:
+    return str(code).upper().strip()
+
+
+def _row_matches(row: dict, code: str) -> bool:
+    return row['inventory_number'] == code or row['serial_code'] == code
+
+
+class AssetLookupService:
+
+    @staticmethod
+    def lookup(codes: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Возвращает {нормализованный код: представление техники или None}
+        в порядке первого появления кода. Не более трех запросов к БД
+        на весь пакет: по id из кэша, по inventory_number, по serial_number.
+        """
+        normalized = list(dict.fromkeys(normalize_code(code) for code in codes))
+        normalized = [code for code in normalized if code]
+        rows: Dict[str, dict] = {}
+
+        cached_ids = {
+            key[len(CACHE_PREFIX):]: asset_id
+            for key, asset_id in cache.get_many([CACHE_PREFIX + code for code in normalized]).items()
+        }
+        if cached_ids:
+            by_id = {
+                row['id']: row
+                for row in AssetLookupService._fetch(id__in=set(cached_ids.values()))
+            }
+            for code, asset_id in cached_ids.items():
+                row = by_id.get(asset_id)
+                if row is not None and _row_matches(row, code):
+                    rows[code] = row
+
+        missing = [code for code in normalized if code not in rows]
+        found: Dict[str, dict] = {}
+        if missing:
+            for row in AssetLookupService._fetch(inventory_number__in=missing):
+                found[row['inventory_number']] = row
+
+        missing = [code for code in missing if code not in found]
+        if missing:
+            # serial_number не уникален: при совпадении берем самую раннюю запись
+            for row in AssetLookupService._fetch(serial_code__in=missing).order_by('id'):
+                found.setdefault(row['serial_code'], row)
+
+        if found:
+            cache.set_many(
+                {CACHE_PREFIX + code: row['id'] for code, row in found.items()},
+                CACHE_TIMEOUT
+            )
+            rows.update(found)
+
+        logger.debug(
+            f'Поиск техники по кодам: запрошено {len(normalized)}, '
+            f'из кэша {len(rows) - len(found)}, '
+            f'не найдено {len(normalized) - len(rows)}'
+        )
+
+        serializer = AssetListValuesSerializer()
+        return {
+            code: serializer.to_representation(rows[code]) if code in rows else None
+            for code in normalized
+        }
+
+    @staticmethod
+    def _fetch(**filters):
+        return Asset.objects.annotate(
+            serial_code=Upper(Trim('serial_number'))
+        ).filter(**filters).values(
+            *AssetListValuesSerializer.values, 'serial_code'
+        )
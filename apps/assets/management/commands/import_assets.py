@@ -0,0 +1,50 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.assets.imports import FILE_FORMATS, AssetImportService, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Массовый импорт техники из CSV или JSON/NDJSON-файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу')
+        parser.add_argument(
+            '--file-format',
+            choices=FILE_FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению'
+        )
+        parser.add_argument(
+            '--atomic',
+            action='store_true',
+            help='Ничего не создавать, если в файле есть ошибки'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=AssetImportService.DEFAULT_CHUNK_SIZE,
+            help='Количество строк в одной пачке проверки и bulk_create'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or ('csv' if path.lower().endswith('.csv') else 'json')
+
+        try:
+            with open(path, 'rb') as stream:
+                result = AssetImportService.import_rows(
+                    iter_rows(stream, file_format),
+                    chunk_size=options['chunk_size'],
+                    atomic=options['atomic']
+                )
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(f'Не удалось импортировать {path}: {e}')
+
+        for error in result.errors:
+            self.stdout.write(f'Строка {error["line"]}: {error["error"]}')
+
+        style = self.style.WARNING if result.error_count else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Строк {result.total}, создано {result.created}, ошибок {result.error_count}'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.assets.events import AssetEventService
+
+
+class Command(BaseCommand):
+    help = 'Начальные события журнала (AssetEvent) для техники, у которой их еще нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество единиц техники в одной пачке'
+        )
+
+    def handle(self, *args, **options):
+        seeded = AssetEventService.seed_initial_events(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Записано начальных событий: {seeded}'))
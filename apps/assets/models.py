@@ -1,7 +1,16 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Trim, Upper
+from django.utils import timezone
 from django.core.exceptions import ValidationError
+from apps.core.models import TrackedFieldsMixin, ValidatedModel
+from apps.core.text import translit_key
 
-class Asset(models.Model):
+class Asset(TrackedFieldsMixin, ValidatedModel):
+    HOLDER_FIELDS = ('current_issuance', 'current_holder', 'holder_key', 'issued_at')
+    HOLDER_ATTNAMES = ('current_issuance_id', 'current_holder', 'holder_key', 'issued_at')
+    # Статус - для журнала AssetEvent, коды и продукт - для поискового документа
+    tracked_fields = ('status', 'inventory_number', 'serial_number', 'product_id')
     
     class StatusChoices(models.TextChoices):
         IN_STOCK = 'in_stock', 'В наличии'
@@ -37,6 +46,35 @@ class Asset(models.Model):
         blank=True,
         null=True
     )
+
+    # Денормализованная открытая выдача - ведет IssuancesService в той же
+    # транзакции, что и саму выдачу/возврат (rebuild_asset_holders - пересборка)
+    current_issuance = models.ForeignKey(
+        'issues.Issuance',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    current_holder = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name='Текущий держатель'
+    )
+    # translit_key(current_holder), как Employee.search_key: поиск по держателю в
+    # любом написании - равенство по B-tree индексу
+    holder_key = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        db_index=True
+    )
+    issued_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата выдачи текущему держателю'
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -48,8 +86,17 @@ class Asset(models.Model):
         indexes = [
             models.Index(fields=['inventory_number']),
             models.Index(fields=['serial_number']),
+            # Поиск по коду сканера (apps.assets.lookup): серийный номер
+            # сравнивается без учета регистра и пробелов по краям
+            models.Index(Upper(Trim('serial_number')), name='asset_serial_code_idx'),
             models.Index(fields=['status'])
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(inventory_number__isnull=False) & ~Q(inventory_number=''),
+                name='asset_inventory_number_required'
+            ),
+        ]
         
     def clean(self):
         if self.product and self.product.is_consumable:
@@ -60,35 +107,132 @@ class Asset(models.Model):
         
         if not self.inventory_number or not self.inventory_number.strip():
             raise ValidationError('Инвентарный номер обязателен')         
-            
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
     
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        from_status = None if adding else self.loaded_value('status')
+        status_saved = update_fields is None or 'status' in update_fields
+
+        # Держатель есть только у выданной техники: любой уход из ISSUED
+        # (обслуживание из API, правка в админке, PATCH) очищает его поля
+        status = self.__dict__.get('status')
+        if status_saved and status not in (None, self.StatusChoices.ISSUED) and self.has_holder:
+            holder_fields = self.set_holder(None)
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = list(update_fields) + holder_fields
+
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if status is not None and status_saved and (adding or status != from_status):
+                AssetEvent.build(
+                    self.pk, from_status, status, self.current_location_id,
+                    ts=self.created_at if adding else None
+                ).save()
+
     @property
     def is_available(self):
         return self.status == self.StatusChoices.IN_STOCK
     
-    def mark_as_issued(self):
+    @property
+    def has_holder(self):
+        return any(self.__dict__.get(attname) is not None for attname in self.HOLDER_ATTNAMES)
+
+    def set_holder(self, issuance=None):
+        """Заполняет (или очищает) поля текущей выдачи, возвращает их имена для update_fields"""
+        self.current_issuance = issuance
+        self.current_holder = issuance.recipient if issuance else None
+        self.holder_key = translit_key(issuance.recipient) if issuance else None
+        self.issued_at = issuance.issue_date if issuance else None
+        return list(self.HOLDER_FIELDS)
+
+    def mark_as_issued(self, issuance=None):
         if not self.is_available:
             raise ValidationError(
                 f'Инвентарная единица: {self.inventory_number} недоступна для выдачи.'
                 f'Текущий статус: {self.get_status_display()}'
             )
         self.status = self.StatusChoices.ISSUED
-        self.save()
+        update_fields = ['status', 'updated_at']
+        if issuance is not None:
+            update_fields += self.set_holder(issuance)
+        self.save(update_fields=update_fields, validate=False)
         
-    def mark_as_returned(self):
+    def mark_as_returned(self, location=None):
         if self.status != self.StatusChoices.ISSUED:
             raise ValidationError(
                 f'Невозможно вернуть единицу со статусом: {self.get_status_display()}'
             )
         self.status = self.StatusChoices.IN_STOCK
-        self.save()
+        update_fields = ['status', 'updated_at'] + self.set_holder(None)
+        if location is not None:
+            self.current_location = location
+            update_fields.append('current_location')
+        self.save(update_fields=update_fields, validate=False)
     
     def mark_as_written(self):
         self.status = self.StatusChoices.WRITTEN_OFF
-        self.save()
+        self.save(update_fields=['status', 'updated_at'], validate=False)
         
     def __str__(self):
         return f'({self.product}) - {self.serial_number} - {self.status}: {self.current_location}'
+
+
+class AssetEvent(models.Model):
+    """
+    Журнал смен статуса техники - только добавление. Пишется в той же
+    транзакции, что и сама смена: Asset.save() для одиночных переходов,
+    bulk_create в пакетных сервисах (выдача, возврат, импорт).
+    Интервал статуса - от ts события до ts следующего события той же единицы.
+    """
+    asset = models.ForeignKey(
+        Asset,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='events'
+    )
+    from_status = models.CharField(
+        max_length=20,
+        choices=Asset.StatusChoices.choices,
+        blank=True,
+        null=True
+    )
+    to_status = models.CharField(
+        max_length=20,
+        choices=Asset.StatusChoices.choices
+    )
+    location = models.ForeignKey(
+        'references.Location',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        db_index=False,
+        related_name='+'
+    )
+    ts = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'asset_events'
+        verbose_name = 'Событие техники'
+        verbose_name_plural = 'События техники'
+        indexes = [
+            models.Index(fields=['asset', 'ts']),
+        ]
+
+    @classmethod
+    def build(cls, asset_id, from_status, to_status, location_id=None, ts=None):
+        return cls(
+            asset_id=asset_id,
+            from_status=from_status,
+            to_status=to_status,
+            location_id=location_id,
+            ts=ts or timezone.now()
+        )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Журнал событий техники нельзя изменять')
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f'{self.asset_id}: {self.from_status} → {self.to_status} ({self.ts:%d.%m.%Y %H:%M})'
@@ -1,4 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
+from apps.core.serializers import ValuesSerializer, choice_labels, datetime_to_representation
 from apps.products.serializers import ProductListSerializer
 from .models import Asset
 
@@ -17,6 +19,32 @@ class AssetListSerializer(serializers.ModelSerializer):
         ]
 
 
+class AssetListValuesSerializer(ValuesSerializer):
+    """Быстрый путь AssetListSerializer для списков"""
+    values = (
+        'id', 'product_id', 'product__name', 'inventory_number', 'status',
+        'current_location_id', 'current_location__name', 'created_at',
+    )
+    status_labels = choice_labels(Asset.StatusChoices.choices)
+
+    def to_representation(self, row):
+        representation = {
+            'id': row['id'],
+            'product': row['product_id'],
+            'product_name': row['product__name'],
+            'inventory_number': row['inventory_number'],
+            'status': row['status'],
+            'status_display': self.status_labels.get(row['status'], row['status']),
+            'current_location': row['current_location_id'],
+            'location_name': row['current_location__name'],
+            'created_at': datetime_to_representation(row['created_at']),
+        }
+        if row['current_location_id'] is None:
+            # DRF пропускает поле с source='current_location.name' при пустой локации
+            del representation['location_name']
+        return representation
+
+
 class AssetDetailSerializer(serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     
@@ -24,7 +52,8 @@ class AssetDetailSerializer(serializers.ModelSerializer):
         model = Asset
         fields = [
             'id', 'product', 'serial_number', 'inventory_number',
-            'status', 'current_location', 'created_at', 'updated_at'
+            'status', 'current_location', 'current_issuance', 'current_holder',
+            'issued_at', 'created_at', 'updated_at'
         ]
 
 
@@ -46,3 +75,43 @@ class AssetCreateUpdateSerializer(serializers.ModelSerializer):
     
     def validate_inventory_number(self, value):
         return value.upper().strip()
+
+
+class AssetLookupSerializer(serializers.Serializer):
+    codes = serializers.ListField(
+        child=serializers.CharField(max_length=50, trim_whitespace=False),
+        allow_empty=False,
+        max_length=settings.ASSET_LOOKUP_BATCH_LIMIT
+    )
+
+
+class AssetImportSerializer(serializers.Serializer):
+    MODE_ATOMIC = 'atomic'
+    MODE_BEST_EFFORT = 'best_effort'
+
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=['csv', 'json'], required=False)
+    mode = serializers.ChoiceField(
+        choices=[MODE_ATOMIC, MODE_BEST_EFFORT],
+        default=MODE_BEST_EFFORT
+    )
+
+    def validate(self, attrs):
+        if 'file_format' not in attrs:
+            extension = attrs['file'].name.rsplit('.', 1)[-1].lower()
+            if extension not in ('csv', 'json', 'ndjson', 'jsonl'):
+                raise serializers.ValidationError({
+                    'file_format': 'Не удалось определить формат по расширению, укажите csv или json'
+                })
+            attrs['file_format'] = 'csv' if extension == 'csv' else 'json'
+        return attrs
+
+
+class TimeInStatusQuerySerializer(serializers.Serializer):
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError('start должен быть раньше end')
+        return attrs
@@ -1,21 +1,35 @@
+import csv
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.assets.events import AssetEventService
+from apps.assets.filters import AssetFilter
 from apps.assets.models import Asset
+from apps.assets.imports import AssetImportService, iter_rows
+from apps.assets.lookup import AssetLookupService
+from apps.core.mixins import ConditionalGetMixin, ListActionMixin
 from apps.assets.serializers import (
     AssetListSerializer,
+    AssetListValuesSerializer,
     AssetDetailSerializer,
-    AssetCreateUpdateSerializer
+    AssetCreateUpdateSerializer,
+    AssetLookupSerializer,
+    AssetImportSerializer,
+    TimeInStatusQuerySerializer
 )
 
 
-class AssetViewSet(viewsets.ModelViewSet):
+class AssetViewSet(ConditionalGetMixin, ListActionMixin, viewsets.ModelViewSet):
     queryset = Asset.objects.select_related('product', 'current_location').all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['product', 'status', 'current_location']
+    filterset_class = AssetFilter
     search_fields = ['inventory_number', 'serial_number', 'product__name']
     ordering_fields = ['inventory_number', 'created_at']
+    values_serializer_class = AssetListValuesSerializer
+    version_resources = ('assets', 'products', 'categories', 'locations')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -27,16 +41,112 @@ class AssetViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def available(self, request):
         available_assets = self.queryset.filter(status=Asset.StatusChoices.IN_STOCK)
-        serializer = self.get_serializer(available_assets, many=True)
-        return Response(serializer.data)
+        return self.list_response(available_assets)
     
     @action(detail=False, methods=['get'])
     def issued(self, request):
         issued_assets = self.queryset.filter(status=Asset.StatusChoices.ISSUED)
-        serializer = self.get_serializer(issued_assets, many=True)
-        return Response(serializer.data)
+        return self.list_response(issued_assets)
     
+    @action(detail=False, methods=['get', 'post'])
+    def lookup(self, request):
+        """
+        Точный поиск по инвентарному/серийному номеру.
+        GET ?code= - одна единица или 404, POST {"codes": [...]} - пакет
+        до ASSET_LOOKUP_BATCH_LIMIT кодов за один запрос.
+        """
+        if request.method == 'GET':
+            code = request.query_params.get('code', '')
+            if not code.strip():
+                return Response(
+                    {'error': 'Параметр code обязателен'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            asset = next(iter(AssetLookupService.lookup([code]).values()))
+            if asset is None:
+                return Response(
+                    {'error': f'Техника с кодом {code.strip()} не найдена'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response(asset)
+
+        serializer = AssetLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = AssetLookupService.lookup(serializer.validated_data['codes'])
+        return Response({
+            'results': [{'code': code, 'asset': asset} for code, asset in results.items()],
+            'not_found': [code for code, asset in results.items() if asset is None],
+        })
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_assets(self, request):
+        """
+        Массовое создание техники из CSV/JSON-файла (поле file).
+        mode=atomic - все или ничего, mode=best_effort - создать корректные строки.
+        В ответе - отчет об ошибках по номеру строки.
+        """
+        serializer = AssetImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        upload = serializer.validated_data['file']
+        try:
+            result = AssetImportService.import_rows(
+                iter_rows(upload.file, serializer.validated_data['file_format']),
+                atomic=serializer.validated_data['mode'] == AssetImportSerializer.MODE_ATOMIC
+            )
+        except (ValueError, csv.Error) as e:
+            return Response({
+                'error': f'Не удалось разобрать файл: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if result.created:
+            return Response(result.as_dict(), status=status.HTTP_201_CREATED)
+
+        return Response(result.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """История статусов единицы техники и суммарное время в каждом статусе"""
+        asset = self.get_object()
+        return Response({
+            'asset': asset.id,
+            'inventory_number': asset.inventory_number,
+            'events': AssetEventService.timeline(asset),
+            'time_in_status': self._time_in_status_representation(
+                AssetEventService.time_in_status(Asset.objects.filter(pk=asset.pk))
+            ),
+        })
+
     @action(detail=False, methods=['get'])
+    def time_in_status(self, request):
+        """
+        Время в каждом статусе по парку за период ?start=&end= (ISO 8601).
+        Фильтры списка (product, status, current_location, holder) ограничивают технику.
+        """
+        serializer = TimeInStatusQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        assets = self.filter_queryset(self.get_queryset())
+        totals = AssetEventService.time_in_status(
+            assets,
+            start=serializer.validated_data.get('start'),
+            end=serializer.validated_data.get('end')
+        )
+        return Response({
+            'start': serializer.data.get('start'),
+            'end': serializer.data.get('end'),
+            'statuses': self._time_in_status_representation(totals),
+        })
+
+    @staticmethod
+    def _time_in_status_representation(totals):
+        labels = dict(Asset.StatusChoices.choices)
+        return [
+            {'status': status, 'status_display': labels[status], **values}
+            for status, values in totals.items()
+        ]
+
+    @action(detail=True, methods=['post'])
     def mark_maintenance(self, request, pk=None):
         asset = self.get_object()
         asset.status = Asset.StatusChoices.MAINTENANCE
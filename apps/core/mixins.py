@@ -0,0 +1,201 @@
+import hashlib
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import versioning
+from .reference_cache import response_cache
+from .renderers import ORJSONRenderer
+
+
+class ListActionMixin:
+    """
+    Общий путь для пользовательских списковых action (available, low_stock
+    и т.п.): фильтры представления и пагинация как у list().
+
+    Если задан values_serializer_class (ValuesSerializer), list() строится
+    из .values() без создания моделей; действия могут передать такой
+    сериализатор в list_response() явно.
+
+    С ?all=true весь набор отдается потоком JSON Lines (по объекту на строку):
+    строки читаются из .iterator() пачками по stream_chunk_size, ответ не
+    собирается в памяти целиком.
+    """
+    stream_query_param = 'all'
+    stream_chunk_size = 1000
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        return self.list_response(self.get_queryset(), self.values_serializer_class)
+
+    def list_response(self, queryset, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        queryset = self.filter_queryset(queryset)
+        if not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        if hasattr(serializer_class, 'prepare'):
+            queryset = serializer_class.prepare(queryset)
+
+        if self.request.query_params.get(self.stream_query_param, '').lower() in ('true', '1'):
+            return self.stream_response(queryset, serializer_class)
+
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        return Response(serializer_class(queryset, many=True, context=context).data)
+
+    def stream_response(self, queryset, serializer_class):
+        context = self.get_serializer_context()
+        renderer = ORJSONRenderer()
+        chunk_size = self.stream_chunk_size
+
+        def lines():
+            rows = queryset.iterator(chunk_size=chunk_size)
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    return
+                for item in serializer_class(chunk, many=True, context=context).data:
+                    yield renderer.render(item) + b'\n'
+
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET для list/retrieve по версиям ресурсов (apps.core.versioning).
+
+    ETag и Last-Modified вычисляются из версий version_resources - одно
+    обращение к кэшу. Если клиент прислал совпадающий If-None-Match (или
+    If-Modified-Since не раньше последнего изменения), отвечаем 304 до
+    выполнения запроса к данным и сериализации.
+    """
+    version_resources = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_not_modified_response(request) or super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_not_modified_response(request) or super().retrieve(request, *args, **kwargs)
+
+    def get_resource_versions(self):
+        if getattr(self, '_resource_versions', None) is None:
+            self._resource_versions = versioning.get_versions(self.version_resources)
+        return self._resource_versions
+
+    def get_not_modified_response(self, request):
+        versions = self.get_resource_versions()
+        digest = hashlib.md5(
+            f'{request.get_full_path()}|{sorted(versions.items())}'.encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        self.etag = f'"{digest}"'
+        self.last_modified = max(versions.values(), default=0) // 10 ** 9
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            not_modified = '*' in tags or self.etag in tags
+        else:
+            since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            not_modified = since is not None and self.last_modified <= since
+
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+            # Хранить можно, но перед использованием - перепроверять
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Кэш ответов list/retrieve для справочных данных в двухуровневом кэше
+    (apps.core.reference_cache). Ключ - абсолютный URL запроса и версии
+    version_resources, поэтому любое изменение ресурса делает старые
+    ответы недостижимыми. Ставится после ConditionalGetMixin.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        key = response_cache.make_key(
+            self.get_resource_versions(), request.build_absolute_uri()
+        )
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and not response.streaming:
+            response_cache.set(key, response.data)
+        return response
+
+
+class BulkActionMixin:
+    """
+    Общий путь пакетных action (stock/operations/bulk, issues/bulk_issue и т.п.).
+
+    Тело проверяет bulk_serializer_class (BulkModeSerializer), каждую строку -
+    сериализатор строки action; корректные строки передаются сервису одним
+    вызовом apply(lines, atomic=...). Сервис нумерует ошибки по переданному
+    ему списку - номера переводятся в номера строк исходного пакета.
+
+    mode=atomic: ошибка в любой строке - 400, ничего не применяется.
+    mode=best_effort: применяются корректные строки, 400 - если не применено ни одной.
+    """
+    bulk_serializer_class = None
+
+    def bulk_response(self, request, line_serializer_class, apply, items_key,
+                      success_status=status.HTTP_201_CREATED):
+        serializer = self.bulk_serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        atomic = serializer.atomic
+
+        valid_lines = []
+        line_numbers = []
+        errors = []
+
+        for index, line in enumerate(serializer.validated_data['lines']):
+            line_serializer = line_serializer_class(data=line)
+            if line_serializer.is_valid():
+                valid_lines.append(line_serializer.validated_data)
+                line_numbers.append(index)
+            else:
+                errors.append({'line': index, 'error': line_serializer.errors})
+
+        if errors and atomic:
+            return Response({
+                'applied': 0, items_key: [], 'errors': errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        result = apply(valid_lines, atomic=atomic) if valid_lines else {
+            'applied': 0, items_key: [], 'errors': []
+        }
+
+        for error in result['errors']:
+            error['line'] = line_numbers[error['line']]
+        result['errors'] = sorted(errors + result['errors'], key=lambda error: error['line'])
+
+        if result['applied']:
+            return Response(result, status=success_status)
+
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
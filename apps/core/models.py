@@ -1,3 +1,88 @@
 from django.db import models
+from django.db.models import DEFERRED
 
-# Create your models here.
+
+class ValidatedModel(models.Model):
+    """
+    Базовая модель с валидацией при сохранении.
+
+    save() по умолчанию вызывает full_clean() - это путь для админки и API.
+    Сервисный слой, который уже проверил данные, сохраняет через
+    save(validate=False) / create_trusted(): без лишних SELECT для unique-
+    проверок и ленивой загрузки FK. Инварианты на этом пути обеспечиваются
+    CheckConstraint/UniqueConstraint в БД.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, validate=True, **kwargs):
+        if validate:
+            self.full_clean()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def create_trusted(cls, **kwargs):
+        """Аналог objects.create() без full_clean() - только для сервисного слоя"""
+        obj = cls(**kwargs)
+        obj.save(force_insert=True, validate=False)
+        return obj
+
+
+class TrackedFieldsMixin:
+    """
+    Значения tracked_fields на момент загрузки из БД или последнего save().
+    Позволяет в save() и сигналах узнать, что изменилось, без лишнего SELECT.
+    Поле, отложенное через only()/defer() и не присвоенное, считается
+    неизменным.
+    """
+    tracked_fields: tuple = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_tracked(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_tracked(kwargs.get('update_fields'))
+
+    def _remember_tracked(self, fields=None):
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        for name in self._tracked_names(fields):
+            loaded[name] = self.__dict__.get(name, DEFERRED)
+
+    def _tracked_names(self, fields=None):
+        if fields is None:
+            return self.tracked_fields
+        fields = set(fields)
+        # update_fields/refresh_from_db принимают и 'product', и 'product_id'
+        return [
+            name for name in self.tracked_fields
+            if name in fields or name.removesuffix('_id') in fields
+        ]
+
+    def loaded_value(self, name):
+        """Значение поля на момент загрузки; None для еще не сохраненного объекта"""
+        value = self.__dict__.get('_loaded_values', {}).get(name)
+        return None if value is DEFERRED else value
+
+    def changed_fields(self, update_fields=None) -> set:
+        """
+        Отслеживаемые поля, изменившиеся с загрузки. Вызывать до завершения
+        save() - например, в post_save; update_fields ограничивает проверку
+        записанными полями.
+        """
+        loaded = self.__dict__.get('_loaded_values')
+        names = self._tracked_names(update_fields)
+        if loaded is None:
+            return set(names)
+        return {
+            name for name in names
+            if self.__dict__.get(name, DEFERRED) != loaded.get(name, DEFERRED)
+        }
@@ -0,0 +1,82 @@
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalCountPagination(pagination.PageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию. С ?count=false не выполняет
+    COUNT(*): читает page_size + 1 строк, чтобы узнать о следующей странице,
+    и возвращает count = null.
+    """
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.without_count = request.query_params.get(
+            self.count_query_param, ''
+        ).lower() in ('false', '0')
+        if not self.without_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param), message=''
+            ))
+
+        self.request = request
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.without_count:
+            return super().get_paginated_response(data)
+
+        return Response({
+            'count': None,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.without_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.without_count:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class LedgerCursorPagination(pagination.CursorPagination):
+    """
+    Keyset-пагинация журналов, которые только растут (операции, выдачи,
+    списания): страница ищется по индексу (дата, id), без COUNT(*) и OFFSET,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    Порядок задается атрибутом cursor_ordering представления.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'cursor_ordering', self.ordering)
@@ -0,0 +1,75 @@
+"""
+Двухуровневый кэш справочных данных: словарь в памяти процесса поверх
+общего кэша (Redis).
+
+Ключи включают версии ресурсов (apps.core.versioning.get_versions), поэтому явной
+инвалидации нет: после сохранения/удаления версия меняется, и старые
+записи просто перестают запрашиваться - в памяти процесса их вытесняет
+LRU, в Redis - таймаут.
+"""
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+from django.core.cache import cache
+
+
+MISSING = object()
+
+
+class TwoTierCache:
+
+    def __init__(self, prefix: str, max_local_items: int = 1000, timeout: int = 3600):
+        self.prefix = prefix
+        self.max_local_items = max_local_items
+        self.timeout = timeout
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, versions: Dict[str, int], *parts: Any) -> str:
+        """Ключ, действительный до следующего изменения любого из ресурсов versions"""
+        raw = f'{sorted(versions.items())}|' + '|'.join(str(part) for part in parts)
+        return self.prefix + hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            value = self._local.get(key, MISSING)
+            if value is not MISSING:
+                self._local.move_to_end(key)
+                return value
+
+        value = cache.get(key, MISSING)
+        if value is MISSING:
+            return default
+        self._set_local(key, value)
+        return value
+
+    def set(self, key: str, value):
+        self._set_local(key, value)
+        cache.set(key, value, self.timeout)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_items:
+                self._local.popitem(last=False)
+
+
+response_cache = TwoTierCache('reference_response:')
+object_cache = TwoTierCache('reference_object:', max_local_items=5000)
+
+
+def get_cached_object(key: str):
+    """
+    Объект из кэша или None. Возвращается копия: локальный экземпляр общий
+    для всех запросов процесса и не должен изменяться вызывающим кодом.
+    """
+    obj = object_cache.get(key)
+    return copy.copy(obj) if obj is not None else None
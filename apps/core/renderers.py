@@ -0,0 +1,40 @@
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость
+    orjson = None
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer на orjson с тем же выводом, что и у стандартного.
+
+    Типы, которые DRF кодирует по-своему (datetime/date/time, Decimal,
+    ленивые строки gettext_lazy, QuerySet и т.д.), передаются в
+    encoder_class().default, поэтому байты ответа совпадают. Без orjson,
+    с отступами (?indent / Accept: ...; indent=) или при UNICODE_JSON=False /
+    COMPACT_JSON=False используется стандартный рендерер.
+    """
+
+    if orjson is not None:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+
+        # Как в JSONRenderer: \u2028 и \u2029 экранируются для совместимости с JS
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,118 @@
+from typing import Iterable, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.encoding import force_str
+from rest_framework import serializers
+
+from . import versioning
+from .reference_cache import get_cached_object, object_cache
+
+
+def datetime_to_representation(value):
+    """
+    То же, что DateTimeField.to_representation DRF с настройками по умолчанию:
+    ISO 8601 в текущей временной зоне, UTC как 'Z'.
+    """
+    if value is None:
+        return None
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = value.astimezone(timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def choice_labels(choices) -> dict:
+    """Значение -> подпись, как get_FOO_display() (ленивые строки вычислены заранее)"""
+    return {value: force_str(label) for value, label in choices}
+
+
+class ValuesSerializer:
+    """
+    Быстрый сериализатор списков для чтения. Строки берутся из .values()
+    (prepare), связанные имена и подписи выбора приходят из JOIN и
+    словарей, без создания моделей и полей DRF на каждую строку.
+
+    Подкласс задает values - пути ORM для .values() - и to_representation(row),
+    который должен давать тот же JSON, что и соответствующий ModelSerializer.
+    """
+    values: Tuple[str, ...] = ()
+
+    def __init__(self, instance: Iterable[dict] = None, many: bool = True, context=None):
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def prepare(cls, queryset):
+        return queryset.values(*cls.values)
+
+    def to_representation(self, row: dict) -> dict:
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.instance]
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField для справочников: найденный объект кэшируется в
+    двухуровневом кэше под ключом (версия ресурса, SQL queryset, pk), поэтому
+    повторные запросы с тем же pk не обращаются к БД, а ограничения
+    queryset (например, is_consumable=True) продолжают действовать.
+    """
+
+    def __init__(self, resource: str, **kwargs):
+        self.resource = resource
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        if self.pk_field is not None or isinstance(data, bool):
+            return super().to_internal_value(data)
+
+        try:
+            pk = queryset.model._meta.pk.to_python(data)
+        except ValidationError:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        key = object_cache.make_key(
+            versioning.get_versions([self.resource]), queryset.model._meta.label, queryset.query, pk
+        )
+        obj = get_cached_object(key)
+        if obj is None:
+            obj = super().to_internal_value(pk)
+            object_cache.set(key, obj)
+        return obj
+
+
+class BulkModeSerializer(serializers.Serializer):
+    """
+    Тело пакетного запроса: mode и lines - список строк, каждую из которых
+    проверяет сериализатор строки конкретного action (см. BulkActionMixin).
+    Подкласс задает MAX_LINES.
+    """
+    MODE_ATOMIC = 'atomic'
+    MODE_BEST_EFFORT = 'best_effort'
+    MAX_LINES = 10000
+
+    mode = serializers.ChoiceField(
+        choices=[MODE_ATOMIC, MODE_BEST_EFFORT],
+        default=MODE_ATOMIC
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['lines'] = serializers.ListField(
+            child=serializers.DictField(),
+            allow_empty=False,
+            max_length=self.MAX_LINES
+        )
+        return fields
+
+    @property
+    def atomic(self) -> bool:
+        return self.validated_data['mode'] == self.MODE_ATOMIC
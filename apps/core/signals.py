@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.assets.models import Asset
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.stock.models import Stock
+from . import versioning
+
+
+# Модель -> ресурс, версия которого меняется при сохранении/удалении
+VERSIONED_MODELS = {
+    Stock: 'stock',
+    Asset: 'assets',
+    Product: 'products',
+    Category: 'categories',
+    Location: 'locations',
+}
+
+
+def bump_resource_version(sender, **kwargs):
+    versioning.bump(VERSIONED_MODELS[sender])
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_resource_version, sender=model, dispatch_uid=f'version_{model.__name__}')
+    post_delete.connect(bump_resource_version, sender=model, dispatch_uid=f'version_delete_{model.__name__}')
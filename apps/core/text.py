@@ -0,0 +1,23 @@
+import re
+
+from slugify import slugify
+
+
+SPACES_RE = re.compile(r'\s+')
+
+
+def normalize(text) -> str:
+    """Нижний регистр, ё→е, схлопнутые пробелы"""
+    if not text:
+        return ''
+    return SPACES_RE.sub(' ', str(text).lower().replace('ё', 'е')).strip()
+
+
+def translit_key(text) -> str:
+    """
+    Ключ для сравнения имен в разных написаниях: транслитерация в латиницу,
+    нижний регистр, без пунктуации - 'Иванов И.' и 'Ivanov I.' дают 'ivanov i'
+    """
+    if not text:
+        return ''
+    return slugify(str(text), separator=' ') or normalize(text)
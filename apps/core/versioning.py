@@ -0,0 +1,61 @@
+"""
+Версии ресурсов API для условных GET (ETag / Last-Modified).
+
+Версия ресурса - время последнего изменения в наносекундах, хранится в кэше
+(Redis). Ее меняют сигналы моделей и сервисный слой для массовых путей
+(QuerySet.update, bulk_update), которые сигналов не порождают. Смена версии
+откладывается до коммита транзакции: иначе клиент мог бы получить старые
+данные с новой версией и не увидеть изменений до следующей правки.
+"""
+import logging
+import time
+from functools import partial
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'resource_version:'
+
+
+def _key(resource: str) -> str:
+    return f'{KEY_PREFIX}{resource}'
+
+
+def get_versions(resources: Iterable[str]) -> Dict[str, int]:
+    """
+    Текущие версии ресурсов одним обращением к кэшу. Отсутствующие
+    (после очистки кэша) инициализируются текущим временем - так они не
+    совпадут ни с одной выданной ранее версией.
+    """
+    resources = list(resources)
+    keys = {_key(resource): resource for resource in resources}
+    versions = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+    missing = [resource for resource in resources if resource not in versions]
+    if missing:
+        now = time.time_ns()
+        for resource in missing:
+            cache.add(_key(resource), now, timeout=None)
+        versions.update(
+            (keys[key], value) for key, value in cache.get_many([_key(r) for r in missing]).items()
+        )
+    return versions
+
+
+def _set_versions(resources):
+    now = time.time_ns()
+    try:
+        cache.set_many({_key(resource): now for resource in resources}, timeout=None)
+    except Exception:
+        # Недоступный кэш не должен ломать запись; клиенты получат свежие
+        # данные после восстановления (версии будут переинициализированы)
+        logger.exception(f'Не удалось обновить версии ресурсов: {", ".join(resources)}')
+
+
+def bump(*resources: str):
+    """Отметить изменение ресурсов (после коммита текущей транзакции)"""
+    transaction.on_commit(partial(_set_versions, resources))
@@ -19,10 +19,11 @@ class IssuanceAdmin(admin.ModelAdmin):
         'inventory_item__product__name'
     ]
     readonly_fields = ['issue_date', 'created_at', 'updated_at']
+    raw_id_fields = ['employee']
 
     fieldsets = (
         ('Основная информация', {
-            'fields': ('inventory_item', 'recipient')
+            'fields': ('inventory_item', 'recipient', 'employee')
         }),
         ('Даты', {
             'fields': ('issue_date', 'return_date', 'created_at', 'updated_at')
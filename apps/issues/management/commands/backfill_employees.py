@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from apps.issues.models import Issuance
+from apps.references.services import EmployeeService
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполнение Issuance.employee по свободному тексту recipient: '
+        'написания одного имени сводятся к одному сотруднику'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество выдач в одной пачке'
+        )
+        parser.add_argument(
+            '--dedupe',
+            action='store_true',
+            help='Перед заполнением пересчитать ключи и слить сотрудников-дублей'
+        )
+
+    def handle(self, *args, **options):
+        if options['dedupe']:
+            merged = EmployeeService.dedupe()
+            self.stdout.write(f'Слито дублей сотрудников: {merged}')
+
+        batch_size = options['batch_size']
+        last_id = 0
+        linked = 0
+
+        while True:
+            # keyset по id: каждая пачка - отдельная короткая транзакция
+            batch = list(
+                Issuance.objects.filter(employee__isnull=True, id__gt=last_id)
+                .order_by('id').only('id', 'recipient')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            linked += EmployeeService.link_issuances(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Связано выдач с сотрудниками: {linked}'))
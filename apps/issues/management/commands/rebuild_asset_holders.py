@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.issues.services import IssuancesService
+
+
+class Command(BaseCommand):
+    help = 'Пересборка текущих держателей техники (Asset.current_holder) по открытым выдачам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество единиц техники в одной пачке'
+        )
+
+    def handle(self, *args, **options):
+        fixed = IssuancesService.rebuild_current_holders(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Исправлено единиц техники: {fixed}'))
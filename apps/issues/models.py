@@ -1,8 +1,10 @@
 from django.db import models
-from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from apps.core.models import ValidatedModel
 
 
-class Issuance(models.Model):
+class Issuance(ValidatedModel):
     inventory_item = models.ForeignKey(
         'assets.Asset',
         on_delete=models.PROTECT,
@@ -12,6 +14,16 @@ class Issuance(models.Model):
         max_length=255,
         verbose_name='Имя получателя'
     )
+    # Нормализованный получатель; recipient хранит имя в написании на момент выдачи.
+    # Отдельный индекс не нужен - его покрывает (employee, issue_date)
+    employee = models.ForeignKey(
+        'references.Employee',
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+        db_index=False,
+        related_name='issuances'
+    )
     issue_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата выдачи'
@@ -21,6 +33,16 @@ class Issuance(models.Model):
         null=True,
         verbose_name='Дата возврата'
     )
+    due_date = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Срок возврата'
+    )
+    reminded_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Последнее напоминание о просрочке'
+    )
     issue_comment = models.TextField(
         blank=True,
         verbose_name='Комментарий при выдаче'
@@ -39,7 +61,31 @@ class Issuance(models.Model):
         ordering = ['-issue_date']
         indexes = [
             models.Index(fields=['recipient']),
-            models.Index(fields=['issue_date']),
+            models.Index(fields=['employee', 'issue_date']),
+            models.Index(fields=['issue_date', 'id']),
+            # Открытые выдачи: просроченные (keyset по due_date, id)
+            # и выданные раньше N дней назад
+            models.Index(
+                fields=['due_date', 'id'],
+                condition=Q(return_date__isnull=True),
+                name='issuance_open_due_idx'
+            ),
+            models.Index(
+                fields=['issue_date'],
+                condition=Q(return_date__isnull=True),
+                name='issuance_open_issue_date_idx'
+            ),
+        ]
+        constraints = [
+            # Не больше одной открытой выдачи на единицу техники. Проверку
+            # выполняет БД (в том числе между параллельными запросами);
+            # full_clean() валидирует ограничение для админки и API.
+            models.UniqueConstraint(
+                fields=['inventory_item'],
+                condition=Q(return_date__isnull=True),
+                name='issuance_single_open_per_asset',
+                violation_error_message='Техника уже выдана: есть незакрытая выдача'
+            ),
         ]
     
     def __str__(self):
@@ -49,25 +95,11 @@ class Issuance(models.Model):
     @property 
     def is_returned(self):
         return self.return_date is not None
-    
-    def clean(self):
-        super().clean()
-
-        if self.pk is None:
-            active_issue = Issuance.objects.filter(
-                inventory_item=self.inventory_item,
-                return_date__isnull=True,
-            ).first()
 
-            if active_issue:
-                raise ValidationError({
-                    'inventory_item': (
-                        f'Техника {self.inventory_item.inventory_number} '
-                        f'уже выдана пользователю {active_issue.recipient}. '
-                        f'Дата выдачи: {active_issue.issue_date.strftime("%d.%m.%Y")}'
-                    )
-                })
-    
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+    @property
+    def is_overdue(self):
+        return (
+            self.return_date is None
+            and self.due_date is not None
+            and self.due_date < timezone.now()
+        )
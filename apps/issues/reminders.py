@@ -0,0 +1,210 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from apps.core.text import translit_key
+from .models import Issuance
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NOTIFIERS = ['apps.issues.reminders.LoggingNotifier']
+
+OVERDUE_FIELDS = (
+    'id', 'due_date', 'recipient', 'issue_date',
+    'inventory_item__inventory_number', 'inventory_item__product__name',
+)
+
+
+@dataclass(frozen=True)
+class OverdueItem:
+    issuance_id: int
+    inventory_number: str
+    product_name: str
+    issue_date: datetime
+    due_date: datetime
+
+
+@dataclass(frozen=True)
+class OverdueDigest:
+    """Одно напоминание получателю со всей его просроченной техникой"""
+    recipient: str
+    items: Tuple[OverdueItem, ...]
+
+
+class LoggingNotifier:
+    """Напоминания о просрочке в лог - одна запись на получателя"""
+
+    def notify(self, digests: List[OverdueDigest]):
+        for digest in digests:
+            logger.warning(
+                f'OVERDUE EQUIPMENT: {digest.recipient}: ' + '; '.join(
+                    f'{item.inventory_number} ({item.product_name}), '
+                    f'срок возврата {item.due_date:%d.%m.%Y}'
+                    for item in digest.items
+                )
+            )
+
+
+def get_notifiers():
+    return [
+        import_string(path)()
+        for path in getattr(settings, 'ISSUANCE_OVERDUE_NOTIFIERS', DEFAULT_NOTIFIERS)
+    ]
+
+
+class OverdueReminderService:
+    """
+    Напоминания о просроченной технике.
+
+    Просроченные открытые выдачи читаются страницами по ключу (due_date, id),
+    который совпадает с частичным индексом issuance_open_due_idx, поэтому
+    стоимость не зависит от числа закрытых выдач в истории. Выдачи, созданные
+    до появления due_date (due_date IS NULL), считаются просроченными через
+    ISSUANCE_DEFAULT_TERM_DAYS после issue_date и читаются по индексу
+    issuance_open_issue_date_idx. Повторное напоминание по выдаче
+    отправляется не раньше, чем через ISSUANCE_REMINDER_INTERVAL_DAYS:
+    повторный запуск задачи не дублирует сообщения.
+    """
+
+    PAGE_SIZE = 1000
+    DIGEST_BATCH_SIZE = 100
+
+    @staticmethod
+    def _not_reminded_since(now: datetime) -> Q:
+        interval = timedelta(days=getattr(settings, 'ISSUANCE_REMINDER_INTERVAL_DAYS', 7))
+        return Q(reminded_at__isnull=True) | Q(reminded_at__lte=now - interval)
+
+    @staticmethod
+    def get_default_term() -> Optional[timedelta]:
+        days = getattr(settings, 'ISSUANCE_DEFAULT_TERM_DAYS', None)
+        return timedelta(days=days) if days else None
+
+    @staticmethod
+    def get_overdue_queryset(now: datetime):
+        return Issuance.objects.filter(
+            OverdueReminderService._not_reminded_since(now),
+            return_date__isnull=True,
+            due_date__lt=now,
+        )
+
+    @staticmethod
+    def get_overdue_without_due_date_queryset(now: datetime):
+        """Открытые выдачи без due_date, выданные раньше, чем срок по умолчанию назад"""
+        term = OverdueReminderService.get_default_term()
+        if term is None:
+            return Issuance.objects.none()
+        return Issuance.objects.filter(
+            OverdueReminderService._not_reminded_since(now),
+            return_date__isnull=True,
+            due_date__isnull=True,
+            issue_date__lt=now - term,
+        )
+
+    @staticmethod
+    def iter_overdue(now: datetime, page_size: int = PAGE_SIZE) -> Iterator[tuple]:
+        yield from OverdueReminderService._iter_pages(
+            OverdueReminderService.get_overdue_queryset(now), 'due_date', page_size
+        )
+        yield from OverdueReminderService._iter_pages(
+            OverdueReminderService.get_overdue_without_due_date_queryset(now),
+            'issue_date', page_size
+        )
+
+    @staticmethod
+    def _iter_pages(queryset, field: str, page_size: int) -> Iterator[tuple]:
+        """Строки OVERDUE_FIELDS страницами по ключу (field, id)"""
+        queryset = queryset.order_by(field, 'id')
+        position = OVERDUE_FIELDS.index(field)
+        last: Optional[tuple] = None
+
+        while True:
+            page = queryset
+            if last is not None:
+                issuance_id, value = last
+                page = page.filter(
+                    Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': issuance_id})
+                )
+            rows = list(page.values_list(*OVERDUE_FIELDS)[:page_size])
+            yield from rows
+
+            if len(rows) < page_size:
+                return
+            last = (rows[-1][0], rows[-1][position])
+
+    @staticmethod
+    def collect_digests(now: datetime, page_size: int = PAGE_SIZE) -> List[OverdueDigest]:
+        """
+        Одно напоминание на получателя. Написания одного имени ('Иванов И.И.',
+        'иванов  и.и.', 'Ivanov I.I.') объединяются по translit_key; в
+        напоминании - первое встреченное написание.
+        """
+        term = OverdueReminderService.get_default_term()
+        names: Dict[str, str] = {}
+        items: Dict[str, List[OverdueItem]] = defaultdict(list)
+        for issuance_id, due_date, recipient, issue_date, inventory_number, product_name in (
+            OverdueReminderService.iter_overdue(now, page_size)
+        ):
+            key = translit_key(recipient) or recipient
+            names.setdefault(key, recipient)
+            items[key].append(OverdueItem(
+                issuance_id=issuance_id,
+                inventory_number=inventory_number,
+                product_name=product_name,
+                issue_date=issue_date,
+                due_date=due_date or issue_date + term
+            ))
+
+        return [
+            OverdueDigest(recipient=names[key], items=tuple(key_items))
+            for key, key_items in sorted(items.items())
+        ]
+
+    @staticmethod
+    def send_reminders(now: Optional[datetime] = None, page_size: int = PAGE_SIZE) -> dict:
+        """
+        Рассылает по одному напоминанию на получателя. Каждый уведомитель
+        вызывается отдельно: ошибка одного логируется и не мешает остальным.
+        Пачка отмечается reminded_at, если ее доставил хотя бы один уведомитель
+        (иначе успешные каналы получили бы ее повторно при следующем запуске);
+        пачка, не доставленная ни одним, будет отправлена следующим запуском.
+        """
+        now = now or timezone.now()
+        digests = OverdueReminderService.collect_digests(now, page_size)
+        notifiers = get_notifiers()
+
+        sent = failed = reminded = 0
+        for start in range(0, len(digests), OverdueReminderService.DIGEST_BATCH_SIZE):
+            batch = digests[start:start + OverdueReminderService.DIGEST_BATCH_SIZE]
+            delivered = False
+            for notifier in notifiers:
+                try:
+                    notifier.notify(batch)
+                except Exception:
+                    logger.exception(
+                        f'Ошибка отправки напоминаний о просроченной технике: '
+                        f'{type(notifier).__name__}, получателей {len(batch)}'
+                    )
+                    continue
+                delivered = True
+
+            if not delivered:
+                failed += len(batch)
+                continue
+
+            reminded += Issuance.objects.filter(
+                id__in=[item.issuance_id for digest in batch for item in digest.items]
+            ).update(reminded_at=now)
+            sent += len(batch)
+
+        logger.info(
+            f'Overdue reminders: {sent} digests sent, {failed} failed, {reminded} issuances'
+        )
+        return {'digests': sent, 'failed': failed, 'issuances': reminded}
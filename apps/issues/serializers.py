@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from django.utils import timezone
 from apps.assets.models import Asset
 from apps.assets.serializers import AssetListSerializer
-from apps.references.models import Location
+from apps.references.models import Employee, Location
+from apps.core.serializers import (
+    BulkModeSerializer, CachedPrimaryKeyRelatedField, ValuesSerializer, datetime_to_representation
+)
 from .models import Issuance
 
 
@@ -13,18 +17,41 @@ class IssuanceListSerializer(serializers.ModelSerializer):
         model = Issuance
         fields = [
             'id', 'inventory_item', 'asset_name', 'inventory_number',
-            'recipient', 'issue_date', 'return_date', 'created_at'
+            'recipient', 'employee', 'issue_date', 'due_date', 'return_date', 'created_at'
         ]
 
 
+class IssuanceListValuesSerializer(ValuesSerializer):
+    """Быстрый путь IssuanceListSerializer для списков"""
+    values = (
+        'id', 'inventory_item_id', 'inventory_item__product__name',
+        'inventory_item__inventory_number', 'recipient', 'employee_id', 'issue_date',
+        'due_date', 'return_date', 'created_at',
+    )
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'inventory_item': row['inventory_item_id'],
+            'asset_name': row['inventory_item__product__name'],
+            'inventory_number': row['inventory_item__inventory_number'],
+            'recipient': row['recipient'],
+            'employee': row['employee_id'],
+            'issue_date': datetime_to_representation(row['issue_date']),
+            'due_date': datetime_to_representation(row['due_date']),
+            'return_date': datetime_to_representation(row['return_date']),
+            'created_at': datetime_to_representation(row['created_at']),
+        }
+
+
 class IssuanceDetailSerializer(serializers.ModelSerializer):
     inventory_item = AssetListSerializer(read_only=True)
     
     class Meta:
         model = Issuance
         fields = [
-            'id', 'inventory_item', 'recipient', 'issue_date',
-            'return_date', 'issue_comment', 'return_comment',
+            'id', 'inventory_item', 'recipient', 'employee', 'issue_date',
+            'due_date', 'return_date', 'reminded_at', 'issue_comment', 'return_comment',
             'created_at', 'updated_at'
         ]
     
@@ -35,12 +62,32 @@ class IssuanceCreateSerializer(serializers.Serializer):
             status=Asset.StatusChoices.IN_STOCK
         )
     )
-    recipient = serializers.CharField(max_length=255)
+    recipient = serializers.CharField(max_length=255, required=False)
+    employee = serializers.PrimaryKeyRelatedField(
+        queryset=Employee.objects.all(),
+        required=False,
+        help_text='Сотрудник; без него определяется по recipient'
+    )
     comment = serializers.CharField(required=False, allow_blank=True)
+    due_date = serializers.DateTimeField(
+        required=False,
+        help_text='Срок возврата; по умолчанию ISSUANCE_DEFAULT_TERM_DAYS от даты выдачи'
+    )
+
+    def validate_due_date(self, value):
+        if value <= timezone.now():
+            raise serializers.ValidationError('Срок возврата должен быть в будущем')
+        return value
+
+    def validate(self, attrs):
+        if not attrs.get('recipient', '').strip() and 'employee' not in attrs:
+            raise serializers.ValidationError('Укажите recipient или employee')
+        return attrs
     
     
 class IssuanceReturnSerializer(serializers.Serializer):
-    location = serializers.PrimaryKeyRelatedField(
+    location = CachedPrimaryKeyRelatedField(
+        resource='locations',
         queryset=Location.objects.all()
     )
     comment = serializers.CharField(
@@ -48,3 +95,29 @@ class IssuanceReturnSerializer(serializers.Serializer):
         allow_blank=True,
         help_text='Комментарий при возврате'
     )
+
+
+class BulkIssuanceLineSerializer(serializers.Serializer):
+    """
+    Строка пакетной выдачи. Техника передается id и проверяется сервисом
+    одним запросом на весь пакет, а не запросом на строку.
+    """
+    inventory_item = serializers.IntegerField(min_value=1)
+    recipient = serializers.CharField(max_length=255)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+    due_date = serializers.DateTimeField(required=False)
+
+    def validate_due_date(self, value):
+        if value <= timezone.now():
+            raise serializers.ValidationError('Срок возврата должен быть в будущем')
+        return value
+
+
+class BulkReturnLineSerializer(serializers.Serializer):
+    issuance = serializers.IntegerField(min_value=1)
+    location = serializers.IntegerField(min_value=1)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BulkIssuanceSerializer(BulkModeSerializer):
+    MAX_LINES = 1000
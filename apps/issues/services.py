@@ -1,10 +1,17 @@
 import logging
-from django.db import transaction
+from datetime import timedelta
+from typing import Any, Dict, List, Tuple
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from . import tasks
 from .models import Issuance
-from apps.references.models import Location
-from apps.assets.models import Asset
+from apps.references.models import Employee, Location
+from apps.references.services import EmployeeService
+from apps.assets.models import Asset, AssetEvent
+from apps.core import versioning
+from apps.core.text import translit_key
 from apps.core.exceptions import AssetNotAvailableError
 
 logger = logging.getLogger(__name__)
@@ -13,7 +20,8 @@ class IssuancesService:
     
     @staticmethod
     @transaction.atomic
-    def create_issuance(inventory_item: Asset, recipient: str, comment: str = '') -> Issuance:
+    def create_issuance(inventory_item: Asset, recipient: str = '', comment: str = '',
+                        due_date=None, employee: Employee = None) -> Issuance:
 
         if not inventory_item.is_available:
             raise AssetNotAvailableError(
@@ -21,25 +29,49 @@ class IssuancesService:
                 f'Текущий статус: {inventory_item.get_status_display()}'
             )
         
-        active_issue = Issuance.objects.filter(
-            inventory_item=inventory_item,
-            return_date__isnull=True
-        ).first()
-        
-        if active_issue:
+        if due_date is None:
+            due_date = IssuancesService.get_default_due_date()
+
+        recipient = recipient or (employee.name if employee is not None else '')
+        if not recipient.strip():
+            raise ValidationError('Укажите получателя или сотрудника')
+
+        # Единственность открытой выдачи гарантирует частичный уникальный
+        # индекс issuance_single_open_per_asset - без SELECT перед INSERT.
+        # Существующий сотрудник подставляется подзапросом в том же INSERT
+        employee_value = (
+            {'employee': employee} if employee is not None
+            else {'employee_id': EmployeeService.id_subquery(recipient)}
+        )
+        try:
+            with transaction.atomic():
+                issuance = Issuance.create_trusted(
+                    inventory_item=inventory_item,
+                    recipient=recipient,
+                    issue_comment=comment,
+                    due_date=due_date,
+                    **employee_value
+                )
+        except IntegrityError:
+            active_issue = Issuance.objects.filter(
+                inventory_item=inventory_item,
+                return_date__isnull=True
+            ).first()
+            if active_issue is None:
+                raise
             raise AssetNotAvailableError(
                 f'Техника {inventory_item.inventory_number} уже выдана '
                 f'пользователю {active_issue.recipient} '
                 f'({active_issue.issue_date.strftime("%d.%m.%Y")})'
             )
-        
-        issuance = Issuance.objects.create(
-            inventory_item=inventory_item,
-            recipient=recipient,
-            issue_comment=comment
-        )
-        
-        inventory_item.mark_as_issued()
+
+        inventory_item.mark_as_issued(issuance)
+
+        if employee is None:
+            # employee_id вычислен подзапросом и известен только БД: убираем
+            # выражение из экземпляра - поле станет отложенным и дочитается при обращении
+            issuance.__dict__.pop('employee_id')
+            IssuancesService._link_new_employees([issuance.id])
         
         logger.info(
             f'Создана выдача #{issuance.id}: '
@@ -61,12 +93,10 @@ class IssuancesService:
             
         issuance.return_date = timezone.now()
         issuance.return_comment = comment
-        issuance.save()
+        issuance.save(update_fields=['return_date', 'return_comment', 'updated_at'], validate=False)
         
         inventory_item = issuance.inventory_item
-        inventory_item.mark_as_returned()
-        inventory_item.current_location = location
-        inventory_item.save()
+        inventory_item.mark_as_returned(location=location)
         
         logger.info(
             f'Возврат выдачи #{issuance.id}: '
@@ -76,6 +106,355 @@ class IssuancesService:
         
         return issuance
         
+    @staticmethod
+    @transaction.atomic
+    def create_issuances_bulk(lines: List[Dict[str, Any]], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Пакетная выдача техники (дни массового найма).
+
+        Каждая строка - словарь с ключами inventory_item (id), recipient,
+        comment, due_date. Техника блокируется одним SELECT ... FOR UPDATE,
+        открытые выдачи проверяются одним запросом на пакет, сотрудники
+        ищутся одним запросом (EmployeeService.find_many, новые - после коммита), выдачи
+        пишутся одним bulk_create, статусы меняются одним UPDATE.
+
+        atomic=True: при любой ошибке ничего не выдается.
+        atomic=False (best-effort): выдаются все корректные строки.
+
+        Returns:
+            {'applied': int, 'issuances': [id, ...], 'errors': [{'line': i, 'error': str}, ...]}
+        """
+        asset_ids = {line['inventory_item'] for line in lines}
+        assets = {
+            asset.id: asset
+            for asset in Asset.objects.select_for_update().filter(
+                id__in=asset_ids
+            ).only('id', 'status', 'inventory_number', 'current_location').order_by('id')
+        }
+        active_recipients = dict(
+            Issuance.objects.filter(
+                inventory_item_id__in=asset_ids,
+                return_date__isnull=True
+            ).values_list('inventory_item_id', 'recipient')
+        )
+
+        default_due_date = IssuancesService.get_default_due_date()
+        pending = []
+        errors = []
+        taken = set()
+
+        for index, line in enumerate(lines):
+            asset = assets.get(line['inventory_item'])
+
+            if asset is None:
+                errors.append({'line': index, 'error': f'Техника {line["inventory_item"]} не найдена'})
+                continue
+
+            if asset.id in taken:
+                errors.append({
+                    'line': index,
+                    'error': f'Техника {asset.inventory_number} повторяется в пакете'
+                })
+                continue
+
+            if asset.id in active_recipients:
+                errors.append({
+                    'line': index,
+                    'error': (
+                        f'Техника {asset.inventory_number} уже выдана '
+                        f'пользователю {active_recipients[asset.id]}'
+                    )
+                })
+                continue
+
+            if not asset.is_available:
+                errors.append({
+                    'line': index,
+                    'error': (
+                        f'Техника {asset.inventory_number} недоступна. '
+                        f'Текущий статус: {asset.get_status_display()}'
+                    )
+                })
+                continue
+
+            taken.add(asset.id)
+            pending.append((index, Issuance(
+                inventory_item=asset,
+                recipient=line['recipient'],
+                issue_comment=line.get('comment', ''),
+                due_date=line.get('due_date') or default_due_date
+            )))
+
+        if errors and atomic:
+            return {'applied': 0, 'issuances': [], 'errors': errors}
+
+        issuances = []
+        if pending:
+            employees = EmployeeService.find_many(issuance.recipient for _, issuance in pending)
+            for _, issuance in pending:
+                issuance.employee = employees.get(translit_key(issuance.recipient))
+            issuances = IssuancesService._insert_issuances(pending, errors, atomic)
+            if errors and atomic:
+                return {'applied': 0, 'issuances': [], 'errors': errors}
+            IssuancesService._link_new_employees(
+                [issuance.id for issuance in issuances if issuance.employee is None]
+            )
+
+        if issuances:
+
+            # Держатель у каждой единицы свой - bulk_update дает один UPDATE с CASE
+            now = timezone.now()
+            issued_assets = []
+            for issuance in issuances:
+                asset = issuance.inventory_item
+                asset.status = Asset.StatusChoices.ISSUED
+                asset.updated_at = now
+                asset.set_holder(issuance)
+                issued_assets.append(asset)
+            Asset.objects.bulk_update(
+                issued_assets, ['status', 'updated_at', *Asset.HOLDER_FIELDS], batch_size=1000
+            )
+            AssetEvent.objects.bulk_create([
+                AssetEvent.build(
+                    asset.id, Asset.StatusChoices.IN_STOCK, Asset.StatusChoices.ISSUED,
+                    asset.current_location_id, ts=now
+                )
+                for asset in issued_assets
+            ], batch_size=1000)
+            versioning.bump('assets')
+
+        logger.info(
+            f'Пакетная выдача: {len(issuances)} выдач, {len(errors)} ошибок '
+            f'(mode: {"atomic" if atomic else "best-effort"})'
+        )
+
+        return {
+            'applied': len(issuances),
+            'issuances': [issuance.id for issuance in issuances],
+            'errors': errors
+        }
+
+    @staticmethod
+    def _link_new_employees(issuance_ids: List[int]):
+        """
+        Выдачи на существующих сотрудников связываются в транзакции выдачи;
+        сотрудники для новых имен (INSERT + SELECT) создаются после коммита в фоне
+        """
+        if issuance_ids:
+            transaction.on_commit(lambda: tasks.link_issuance_employees.delay(issuance_ids))
+
+    @staticmethod
+    def _insert_issuances(pending: List[Tuple[int, Issuance]], errors: List[Dict[str, Any]],
+                          atomic: bool) -> List[Issuance]:
+        """
+        bulk_create выдач пакета под savepoint. create_issuance технику не
+        блокирует (единственность держит индекс issuance_single_open_per_asset),
+        поэтому одиночная выдача может занять единицу между проверкой и вставкой.
+        Такие строки уходят в ошибки "уже выдана"; в режиме atomic пакет на этом
+        прекращается, в best-effort остальные строки вставляются повторно.
+
+        Returns:
+            вставленные выдачи
+        """
+        while pending:
+            try:
+                with transaction.atomic():
+                    Issuance.objects.bulk_create([issuance for _, issuance in pending], batch_size=1000)
+                break
+            except IntegrityError:
+                active_recipients = dict(
+                    Issuance.objects.filter(
+                        inventory_item_id__in=[issuance.inventory_item_id for _, issuance in pending],
+                        return_date__isnull=True
+                    ).values_list('inventory_item_id', 'recipient')
+                )
+                if not active_recipients:
+                    raise
+
+            remaining = []
+            for index, issuance in pending:
+                recipient = active_recipients.get(issuance.inventory_item_id)
+                if recipient is None:
+                    remaining.append((index, issuance))
+                    continue
+                errors.append({
+                    'line': index,
+                    'error': (
+                        f'Техника {issuance.inventory_item.inventory_number} уже выдана '
+                        f'пользователю {recipient}'
+                    )
+                })
+            errors.sort(key=lambda error: error['line'])
+            if atomic:
+                return []
+            pending = remaining
+
+        return [issuance for _, issuance in pending]
+
+    @staticmethod
+    @transaction.atomic
+    def return_bulk(lines: List[Dict[str, Any]], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Пакетный возврат техники (массовое увольнение, переезд).
+
+        Каждая строка - словарь с ключами issuance (id), location (id), comment.
+        Выдачи вместе с техникой блокируются одним SELECT ... FOR UPDATE,
+        локации загружаются одним запросом, выдачи закрываются одним
+        bulk_update, техника возвращается одним UPDATE на каждую локацию.
+
+        Returns:
+            {'applied': int, 'issuances': [id, ...], 'errors': [{'line': i, 'error': str}, ...]}
+        """
+        issuances = {
+            issuance.id: issuance
+            for issuance in Issuance.objects.select_for_update().filter(
+                id__in={line['issuance'] for line in lines}
+            ).select_related('inventory_item').order_by('id')
+        }
+        location_ids = set(Location.objects.filter(
+            id__in={line['location'] for line in lines}
+        ).values_list('id', flat=True))
+
+        now = timezone.now()
+        returned = []
+        assets_by_location = {}
+        errors = []
+
+        for index, line in enumerate(lines):
+            issuance = issuances.get(line['issuance'])
+
+            if issuance is None:
+                errors.append({'line': index, 'error': f'Выдача {line["issuance"]} не найдена'})
+                continue
+
+            inventory_item = issuance.inventory_item
+            if issuance.is_returned:
+                errors.append({
+                    'line': index,
+                    'error': (
+                        f'Техника {inventory_item.inventory_number} '
+                        f'уже возвращена {issuance.return_date.strftime("%d.%m.%Y")}'
+                    )
+                })
+                continue
+
+            if inventory_item.status != Asset.StatusChoices.ISSUED:
+                errors.append({
+                    'line': index,
+                    'error': (
+                        f'Невозможно вернуть единицу со статусом: '
+                        f'{inventory_item.get_status_display()}'
+                    )
+                })
+                continue
+
+            if line['location'] not in location_ids:
+                errors.append({'line': index, 'error': f'Локация {line["location"]} не найдена'})
+                continue
+
+            issuance.return_date = now
+            issuance.return_comment = line.get('comment', '')
+            issuance.updated_at = now
+            returned.append(issuance)
+            assets_by_location.setdefault(line['location'], []).append(inventory_item.id)
+
+        if errors and atomic:
+            return {'applied': 0, 'issuances': [], 'errors': errors}
+
+        if returned:
+            Issuance.objects.bulk_update(
+                returned, ['return_date', 'return_comment', 'updated_at'], batch_size=1000
+            )
+            AssetEvent.objects.bulk_create([
+                AssetEvent.build(
+                    asset_id, Asset.StatusChoices.ISSUED, Asset.StatusChoices.IN_STOCK,
+                    location_id, ts=now
+                )
+                for location_id, asset_ids in assets_by_location.items()
+                for asset_id in asset_ids
+            ], batch_size=1000)
+            for location_id, asset_ids in assets_by_location.items():
+                Asset.objects.filter(id__in=asset_ids).update(
+                    status=Asset.StatusChoices.IN_STOCK,
+                    current_location_id=location_id,
+                    current_issuance=None,
+                    current_holder=None,
+                    holder_key=None,
+                    issued_at=None,
+                    updated_at=now
+                )
+            versioning.bump('assets')
+
+        logger.info(
+            f'Пакетный возврат: {len(returned)} выдач, {len(errors)} ошибок '
+            f'(mode: {"atomic" if atomic else "best-effort"})'
+        )
+
+        return {
+            'applied': len(returned),
+            'issuances': [issuance.id for issuance in returned],
+            'errors': errors
+        }
+
+    @staticmethod
+    def rebuild_current_holders(batch_size: int = 1000) -> int:
+        """
+        Пересборка Asset.current_issuance/current_holder/issued_at по открытым
+        выдачам. Техника обходится keyset-пачками по id: на пачку один запрос
+        открытых выдач и один bulk_update только для расходящихся строк.
+
+        Returns:
+            количество исправленных единиц техники
+        """
+        fixed = 0
+        last_id = 0
+
+        while True:
+            assets = list(
+                Asset.objects.filter(id__gt=last_id).order_by('id').only(
+                    'id', 'status', *Asset.HOLDER_FIELDS
+                )[:batch_size]
+            )
+            if not assets:
+                break
+            last_id = assets[-1].id
+
+            open_issuances = {
+                issuance.inventory_item_id: issuance
+                for issuance in Issuance.objects.filter(
+                    inventory_item_id__in=[asset.id for asset in assets],
+                    return_date__isnull=True
+                ).only('id', 'inventory_item_id', 'recipient', 'issue_date')
+            }
+
+            changed = []
+            for asset in assets:
+                expected = [getattr(asset, attname) for attname in Asset.HOLDER_ATTNAMES]
+                # Держатель есть только у выданной техники (см. Asset.save)
+                issuance = open_issuances.get(asset.id)
+                asset.set_holder(issuance if asset.status == Asset.StatusChoices.ISSUED else None)
+                if [getattr(asset, attname) for attname in Asset.HOLDER_ATTNAMES] != expected:
+                    changed.append(asset)
+
+            if changed:
+                with transaction.atomic():
+                    Asset.objects.bulk_update(changed, list(Asset.HOLDER_FIELDS))
+                fixed += len(changed)
+
+        if fixed:
+            versioning.bump('assets')
+
+        logger.info(f'Пересборка держателей техники: исправлено {fixed}')
+        return fixed
+
+    @staticmethod
+    def get_default_due_date():
+        """Срок возврата по умолчанию; None, если ISSUANCE_DEFAULT_TERM_DAYS не задан"""
+        days = getattr(settings, 'ISSUANCE_DEFAULT_TERM_DAYS', None)
+        if not days:
+            return None
+        return timezone.now() + timedelta(days=days)
+
     @staticmethod
     def get_active_issuances():
         return Issuance.objects.filter(
@@ -1,9 +1,22 @@
+from typing import List
+
 from celery import shared_task
 
+from apps.references.services import EmployeeService
+from .models import Issuance
+from .reminders import OverdueReminderService
+
 
 @shared_task
 def send_overdue_equipment_reminder():
-    """Ежемесячный отчет по списаниям"""
-    pass
+    """Напоминания получателям о просроченной технике - одно на получателя"""
+    return OverdueReminderService.send_reminders()
 
 
+@shared_task
+def link_issuance_employees(issuance_ids: List[int]):
+    """Связывает выдачи без сотрудника с Employee по recipient"""
+    issuances = list(
+        Issuance.objects.filter(pk__in=issuance_ids, employee__isnull=True).only('id', 'recipient')
+    )
+    return EmployeeService.link_issuances(issuances)
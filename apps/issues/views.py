@@ -7,18 +7,25 @@ from django.core.exceptions import ValidationError
 from .models import Issuance
 from .services import IssuancesService
 from apps.core.exceptions import AssetNotAvailableError
+from apps.core.mixins import BulkActionMixin, ListActionMixin
+from apps.core.pagination import LedgerCursorPagination
 from .serializers import (
-    IssuanceListSerializer, IssuanceDetailSerializer,
+    IssuanceListSerializer, IssuanceDetailSerializer, IssuanceListValuesSerializer,
     IssuanceCreateSerializer, IssuanceReturnSerializer,
+    BulkIssuanceSerializer, BulkIssuanceLineSerializer, BulkReturnLineSerializer,
 )
 
 
-class IssuanceViewSet(viewsets.ReadOnlyModelViewSet):
+class IssuanceViewSet(BulkActionMixin, ListActionMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Issuance.objects.select_related(
         'inventory_item', 'inventory_item__product'
     ).all()
+    values_serializer_class = IssuanceListValuesSerializer
+    bulk_serializer_class = BulkIssuanceSerializer
+    pagination_class = LedgerCursorPagination
+    cursor_ordering = ('-issue_date', '-id')
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['recipient', 'inventory_item']
+    filterset_fields = ['recipient', 'employee', 'inventory_item']
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -33,8 +40,10 @@ class IssuanceViewSet(viewsets.ReadOnlyModelViewSet):
         try:
             issuance = IssuancesService.create_issuance(
                 inventory_item=serializer.validated_data['inventory_item'],
-                recipient=serializer.validated_data['recipient'],
-                comment=serializer.validated_data.get('comment', '')
+                recipient=serializer.validated_data.get('recipient', '').strip(),
+                employee=serializer.validated_data.get('employee'),
+                comment=serializer.validated_data.get('comment', ''),
+                due_date=serializer.validated_data.get('due_date')
             )
 
             result_serializer = IssuanceDetailSerializer(issuance)
@@ -66,8 +75,29 @@ class IssuanceViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'])
+    def bulk_issue(self, request):
+        """
+        Пакетная выдача: lines - [{inventory_item, recipient, comment, due_date}, ...].
+        mode=atomic - все или ничего, mode=best_effort - выдать корректные строки.
+        """
+        return self.bulk_response(
+            request, BulkIssuanceLineSerializer, IssuancesService.create_issuances_bulk,
+            items_key='issuances', success_status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=['post'])
+    def bulk_return(self, request):
+        """
+        Пакетный возврат: lines - [{issuance, location, comment}, ...].
+        mode=atomic - все или ничего, mode=best_effort - вернуть корректные строки.
+        """
+        return self.bulk_response(
+            request, BulkReturnLineSerializer, IssuancesService.return_bulk,
+            items_key='issuances', success_status=status.HTTP_200_OK
+        )
+
     @action(detail=False, methods=['get'])
     def active(self, request):
         queryset = IssuancesService.get_active_issuances()
-        serializer = IssuanceListSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(queryset, IssuanceListValuesSerializer)
@@ -1,4 +1,5 @@
 from django.db import models
+from apps.core.models import TrackedFieldsMixin
 from apps.references.models import Category
 from .validators import (
     validate_sku_format,
@@ -6,7 +7,10 @@ from .validators import (
     validate_min_stock
 )
 
-class Product(models.Model):
+class Product(TrackedFieldsMixin, models.Model):
+    # Поля поискового документа (apps.search.signals)
+    tracked_fields = ('name', 'sku', 'description', 'category_id')
+
     name = models.CharField(
         max_length=250,
         validators=[validate_product_name]
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
-from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.mixins import CachedResponseMixin, ConditionalGetMixin, ListActionMixin
 from apps.products.models import Product
 from apps.products.serializers import (
     ProductListSerializer,
@@ -10,12 +10,14 @@ from apps.products.serializers import (
 )
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, CachedResponseMixin, ListActionMixin,
+                     viewsets.ModelViewSet):
     queryset = Product.objects.select_related('category').all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'is_consumable', 'unit']
     search_fields = ['name', 'sku', 'description']
     ordering_fields = ['name', 'created_at', 'sku']
+    version_resources = ('products', 'categories')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -28,12 +30,10 @@ class ProductViewSet(viewsets.ModelViewSet):
     def consumables(self, request):
         """Получить список расходных материалов"""
         consumables = self.queryset.filter(is_consumable=True)
-        serializer = self.get_serializer(consumables, many=True)
-        return Response(serializer.data)
+        return self.list_response(consumables)
     
     @action(detail=False, methods=['get'])
     def assets(self, request):
         """Получить список техники (не расходники)"""
         assets = self.queryset.filter(is_consumable=False)
-        serializer = self.get_serializer(assets, many=True)
-        return Response(serializer.data)
+        return self.list_response(assets)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from apps.references.models import Category, Location
+from apps.references.models import Category, Employee, Location
 
 
 @admin.register(Category)
@@ -17,3 +17,11 @@ class LocationAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'address']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(Employee)
+class EmployeeAdmin(admin.ModelAdmin):
+    list_display = ['name', 'search_key', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    search_fields = ['name', 'search_key']
+    readonly_fields = ['search_key', 'created_at', 'updated_at']
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReferencesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.references'
+
+    def ready(self):
+        from .indexes import create_employee_indexes
+
+        post_migrate.connect(create_employee_indexes, sender=self)
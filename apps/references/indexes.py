@@ -0,0 +1,27 @@
+import logging
+
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+# Триграммный индекс для поиска сотрудников по подстроке search_key
+# (search_key__contains -> LIKE '%...%'). Только PostgreSQL.
+POSTGRES_STATEMENTS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS employees_search_key_trgm '
+    'ON employees USING gin (search_key gin_trgm_ops)',
+]
+
+
+def create_employee_indexes(using='default', **kwargs):
+    """post_migrate: триграммный индекс сотрудников на PostgreSQL"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        for statement in POSTGRES_STATEMENTS:
+            cursor.execute(statement)
+    logger.info('Employee indexes ensured')
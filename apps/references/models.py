@@ -1,5 +1,6 @@
 from django.db import models
 from slugify import slugify
+from apps.core.text import translit_key
 
 
 class Category(models.Model):
@@ -45,3 +46,31 @@ class Location(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class Employee(models.Model):
+    """
+    Получатель техники. search_key - нормализованное имя (translit_key):
+    по нему дедуплицируются написания 'Иванов И.' / 'Ivanov I.' и строится
+    триграммный индекс для поиска (apps.references.indexes).
+    """
+    name = models.CharField(max_length=255, verbose_name='ФИО')
+    search_key = models.CharField(max_length=255, unique=True, editable=False)
+    is_active = models.BooleanField(default=True, verbose_name='Активен')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.name = ' '.join(self.name.split())
+        self.search_key = translit_key(self.name)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        db_table = 'employees'
+        verbose_name = 'Сотрудник'
+        verbose_name_plural = 'Сотрудники'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
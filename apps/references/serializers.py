@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Category, Location
+from apps.core.text import translit_key
+from .models import Category, Employee, Location
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -39,3 +40,29 @@ class LocationSerializer(serializers.ModelSerializer):
                 'Название локации должно быть не менее 2 символов'
             )
         return value.strip()
+
+
+class EmployeeSerializer(serializers.ModelSerializer):
+    """Сериализатор для сотрудников"""
+
+    class Meta:
+        model = Employee
+        fields = [
+            'id', 'name', 'search_key', 'is_active', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['search_key', 'created_at', 'updated_at']
+
+    def validate_name(self, value):
+        """Имя должно давать непустой ключ и не совпадать с существующим сотрудником"""
+        key = translit_key(value)
+        if not key:
+            raise serializers.ValidationError('Имя сотрудника не может быть пустым')
+
+        duplicate = Employee.objects.filter(search_key=key)
+        if self.instance is not None:
+            duplicate = duplicate.exclude(pk=self.instance.pk)
+        if duplicate.exists():
+            raise serializers.ValidationError(
+                f'Сотрудник с таким именем уже существует: {duplicate.first().name}'
+            )
+        return ' '.join(value.split())
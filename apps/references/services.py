@@ -0,0 +1,127 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Subquery
+
+from apps.core.text import translit_key
+from apps.issues.models import Issuance
+from apps.references.models import Employee
+
+logger = logging.getLogger(__name__)
+
+
+class EmployeeService:
+
+    @staticmethod
+    def resolve(name: str) -> Optional[Employee]:
+        """
+        Сотрудник по имени в любом написании; создается, если не найден.
+        None - если в имени нет ни одного значимого символа.
+        """
+        return EmployeeService.resolve_many([name]).get(translit_key(name))
+
+    @staticmethod
+    def find_many(names: Iterable[str]) -> Dict[str, Employee]:
+        """Уже существующие сотрудники для пакета имен: {search_key: Employee}, один SELECT"""
+        keys = {translit_key(name) for name in names} - {''}
+        return {
+            employee.search_key: employee
+            for employee in Employee.objects.filter(search_key__in=keys)
+        }
+
+    @staticmethod
+    def id_subquery(name: str) -> Subquery:
+        """
+        id существующего сотрудника с именем name (или NULL) - подзапрос для
+        записи выдачи одним INSERT, без отдельного SELECT сотрудника
+        """
+        return Subquery(
+            Employee.objects.filter(search_key=translit_key(name)).order_by().values('id')[:1]
+        )
+
+    @staticmethod
+    def resolve_many(names: Iterable[str]) -> Dict[str, Employee]:
+        """
+        Сотрудники для пакета имен: {search_key: Employee}. Один SELECT по
+        уникальному индексу search_key; недостающие создаются одним bulk_create
+        (ignore_conflicts - на случай параллельного создания) и дочитываются.
+        Первое встретившееся написание становится именем сотрудника.
+        """
+        spellings = {}
+        for name in names:
+            name = ' '.join(str(name).split())
+            key = translit_key(name)
+            if key:
+                spellings.setdefault(key, name)
+
+        employees = {
+            employee.search_key: employee
+            for employee in Employee.objects.filter(search_key__in=spellings.keys())
+        }
+        missing = [key for key in spellings if key not in employees]
+        if missing:
+            Employee.objects.bulk_create(
+                [Employee(name=spellings[key], search_key=key) for key in missing],
+                ignore_conflicts=True
+            )
+            employees.update(
+                (employee.search_key, employee)
+                for employee in Employee.objects.filter(search_key__in=missing)
+            )
+            logger.info(f'Создано сотрудников: {len(missing)}')
+
+        return employees
+
+    @staticmethod
+    @transaction.atomic
+    def link_issuances(issuances: List[Issuance]) -> int:
+        """
+        Заполняет employee у выдач по их recipient: один resolve_many на пакет
+        и один bulk_update. Выдачи - с загруженными id и recipient.
+
+        Returns:
+            количество связанных выдач
+        """
+        employees = EmployeeService.resolve_many(issuance.recipient for issuance in issuances)
+        linked = []
+        for issuance in issuances:
+            issuance.employee = employees.get(translit_key(issuance.recipient))
+            if issuance.employee is not None:
+                linked.append(issuance)
+        Issuance.objects.bulk_update(linked, ['employee'])
+        return len(linked)
+
+    @staticmethod
+    @transaction.atomic
+    def dedupe() -> int:
+        """
+        Пересчет search_key и слияние сотрудников с одинаковым ключом:
+        выдачи переносятся на самую раннюю запись, дубли удаляются.
+
+        Returns:
+            количество удаленных дублей
+        """
+        groups = defaultdict(list)
+        for employee_id, name, search_key in Employee.objects.order_by('id').values_list(
+            'id', 'name', 'search_key'
+        ).iterator(chunk_size=2000):
+            groups[translit_key(name)].append((employee_id, search_key))
+
+        merged = 0
+        rekeyed = []
+        for key, members in groups.items():
+            survivor_id, survivor_key = members[0]
+            duplicates = [employee_id for employee_id, _ in members[1:]]
+            if duplicates:
+                Issuance.objects.filter(employee_id__in=duplicates).update(employee_id=survivor_id)
+                Employee.objects.filter(id__in=duplicates).delete()
+                merged += len(duplicates)
+            if survivor_key != key:
+                rekeyed.append(Employee(id=survivor_id, search_key=key))
+
+        Employee.objects.bulk_update(rekeyed, ['search_key'], batch_size=1000)
+
+        logger.info(f'Дедупликация сотрудников: слито {merged}, обновлено ключей {len(rekeyed)}')
+        return merged
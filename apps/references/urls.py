@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     CategoryViewSet,
+    EmployeeViewSet,
     LocationViewSet
 )
 
@@ -11,6 +12,7 @@ app_name = 'references'
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'locations', LocationViewSet, basename='location')
+router.register(r'employees', EmployeeViewSet, basename='employee')
 
 urlpatterns = [
     path('', include(router.urls)),
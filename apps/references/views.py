@@ -1,10 +1,15 @@
 from rest_framework import filters, viewsets
+from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
-from apps.references.models import Category, Location
-from apps.references.serializers import CategorySerializer, LocationSerializer
+from apps.core.mixins import CachedResponseMixin, ConditionalGetMixin
+from apps.core.text import translit_key
+from apps.issues.models import Issuance
+from apps.issues.serializers import IssuanceListValuesSerializer
+from apps.references.models import Category, Employee, Location
+from apps.references.serializers import CategorySerializer, EmployeeSerializer, LocationSerializer
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     ViewSet для категорий.
 
@@ -20,9 +25,10 @@ class CategoryViewSet(viewsets.ModelViewSet):
     filterset_fields = ['is_active']
     search_fields = ['name']
     ordering_fields = ['name', 'created_at']
+    version_resources = ('categories',)
 
 
-class LocationViewSet(viewsets.ModelViewSet):
+class LocationViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """ViewSet для локаций"""
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
@@ -30,4 +36,36 @@ class LocationViewSet(viewsets.ModelViewSet):
     filterset_fields = ['is_active']
     search_fields = ['name']
     ordering_fields = ['name', 'created_at']
-    
+    version_resources = ('locations',)
+
+
+class EmployeeViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet для сотрудников-получателей.
+
+    ?q= - поиск по нормализованному имени в любом написании
+    ('Иванов И.' и 'Ivanov I.' совпадают); на PostgreSQL - по триграммному индексу.
+    """
+    queryset = Employee.objects.all()
+    serializer_class = EmployeeSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['is_active']
+    ordering_fields = ['name', 'created_at']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        query = translit_key(self.request.query_params.get('q', ''))
+        if query:
+            queryset = queryset.filter(search_key__contains=query)
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def issuances(self, request, pk=None):
+        """Вся техника, выданная сотруднику (?active=true - только не возвращенная)"""
+        employee = self.get_object()
+        queryset = Issuance.objects.filter(employee=employee).order_by('-issue_date', '-id')
+        if request.query_params.get('active', '').lower() in ('true', '1'):
+            queryset = queryset.filter(return_date__isnull=True)
+
+        page = self.paginate_queryset(IssuanceListValuesSerializer.prepare(queryset))
+        return self.get_paginated_response(IssuanceListValuesSerializer(page).data)
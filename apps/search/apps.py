@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.search'
+
+    def ready(self):
+        import apps.search.signals
+        from .indexes import create_search_indexes
+
+        post_migrate.connect(create_search_indexes, sender=self)
@@ -0,0 +1,177 @@
+"""
+Поисковые движки по SearchEntry.
+
+PostgresSearchBackend - полнотекстовый поиск (to_tsvector / to_tsquery с
+префиксами) и триграммное сходство pg_trgm по кодам и заголовкам, с
+индексами из apps.search.indexes.
+
+NgramSearchBackend - запасной вариант для SQLite (разработка, тесты):
+триграммный инвертированный индекс в памяти процесса. Индекс
+перестраивается целиком, когда меняется версия ресурса 'search'.
+"""
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from apps.core import versioning
+from apps.core.text import normalize
+from .models import SearchEntry
+
+
+TOKEN_RE = re.compile(r'\w+(?:[-./]\w+)*')
+
+# Доля триграмм запроса, которую должен содержать документ
+MIN_SIMILARITY = 0.5
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    kind: str
+    object_id: int
+    title: str
+    codes: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PostgresSearchBackend:
+
+    TRIGRAM_THRESHOLD = 0.3
+
+    def search(self, query: str, kinds: Sequence[str], limit: int) -> List[SearchResult]:
+        from django.contrib.postgres.search import (
+            SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+        )
+
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        text = ' '.join(tokens)
+
+        # Префиксный tsquery из очищенных токенов: 'ноут:* & dell:*'
+        ts_query = SearchQuery(
+            ' & '.join(f"'{token}':*" for token in tokens), config='simple', search_type='raw'
+        )
+        vector = SearchVector('document', config='simple')
+
+        code_prefix = Q()
+        for token in tokens:
+            code_prefix |= Q(codes__startswith=token) | Q(codes__contains=f' {token}')
+
+        queryset = SearchEntry.objects.filter(kind__in=kinds).annotate(
+            search=vector,
+            rank=SearchRank(vector, ts_query),
+            similarity=Greatest(
+                TrigramWordSimilarity(text, 'codes'),
+                TrigramWordSimilarity(text, 'title'),
+            ),
+            prefix_bonus=Case(When(code_prefix, then=Value(1.0)), default=Value(0.0),
+                              output_field=FloatField()),
+        ).filter(
+            Q(search=ts_query)
+            | Q(codes__trigram_word_similar=text)
+            | Q(title__trigram_word_similar=text)
+            | code_prefix
+        ).annotate(
+            score=F('rank') + F('similarity') + F('prefix_bonus')
+        ).order_by('-score', 'kind', 'object_id')
+
+        return [
+            SearchResult(
+                kind=entry.kind, object_id=entry.object_id, title=entry.title,
+                codes=entry.codes, score=round(entry.score, 4)
+            )
+            for entry in queryset[:limit]
+        ]
+
+
+class NgramIndex:
+    """Триграммный инвертированный индекс SearchEntry в памяти"""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.entries: List[tuple] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+        rows = SearchEntry.objects.order_by().values_list(
+            'kind', 'object_id', 'title', 'codes', 'document'
+        ).iterator(chunk_size=2000)
+        for position, (kind, object_id, title, codes, document) in enumerate(rows):
+            tokens = set(tokenize(document))
+            self.entries.append((kind, object_id, title, codes, tuple(codes.split()), tokens))
+            for gram in set().union(*(trigrams(token) for token in tokens)):
+                self.postings[gram].append(position)
+
+    def search(self, query: str, kinds: Sequence[str], limit: int) -> List[SearchResult]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        query_grams = set().union(*(trigrams(token) for token in tokens))
+        hits = Counter()
+        for gram in query_grams:
+            hits.update(self.postings.get(gram, ()))
+
+        results = []
+        for position, count in hits.items():
+            similarity = count / len(query_grams)
+            kind, object_id, title, codes, code_tokens, doc_tokens = self.entries[position]
+            if kind not in kinds:
+                continue
+
+            # Бонусы: префикс кода (инвентарный/серийный номер, SKU) и
+            # префиксное совпадение всех слов запроса
+            bonus = 0.0
+            if any(code.startswith(token) for token in tokens for code in code_tokens):
+                bonus += 1.0
+            if all(any(word.startswith(token) for word in doc_tokens) for token in tokens):
+                bonus += 0.5
+
+            if similarity < MIN_SIMILARITY and not bonus:
+                continue
+            results.append(SearchResult(
+                kind=kind, object_id=object_id, title=title, codes=codes,
+                score=round(similarity + bonus, 4)
+            ))
+
+        results.sort(key=lambda result: (-result.score, result.kind, result.object_id))
+        return results[:limit]
+
+
+class NgramSearchBackend:
+
+    _index: Optional[NgramIndex] = None
+    _lock = threading.Lock()
+
+    def get_index(self) -> NgramIndex:
+        version = versioning.get_versions(['search'])['search']
+        index = NgramSearchBackend._index
+        if index is None or index.version != version:
+            with NgramSearchBackend._lock:
+                index = NgramSearchBackend._index
+                if index is None or index.version != version:
+                    index = NgramSearchBackend._index = NgramIndex(version)
+        return index
+
+    def search(self, query: str, kinds: Sequence[str], limit: int) -> List[SearchResult]:
+        return self.get_index().search(query, kinds, limit)
+
+
+def get_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return NgramSearchBackend()
@@ -0,0 +1,32 @@
+import logging
+
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+# Индексы, которые нельзя описать в Meta.indexes без потери совместимости
+# с SQLite. Выражение to_tsvector совпадает с тем, что строит
+# SearchVector('document', config='simple'), иначе индекс не используется.
+POSTGRES_STATEMENTS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "CREATE INDEX IF NOT EXISTS search_entries_document_fts "
+    "ON search_entries USING gin (to_tsvector('simple'::regconfig, COALESCE(document, '')))",
+    'CREATE INDEX IF NOT EXISTS search_entries_codes_trgm '
+    'ON search_entries USING gin (codes gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS search_entries_title_trgm '
+    'ON search_entries USING gin (title gin_trgm_ops)',
+]
+
+
+def create_search_indexes(using='default', **kwargs):
+    """post_migrate: полнотекстовый и триграммные индексы на PostgreSQL"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    with connection.cursor() as cursor:
+        for statement in POSTGRES_STATEMENTS:
+            cursor.execute(statement)
+    logger.info('Search indexes ensured')
@@ -0,0 +1,83 @@
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from apps.assets.models import Asset
+from apps.core import versioning
+from apps.core.text import normalize
+from apps.products.models import Product
+from .models import SearchEntry
+
+
+BATCH_SIZE = 1000
+
+def product_entries(queryset) -> Iterator[SearchEntry]:
+    rows = queryset.order_by().values_list(
+        'id', 'name', 'sku', 'description', 'category__name'
+    ).iterator(chunk_size=BATCH_SIZE)
+
+    for product_id, name, sku, description, category_name in rows:
+        yield SearchEntry(
+            kind=SearchEntry.KIND_PRODUCT,
+            object_id=product_id,
+            title=normalize(name),
+            codes=normalize(sku),
+            document=normalize(f'{name} {sku} {category_name} {description or ""}'),
+        )
+
+
+def asset_entries(queryset) -> Iterator[SearchEntry]:
+    rows = queryset.order_by().values_list(
+        'id', 'inventory_number', 'serial_number', 'product__name', 'product__sku'
+    ).iterator(chunk_size=BATCH_SIZE)
+
+    for asset_id, inventory_number, serial_number, product_name, sku in rows:
+        codes = normalize(f'{inventory_number} {serial_number or ""}')
+        yield SearchEntry(
+            kind=SearchEntry.KIND_ASSET,
+            object_id=asset_id,
+            title=normalize(f'{inventory_number} {product_name}'),
+            codes=codes,
+            document=normalize(f'{codes} {product_name} {sku}'),
+        )
+
+
+def save_entries(entries: Iterable[SearchEntry]) -> int:
+    """Upsert документов пачками; возвращает их число"""
+    saved = 0
+    entries = iter(entries)
+    while True:
+        batch: List[SearchEntry] = list(islice(entries, BATCH_SIZE))
+        if not batch:
+            break
+        SearchEntry.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['title', 'codes', 'document', 'updated_at'],
+        )
+        saved += len(batch)
+
+    if saved:
+        versioning.bump('search')
+    return saved
+
+
+def index_products(queryset) -> int:
+    return save_entries(product_entries(queryset))
+
+
+def index_assets(queryset) -> int:
+    return save_entries(asset_entries(queryset))
+
+
+def remove_entries(kind: str, object_ids: Iterable[int]):
+    SearchEntry.objects.filter(kind=kind, object_id__in=list(object_ids)).delete()
+    versioning.bump('search')
+
+
+def rebuild() -> int:
+    """Полное перестроение поисковых документов"""
+    SearchEntry.objects.all().delete()
+    count = index_products(Product.objects.all()) + index_assets(Asset.objects.all())
+    versioning.bump('search')
+    return count
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.search import indexing
+
+
+class Command(BaseCommand):
+    help = 'Полное перестроение поисковых документов товаров и техники'
+
+    def handle(self, *args, **options):
+        count = indexing.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Поисковый индекс перестроен: {count} документов'))
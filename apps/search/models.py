@@ -0,0 +1,38 @@
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """
+    Поисковый документ продукта или актива. Поддерживается сигналами
+    apps.search.signals; все текстовые поля нормализованы (нижний регистр, ё→е).
+
+    На PostgreSQL по document строится GIN-индекс to_tsvector, по codes и
+    title - триграммные GIN-индексы (apps.search.indexes, post_migrate).
+    """
+    KIND_PRODUCT = 'product'
+    KIND_ASSET = 'asset'
+    KIND_CHOICES = [
+        (KIND_PRODUCT, 'Товар'),
+        (KIND_ASSET, 'Техника'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=500, verbose_name='Заголовок')
+    codes = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name='Коды',
+        help_text='SKU, инвентарный и серийный номера через пробел'
+    )
+    document = models.TextField(verbose_name='Текст документа')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_entries'
+        verbose_name = 'Поисковый документ'
+        verbose_name_plural = 'Поисковые документы'
+        unique_together = [['kind', 'object_id']]
+
+    def __str__(self):
+        return f'{self.kind} #{self.object_id}: {self.title}'
@@ -0,0 +1,21 @@
+from typing import List, Optional, Sequence
+
+from .backends import SearchResult, get_backend
+from .models import SearchEntry
+
+
+class SearchService:
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @staticmethod
+    def search(query: str, kinds: Optional[Sequence[str]] = None,
+               limit: int = DEFAULT_LIMIT) -> List[SearchResult]:
+        """
+        Ранжированный поиск по товарам и технике: полнотекстовое совпадение,
+        префиксы слов и кодов, устойчивость к опечаткам (триграммы).
+        """
+        kinds = kinds or [kind for kind, _ in SearchEntry.KIND_CHOICES]
+        limit = max(1, min(limit, SearchService.MAX_LIMIT))
+        return get_backend().search(query, kinds, limit)
@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.assets.models import Asset
+from apps.products.models import Product
+from apps.references.models import Category
+from . import tasks
+from .models import SearchEntry
+
+
+ASSET_DOCUMENT_FIELDS = {'inventory_number', 'serial_number', 'product_id'}
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, created, update_fields=None, **kwargs):
+    # min_stock, цена и т.п. в документ не входят - переиндексация не нужна
+    if not created and not instance.changed_fields(update_fields):
+        return
+    product_id = instance.pk
+    transaction.on_commit(lambda: tasks.reindex_products.delay([product_id]))
+
+
+@receiver(post_save, sender=Asset)
+def index_asset(sender, instance, created, update_fields=None, **kwargs):
+    # Смена статуса/локации (mark_as_issued и т.п.) документ не меняет
+    if not created and not instance.changed_fields(update_fields) & ASSET_DOCUMENT_FIELDS:
+        return
+    asset_id = instance.pk
+    transaction.on_commit(lambda: tasks.reindex_assets.delay([asset_id]))
+
+
+@receiver(post_save, sender=Category)
+def index_category_products(sender, instance, created, **kwargs):
+    if created:
+        return
+    category_id = instance.pk
+    transaction.on_commit(lambda: tasks.reindex_category.delay(category_id))
+
+
+@receiver(post_delete, sender=Product)
+def remove_product(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: tasks.remove_entries.delay(SearchEntry.KIND_PRODUCT, [product_id]))
+
+
+@receiver(post_delete, sender=Asset)
+def remove_asset(sender, instance, **kwargs):
+    asset_id = instance.pk
+    transaction.on_commit(lambda: tasks.remove_entries.delay(SearchEntry.KIND_ASSET, [asset_id]))
@@ -0,0 +1,32 @@
+from typing import List
+
+from celery import shared_task
+
+from apps.assets.models import Asset
+from apps.products.models import Product
+from . import indexing
+
+
+@shared_task
+def reindex_products(product_ids: List[int]):
+    """Документы продуктов и их активов (название продукта входит в документ актива)"""
+    return (
+        indexing.index_products(Product.objects.filter(pk__in=product_ids))
+        + indexing.index_assets(Asset.objects.filter(product_id__in=product_ids))
+    )
+
+
+@shared_task
+def reindex_assets(asset_ids: List[int]):
+    return indexing.index_assets(Asset.objects.filter(pk__in=asset_ids))
+
+
+@shared_task
+def reindex_category(category_id: int):
+    """Документы продуктов категории (название категории входит в документ продукта)"""
+    return indexing.index_products(Product.objects.filter(category_id=category_id))
+
+
+@shared_task
+def remove_entries(kind: str, object_ids: List[int]):
+    indexing.remove_entries(kind, object_ids)
@@ -0,0 +1,48 @@
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import SearchEntry
+from .services import SearchService
+
+
+class SearchView(APIView):
+    """
+    Поиск по товарам и технике: ?q= (обязателен), ?kind=product|asset,
+    ?limit= (до 100).
+    """
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Параметр q обязателен'}, status=status.HTTP_400_BAD_REQUEST)
+
+        kinds = None
+        kind = request.query_params.get('kind')
+        if kind:
+            if kind not in dict(SearchEntry.KIND_CHOICES):
+                return Response({
+                    'error': 'kind должен быть product или asset'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            kinds = [kind]
+
+        try:
+            limit = int(request.query_params.get('limit', SearchService.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit должен быть числом'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = SearchService.search(query, kinds=kinds, limit=limit)
+        return Response({
+            'query': query,
+            'results': [
+                {
+                    'kind': result.kind,
+                    'id': result.object_id,
+                    'title': result.title,
+                    'codes': result.codes,
+                    'score': result.score,
+                }
+                for result in results
+            ]
+        })
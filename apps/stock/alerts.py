@@ -0,0 +1,181 @@
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, replace
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .low_stock import LowStockIndex
+from .models import Stock
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NOTIFIERS = ['apps.stock.alerts.LoggingNotifier']
+
+
+@dataclass(frozen=True)
+class StockChange:
+    """
+    Новый остаток позиции. Заполняется сервисным слоем из уже загруженных
+    объектов, поэтому проверка низкого остатка не делает запросов к БД.
+    """
+    stock_id: int
+    product_id: int
+    location_id: int
+    quantity: int
+    min_stock: int
+    product_name: str = ''
+    location_name: str = ''
+    unit: str = ''
+
+    @property
+    def is_low(self):
+        return self.quantity < self.min_stock
+
+    @classmethod
+    def build(cls, stock_id, product, location, quantity):
+        return cls(
+            stock_id=stock_id,
+            product_id=product.id,
+            location_id=location.id,
+            quantity=quantity,
+            min_stock=product.min_stock,
+            product_name=product.name,
+            location_name=location.name,
+            unit=product.unit
+        )
+
+
+class LoggingNotifier:
+    """Уведомление о низких остатках в лог - одна запись на пакет"""
+
+    def notify(self, items: List[StockChange]):
+        logger.warning(
+            'LOW STOCK WARNING: ' + '; '.join(
+                f'{item.product_name} в {item.location_name}. '
+                f'Остаток: {item.quantity} {item.unit}, минимум: {item.min_stock}'
+                for item in items
+            )
+        )
+
+
+def get_notifiers():
+    return [
+        import_string(path)()
+        for path in getattr(settings, 'STOCK_LOW_STOCK_NOTIFIERS', DEFAULT_NOTIFIERS)
+    ]
+
+
+def notify_low_stock(items: List[StockChange]):
+    for notifier in get_notifiers():
+        try:
+            notifier.notify(items)
+        except Exception:
+            logger.exception(f'Ошибка уведомления о низких остатках: {type(notifier).__name__}')
+
+
+class StockChangeBatch:
+    """
+    Изменения остатков одной транзакции. Повторные изменения одной позиции
+    схлопываются (последнее значение побеждает); после фиксации транзакции
+    индекс низких остатков обновляется одним вызовом, а уведомление
+    отправляется одним событием на весь пакет.
+
+    На транзакцию регистрируется один колбэк transaction.on_commit. Изменения
+    из откаченных вложенных savepoint'ов могли попасть в пакет, поэтому
+    перед обновлением индекса остатки перечитываются одним запросом по id.
+    Если Django отбросил колбэк при откате, пакет очищается, и следующее
+    изменение планирует новый.
+    """
+
+    def __init__(self):
+        self.changes = {}
+        self.scheduled = False
+
+    def accept(self, changes: List[StockChange]):
+        for change in changes:
+            self.changes[(change.product_id, change.location_id)] = change
+
+    def schedule(self):
+        if self.scheduled:
+            return
+        self.scheduled = True
+        hook = _FlushHook(self)
+        # Ссылку на колбэк держит только очередь on_commit: при откате
+        # Django удаляет его, и финализатор сбрасывает пакет
+        weakref.finalize(hook, self.discard)
+        transaction.on_commit(hook)
+
+    def discard(self):
+        if self.scheduled:
+            self.scheduled = False
+            self.changes = {}
+
+    def flush(self, refresh: bool = True):
+        self.scheduled = False
+        if getattr(_local, 'batch', None) is self:
+            _local.batch = None
+
+        changes = list(self.changes.values())
+        self.changes = {}
+        if refresh and changes:
+            changes = self._refresh(changes)
+        if not changes:
+            return
+
+        LowStockIndex.update_many(
+            (c.stock_id, c.product_id, c.location_id, c.quantity, c.min_stock)
+            for c in changes
+        )
+
+        low = [change for change in changes if change.is_low]
+        if low:
+            notify_low_stock(low)
+
+    @staticmethod
+    def _refresh(changes: List[StockChange]) -> List[StockChange]:
+        """Зафиксированные остатки; строки, созданные в откаченном savepoint'е, отбрасываются"""
+        quantities = dict(Stock.objects.filter(
+            id__in=[change.stock_id for change in changes]
+        ).values_list('id', 'quantity'))
+        return [
+            replace(change, quantity=quantities[change.stock_id])
+            for change in changes
+            if change.stock_id in quantities
+        ]
+
+
+class _FlushHook:
+    """Колбэк on_commit пакета; отдельный объект, чтобы отследить его удаление"""
+
+    def __init__(self, batch: StockChangeBatch):
+        self.batch = batch
+
+    def __call__(self):
+        self.batch.flush()
+
+
+_local = threading.local()
+
+
+def track_stock_changes(changes: Iterable[StockChange]):
+    """Зарегистрировать изменения остатков текущей транзакции"""
+    changes = list(changes)
+
+    if not transaction.get_connection().in_atomic_block:
+        batch = StockChangeBatch()
+        batch.accept(changes)
+        batch.flush(refresh=False)
+        return
+
+    batch = getattr(_local, 'batch', None)
+    if batch is None or not batch.scheduled:
+        batch = StockChangeBatch()
+        _local.batch = batch
+
+    batch.accept(changes)
+    batch.schedule()
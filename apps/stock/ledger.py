@@ -0,0 +1,66 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db.models import Sum
+
+from apps.writeoffs.models import WriteOff
+from .models import StockOperations
+
+
+def balance_deltas(
+    since=None,
+    until=None,
+    product_ids: Optional[Iterable[int]] = None,
+    location_id: Optional[int] = None,
+) -> Dict[Tuple[int, int], int]:
+    """
+    Изменения остатков по журналу за период (since, until].
+
+    Журнал - это StockOperations (приход/перемещение увеличивают остаток
+    to_location, расход/перемещение уменьшают остаток from_location) и
+    списания расходников WriteOff. Считается тремя агрегирующими запросами
+    с GROUP BY, без загрузки строк журнала в Python.
+
+    Returns:
+        {(product_id, location_id): delta}
+    """
+    operations = StockOperations.objects.order_by()
+    writeoffs = WriteOff.objects.filter(product__isnull=False).order_by()
+
+    if since is not None:
+        operations = operations.filter(timestamp__gt=since)
+        writeoffs = writeoffs.filter(date__gt=since)
+    if until is not None:
+        operations = operations.filter(timestamp__lte=until)
+        writeoffs = writeoffs.filter(date__lte=until)
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        operations = operations.filter(product_id__in=product_ids)
+        writeoffs = writeoffs.filter(product_id__in=product_ids)
+
+    incoming = operations.filter(to_location__isnull=False)
+    outgoing = operations.filter(from_location__isnull=False)
+
+    if location_id is not None:
+        incoming = incoming.filter(to_location_id=location_id)
+        outgoing = outgoing.filter(from_location_id=location_id)
+        writeoffs = writeoffs.filter(location_id=location_id)
+
+    deltas = defaultdict(int)
+
+    for product_id, location, total in incoming.values('product_id', 'to_location_id').annotate(
+        total=Sum('quantity')
+    ).values_list('product_id', 'to_location_id', 'total'):
+        deltas[(product_id, location)] += total
+
+    for product_id, location, total in outgoing.values('product_id', 'from_location_id').annotate(
+        total=Sum('quantity')
+    ).values_list('product_id', 'from_location_id', 'total'):
+        deltas[(product_id, location)] -= total
+
+    for product_id, location, total in writeoffs.values('product_id', 'location_id').annotate(
+        total=Sum('quantity')
+    ).values_list('product_id', 'location_id', 'total'):
+        deltas[(product_id, location)] -= total
+
+    return dict(deltas)
@@ -0,0 +1,155 @@
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from django.core.cache import cache, caches
+from django.db.models import F
+
+from .models import Stock
+
+
+logger = logging.getLogger(__name__)
+
+# (stock_id, product_id, location_id, quantity, min_stock)
+IndexEntry = Tuple[int, int, int, int, int]
+
+
+def get_redis_client():
+    """Raw-клиент Redis, если кэш по умолчанию - django_redis, иначе None"""
+    try:
+        from django_redis import get_redis_connection
+        from django_redis.cache import RedisCache
+    except ImportError:
+        return None
+
+    if isinstance(caches['default'], RedisCache):
+        return get_redis_connection('default')
+    return None
+
+
+class LowStockIndex:
+    """
+    Индекс низких остатков: hash "product_id:location_id" -> stock_id.
+
+    Поддерживается инкрементально при изменении остатков (StockService,
+    сигналы Stock/Product), поэтому /stock/low_stock/ читает k позиций
+    индекса вместо JOIN по всей таблице остатков. При пропаже индекса
+    (сброс Redis) он перестраивается полным сканированием; то же делает
+    команда rebuild_low_stock_index.
+
+    С django_redis используется Redis HASH (HSET/HDEL атомарны); с другими
+    бэкендами кэша (тесты, разработка) - словарь, хранящийся в кэше целиком.
+    """
+
+    KEY = 'stock:low_stock_index'
+    READY_KEY = 'stock:low_stock_index:ready'
+
+    @staticmethod
+    def member(product_id: int, location_id: int) -> str:
+        return f'{product_id}:{location_id}'
+
+    @classmethod
+    def update_many(cls, entries: Iterable[IndexEntry]):
+        to_set = {}
+        to_delete = []
+        for stock_id, product_id, location_id, quantity, min_stock in entries:
+            if quantity < min_stock:
+                to_set[cls.member(product_id, location_id)] = stock_id
+            else:
+                to_delete.append(cls.member(product_id, location_id))
+
+        if not to_set and not to_delete:
+            return
+
+        try:
+            client = get_redis_client()
+            if client is not None:
+                key = cache.make_key(cls.KEY)
+                pipe = client.pipeline()
+                if to_set:
+                    pipe.hset(key, mapping=to_set)
+                if to_delete:
+                    pipe.hdel(key, *to_delete)
+                pipe.execute()
+            else:
+                index = cache.get(cls.KEY, {})
+                index.update(to_set)
+                for member in to_delete:
+                    index.pop(member, None)
+                cache.set(cls.KEY, index, None)
+        except Exception:
+            # Индекс - производные данные: при недоступности кэша операция
+            # со складом не должна падать, индекс перестроится при чтении
+            logger.exception('Не удалось обновить индекс низких остатков')
+            cls.invalidate()
+
+    @classmethod
+    def update(cls, stock_id: int, product_id: int, location_id: int, quantity: int, min_stock: int):
+        cls.update_many([(stock_id, product_id, location_id, quantity, min_stock)])
+
+    @classmethod
+    def remove(cls, product_id: int, location_id: int):
+        # quantity == min_stock - позиция не считается низкой и удаляется
+        cls.update_many([(None, product_id, location_id, 0, 0)])
+
+    @classmethod
+    def reindex_product(cls, product):
+        """Пересчитать позиции продукта, например после изменения min_stock"""
+        cls.update_many(
+            (stock_id, product.id, location_id, quantity, product.min_stock)
+            for stock_id, location_id, quantity in Stock.objects.filter(
+                product=product
+            ).values_list('id', 'location_id', 'quantity')
+        )
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cache.delete(cls.READY_KEY)
+        except Exception:
+            logger.exception('Не удалось сбросить индекс низких остатков')
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Полное перестроение индекса одним запросом. Возвращает размер индекса"""
+        index = {
+            cls.member(product_id, location_id): stock_id
+            for stock_id, product_id, location_id in Stock.objects.filter(
+                quantity__lt=F('product__min_stock')
+            ).values_list('id', 'product_id', 'location_id').iterator(chunk_size=5000)
+        }
+
+        client = get_redis_client()
+        if client is not None:
+            key = cache.make_key(cls.KEY)
+            pipe = client.pipeline()
+            pipe.delete(key)
+            if index:
+                pipe.hset(key, mapping=index)
+            pipe.execute()
+        else:
+            cache.set(cls.KEY, index, None)
+
+        cache.set(cls.READY_KEY, True, None)
+        logger.info(f'Индекс низких остатков перестроен: {len(index)} позиций')
+
+        return len(index)
+
+    @classmethod
+    def stock_ids(cls) -> Optional[List[int]]:
+        """
+        id строк Stock с низким остатком. Если индекс не построен - строит его.
+        None - кэш недоступен, вызывающий код должен обратиться к БД.
+        """
+        try:
+            if not cache.get(cls.READY_KEY):
+                cls.rebuild()
+
+            client = get_redis_client()
+            if client is not None:
+                values = client.hvals(cache.make_key(cls.KEY))
+            else:
+                values = cache.get(cls.KEY, {}).values()
+            return [int(value) for value in values]
+        except Exception:
+            logger.exception('Индекс низких остатков недоступен')
+            return None
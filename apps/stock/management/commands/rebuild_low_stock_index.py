@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.stock.low_stock import LowStockIndex
+
+
+class Command(BaseCommand):
+    help = 'Полное перестроение индекса низких остатков в кэше'
+
+    def handle(self, *args, **options):
+        size = LowStockIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Индекс перестроен: {size} позиций с низким остатком'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from apps.stock.reconciliation import ReconciliationService
+
+
+class Command(BaseCommand):
+    help = 'Сверка остатков Stock с журналом операций и списаний'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Проверить все расходники, а не только измененные после прошлой сверки'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ReconciliationService.DEFAULT_BATCH_SIZE,
+            help='Количество продуктов в одной агрегирующей пачке'
+        )
+
+    def handle(self, *args, **options):
+        run = ReconciliationService.reconcile(
+            full=options['full'],
+            batch_size=options['batch_size']
+        )
+
+        for discrepancy in run.discrepancies.select_related('product', 'location'):
+            self.stdout.write(
+                f'{discrepancy.product.sku} / {discrepancy.location.name}: '
+                f'журнал {discrepancy.expected}, Stock {discrepancy.actual}'
+            )
+
+        style = self.style.WARNING if run.discrepancies_found else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Сверка #{run.id}: проверено продуктов {run.products_checked}, '
+            f'расхождений {run.discrepancies_found}'
+        ))
@@ -1,8 +1,10 @@
 from django.db import models
+from django.db.models import F, Q
 from django.core.exceptions import ValidationError
+from apps.core.models import ValidatedModel
 
 
-class Stock(models.Model):
+class Stock(ValidatedModel):
     """
     Остатки расходных материалов на складе.
     ВАЖНО: Только для продуктов с is_consumable=True
@@ -29,6 +31,12 @@ class Stock(models.Model):
         indexes = [
             models.Index(fields=['product', 'location']),
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(quantity__gte=0),
+                name='stock_quantity_non_negative'
+            ),
+        ]
 
     def clean(self):
         if self.product and not self.product.is_consumable:
@@ -39,10 +47,6 @@ class Stock(models.Model):
         if self.quantity < 0:
             raise ValidationError('Количество не может быть отрицательным')
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
-
     @property
     def is_low_stock(self):
         """Проверка низкого остатка"""
@@ -52,7 +56,7 @@ class Stock(models.Model):
         return f'{self.product.name} - {self.location.name}: {self.quantity}'
 
 
-class StockOperations(models.Model):
+class StockOperations(ValidatedModel):
     """
     История складских операций.
     ВАЖНО: Записи immutable - нельзя изменять после создания.
@@ -101,9 +105,27 @@ class StockOperations(models.Model):
         verbose_name_plural = 'Операции'
         ordering = ['-timestamp']
         indexes = [
+            models.Index(fields=['timestamp', 'id']),
             models.Index(fields=['product', 'timestamp']),
             models.Index(fields=['operation_type', 'timestamp']),
         ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(quantity__gt=0),
+                name='stock_operation_quantity_positive'
+            ),
+            models.CheckConstraint(
+                condition=(
+                    Q(operation_type='receipt', to_location__isnull=False, from_location__isnull=True)
+                    | Q(operation_type='expense', from_location__isnull=False, to_location__isnull=True)
+                    | (
+                        Q(operation_type='transfer', from_location__isnull=False, to_location__isnull=False)
+                        & ~Q(from_location=F('to_location'))
+                    )
+                ),
+                name='stock_operation_locations_match_type'
+            ),
+        ]
     
     def clean(self):
         """Валидация операции"""
@@ -132,13 +154,121 @@ class StockOperations(models.Model):
             if self.from_location == self.to_location:
                 raise ValidationError('Локации отправления и назначения должны различаться')
 
-    def save(self, force_insert=False, force_update=False, *args, **kwargs):
+    def save(self, *args, force_insert=False, **kwargs):
         # Запрет на изменение существующих записей
         if self.pk is not None and not force_insert:
             raise ValidationError('Операции нельзя изменять после создания')
 
-        self.full_clean()
-        super().save(force_insert=force_insert, force_update=force_update, *args, **kwargs)
+        super().save(*args, force_insert=force_insert, **kwargs)
 
     def __str__(self):
         return f"{self.get_operation_type_display()} - {self.product.name} ({self.quantity})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Остатки на границе периода (product, location, period_end).
+    Пишется задачей create_stock_snapshot; нулевые остатки не хранятся.
+    Остаток на произвольный момент = последний снимок + хвост операций после него.
+    """
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_snapshots'
+    )
+    location = models.ForeignKey(
+        'references.Location',
+        on_delete=models.PROTECT,
+        related_name='stock_snapshots'
+    )
+    quantity = models.IntegerField()
+    period_end = models.DateTimeField(verbose_name='Граница периода')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'stock_snapshots'
+        verbose_name = 'Снимок остатков'
+        verbose_name_plural = 'Снимки остатков'
+        unique_together = ('period_end', 'product', 'location')
+        indexes = [
+            models.Index(fields=['product', 'location', 'period_end']),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id}/{self.location_id} на {self.period_end:%Y-%m-%d %H:%M}: {self.quantity}'
+
+
+class ReconciliationRun(models.Model):
+    """
+    Запуск сверки остатков Stock с журналом операций.
+    last_operation_id / last_writeoff_id - high-water mark: следующий
+    инкрементальный запуск проверяет только продукты, затронутые после них.
+    """
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    is_full = models.BooleanField(default=False, verbose_name='Полная сверка')
+    last_operation_id = models.BigIntegerField(default=0)
+    last_writeoff_id = models.BigIntegerField(default=0)
+    products_checked = models.IntegerField(default=0)
+    discrepancies_found = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'stock_reconciliation_runs'
+        verbose_name = 'Сверка остатков'
+        verbose_name_plural = 'Сверки остатков'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f'Сверка #{self.id} ({self.started_at:%Y-%m-%d %H:%M}): {self.discrepancies_found} расхождений'
+
+
+class StockDiscrepancy(models.Model):
+    """Расхождение остатка Stock с остатком, рассчитанным по журналу"""
+    run = models.ForeignKey(
+        ReconciliationRun,
+        on_delete=models.CASCADE,
+        related_name='discrepancies'
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_discrepancies'
+    )
+    location = models.ForeignKey(
+        'references.Location',
+        on_delete=models.PROTECT,
+        related_name='stock_discrepancies'
+    )
+    expected = models.IntegerField(verbose_name='По журналу')
+    actual = models.IntegerField(verbose_name='В Stock')
+
+    class Meta:
+        db_table = 'stock_discrepancies'
+        verbose_name = 'Расхождение остатков'
+        verbose_name_plural = 'Расхождения остатков'
+
+    def __str__(self):
+        return f'{self.product_id}/{self.location_id}: журнал {self.expected}, Stock {self.actual}'
+
+
+class LowStockAlert(models.Model):
+    """
+    Последнее уведомление о низком остатке позиции. Позволяет задаче
+    check_low_stock не повторять уведомления по неизменившимся остаткам;
+    запись удаляется, когда остаток восстанавливается.
+    """
+    stock = models.OneToOneField(
+        Stock,
+        on_delete=models.CASCADE,
+        related_name='low_stock_alert'
+    )
+    quantity = models.IntegerField(verbose_name='Остаток на момент уведомления')
+    alerted_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'stock_low_stock_alerts'
+        verbose_name = 'Уведомление о низком остатке'
+        verbose_name_plural = 'Уведомления о низких остатках'
+
+    def __str__(self):
+        return f'{self.stock_id}: {self.quantity} ({self.alerted_at:%Y-%m-%d %H:%M})'
@@ -0,0 +1,123 @@
+import logging
+from typing import List, Set
+
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.products.models import Product
+from apps.writeoffs.models import WriteOff
+from .models import ReconciliationRun, Stock, StockDiscrepancy, StockOperations
+from .services import StockService
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReconciliationService:
+    """
+    Сверка остатков Stock с журналом (StockOperations + списания расходников).
+
+    Ожидаемый остаток считается как последний снимок StockSnapshot плюс
+    агрегированный хвост журнала - одним набором GROUP BY-запросов на пачку
+    продуктов. Инкрементальный запуск проверяет только продукты, по которым
+    появились операции/списания после high-water mark прошлого запуска,
+    и продукты, чьи строки Stock менялись напрямую (например, из админки).
+    """
+
+    DEFAULT_BATCH_SIZE = 500
+
+    @staticmethod
+    def get_candidate_products(previous: ReconciliationRun, last_operation_id: int,
+                               last_writeoff_id: int) -> Set[int]:
+        product_ids = set(
+            StockOperations.objects.filter(
+                id__gt=previous.last_operation_id,
+                id__lte=last_operation_id
+            ).order_by().values_list('product_id', flat=True).distinct()
+        )
+        product_ids.update(
+            WriteOff.objects.filter(
+                id__gt=previous.last_writeoff_id,
+                id__lte=last_writeoff_id,
+                product__isnull=False
+            ).order_by().values_list('product_id', flat=True).distinct()
+        )
+        product_ids.update(
+            Stock.objects.filter(
+                updated_at__gte=previous.started_at
+            ).order_by().values_list('product_id', flat=True).distinct()
+        )
+        return product_ids
+
+    @staticmethod
+    def check_batch(run: ReconciliationRun, product_ids: List[int], ts) -> List[StockDiscrepancy]:
+        expected = StockService.get_balances_at(ts, product_ids=product_ids)
+        actual = {
+            (product_id, location_id): quantity
+            for product_id, location_id, quantity in Stock.objects.filter(
+                product_id__in=product_ids
+            ).values_list('product_id', 'location_id', 'quantity')
+        }
+
+        return [
+            StockDiscrepancy(
+                run=run,
+                product_id=product_id,
+                location_id=location_id,
+                expected=expected.get((product_id, location_id), 0),
+                actual=actual.get((product_id, location_id), 0)
+            )
+            for product_id, location_id in sorted(set(expected) | set(actual))
+            if expected.get((product_id, location_id), 0) != actual.get((product_id, location_id), 0)
+        ]
+
+    @staticmethod
+    def reconcile(full: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> ReconciliationRun:
+        previous = ReconciliationRun.objects.filter(
+            finished_at__isnull=False
+        ).order_by('-started_at').first()
+
+        full = full or previous is None
+
+        # High-water mark фиксируется до начала проверки: операции, пришедшие
+        # во время сверки, попадут в следующий инкрементальный запуск
+        last_operation_id = StockOperations.objects.aggregate(value=Max('id'))['value'] or 0
+        last_writeoff_id = WriteOff.objects.aggregate(value=Max('id'))['value'] or 0
+
+        run = ReconciliationRun.objects.create(
+            is_full=full,
+            last_operation_id=last_operation_id,
+            last_writeoff_id=last_writeoff_id
+        )
+
+        if full:
+            product_ids = sorted(
+                Product.objects.filter(is_consumable=True).values_list('id', flat=True)
+            )
+        else:
+            product_ids = sorted(ReconciliationService.get_candidate_products(
+                previous, last_operation_id, last_writeoff_id
+            ))
+
+        ts = timezone.now()
+        found = 0
+
+        for start in range(0, len(product_ids), batch_size):
+            discrepancies = ReconciliationService.check_batch(
+                run, product_ids[start:start + batch_size], ts
+            )
+            StockDiscrepancy.objects.bulk_create(discrepancies, batch_size=1000)
+            found += len(discrepancies)
+
+        run.products_checked = len(product_ids)
+        run.discrepancies_found = found
+        run.finished_at = timezone.now()
+        run.save(update_fields=['products_checked', 'discrepancies_found', 'finished_at'])
+
+        log = logger.warning if found else logger.info
+        log(
+            f'Сверка остатков #{run.id} ({"полная" if full else "инкрементальная"}): '
+            f'проверено продуктов: {len(product_ids)}, расхождений: {found}'
+        )
+
+        return run
@@ -0,0 +1,183 @@
+import csv
+import os
+import re
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Stock
+
+
+REPORT_CHUNK_SIZE = 2000
+REPORT_DIR = 'reports/stock'
+REPORT_NAME_RE = re.compile(r'^stock_[\w-]+\.(csv|xlsx)$')
+FORMATS = ('csv', 'xlsx')
+
+# (поле values_list, заголовок колонки)
+REPORT_COLUMNS = [
+    ('product__sku', 'SKU'),
+    ('product__name', 'Продукт'),
+    ('product__category__name', 'Категория'),
+    ('location__name', 'Локация'),
+    ('quantity', 'Остаток'),
+    ('product__unit', 'Ед. изм.'),
+    ('product__min_stock', 'Мин. остаток'),
+    ('updated_at', 'Обновлено'),
+]
+
+
+def xlsx_available() -> bool:
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_report_queryset(filters: Optional[Dict[str, Any]] = None):
+    """
+    Остатки с продуктом/категорией/локацией плоскими кортежами.
+    Сортировка по (product_id, location_id) совпадает с уникальным индексом.
+    """
+    filters = filters or {}
+    queryset = Stock.objects.all()
+
+    if filters.get('location'):
+        queryset = queryset.filter(location_id=filters['location'])
+    if filters.get('product'):
+        queryset = queryset.filter(product_id=filters['product'])
+    if filters.get('category'):
+        queryset = queryset.filter(product__category_id=filters['category'])
+    if filters.get('low_only'):
+        queryset = queryset.filter(quantity__lt=F('product__min_stock'))
+
+    return queryset.order_by('product_id', 'location_id').values_list(
+        *[field for field, _ in REPORT_COLUMNS]
+    )
+
+
+def iter_report_rows(queryset, chunk_size: int = REPORT_CHUNK_SIZE) -> Iterator[list]:
+    """
+    Заголовок и строки отчета. iterator() использует серверный курсор
+    PostgreSQL, поэтому память не зависит от числа строк.
+    """
+    yield [title for _, title in REPORT_COLUMNS]
+
+    for row in queryset.iterator(chunk_size=chunk_size):
+        row = list(row)
+        row[-1] = timezone.localtime(row[-1]).strftime('%Y-%m-%d %H:%M')
+        yield row
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows: Iterable[list]) -> Iterator[str]:
+    """CSV построчно; BOM в начале, как у write_csv (utf-8-sig), - для Excel"""
+    yield '\ufeff'
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(path: str, rows: Iterable[list]):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as file:
+        csv.writer(file).writerows(rows)
+
+
+def write_xlsx(path: str, rows: Iterable[list]):
+    # openpyxl - необязательная зависимость: нужна только для XLSX
+    from openpyxl import Workbook
+
+    # write_only: строки сбрасываются на диск, книга не держится в памяти
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Остатки')
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def get_report_dir() -> str:
+    return os.path.join(settings.MEDIA_ROOT, REPORT_DIR)
+
+
+def get_report_path(name: str) -> Optional[str]:
+    """Путь к готовому отчету или None (в т.ч. для недопустимого имени)"""
+    if not REPORT_NAME_RE.match(name):
+        return None
+    path = os.path.join(get_report_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def list_reports():
+    directory = get_report_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    reports = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and REPORT_NAME_RE.match(entry.name):
+            stat = entry.stat()
+            reports.append({
+                'name': entry.name,
+                'size': stat.st_size,
+                'created_at': datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc),
+            })
+    return sorted(reports, key=lambda report: report['name'], reverse=True)
+
+
+def cleanup_reports(max_age_days: Optional[int] = None) -> int:
+    """
+    Удаляет отчеты старше max_age_days (по умолчанию STOCK_REPORT_MAX_AGE_DAYS)
+    и возвращает их число
+    """
+    if max_age_days is None:
+        max_age_days = settings.STOCK_REPORT_MAX_AGE_DAYS
+    directory = get_report_dir()
+    if not os.path.isdir(directory):
+        return 0
+
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.is_file() and REPORT_NAME_RE.match(entry.name) and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+def generate_report(file_format: str = 'csv', filters: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Пишет отчет в MEDIA_ROOT/reports/stock/ и возвращает имя файла.
+    Файл пишется во временный и переименовывается, чтобы скачивание
+    не могло получить недописанный отчет.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f'Неизвестный формат отчета: {file_format}')
+
+    directory = get_report_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    name = f'stock_{timezone.localtime():%Y%m%d_%H%M%S_%f}.{file_format}'
+    path = os.path.join(directory, name)
+    tmp_path = f'{path}.tmp'
+
+    rows = iter_report_rows(get_report_queryset(filters))
+    writer = write_xlsx if file_format == 'xlsx' else write_csv
+
+    try:
+        writer(tmp_path, rows)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return name
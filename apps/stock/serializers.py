@@ -1,6 +1,13 @@
+from datetime import datetime, time
+
+from django.utils import timezone
 from rest_framework import serializers
 from apps.references.models import Location
 from apps.products.models import Product
+from apps.core.serializers import (
+    BulkModeSerializer, CachedPrimaryKeyRelatedField, ValuesSerializer,
+    choice_labels, datetime_to_representation
+)
 from .models import Stock, StockOperations
 
 
@@ -21,6 +28,30 @@ class StockSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'quantity', 'created_at', 'updated_at'
         ]
+
+
+class StockValuesSerializer(ValuesSerializer):
+    """Быстрый путь StockSerializer для списков"""
+    values = (
+        'id', 'product_id', 'product__name', 'product__sku', 'product__unit',
+        'product__min_stock', 'location_id', 'location__name', 'quantity',
+        'created_at', 'updated_at',
+    )
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'product': row['product_id'],
+            'product_name': row['product__name'],
+            'product_sku': row['product__sku'],
+            'location': row['location_id'],
+            'location_name': row['location__name'],
+            'quantity': row['quantity'],
+            'unit': row['product__unit'],
+            'is_low_stock': row['quantity'] < row['product__min_stock'],
+            'created_at': datetime_to_representation(row['created_at']),
+            'updated_at': datetime_to_representation(row['updated_at']),
+        }
     
 
 class StockOperationSerializer(serializers.ModelSerializer):
@@ -42,11 +73,38 @@ class StockOperationSerializer(serializers.ModelSerializer):
         ]
 
 
+class StockOperationValuesSerializer(ValuesSerializer):
+    """Быстрый путь StockOperationSerializer для списков"""
+    values = (
+        'id', 'product_id', 'product__name', 'operation_type', 'quantity',
+        'from_location_id', 'to_location_id', 'comment', 'timestamp',
+    )
+    operation_labels = choice_labels(StockOperations.OperationChoices.choices)
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'product': row['product_id'],
+            'product_name': row['product__name'],
+            'operation_type': row['operation_type'],
+            'operation_type_display': self.operation_labels.get(
+                row['operation_type'], row['operation_type']
+            ),
+            'quantity': row['quantity'],
+            'from_location': row['from_location_id'],
+            'to_location': row['to_location_id'],
+            'comment': row['comment'],
+            'timestamp': datetime_to_representation(row['timestamp']),
+        }
+
+
 class ReceiptSerializer(serializers.Serializer):
-    product = serializers.PrimaryKeyRelatedField(
+    product = CachedPrimaryKeyRelatedField(
+        resource='products',
         queryset = Product.objects.filter(is_consumable=True)
     )
-    location = serializers.PrimaryKeyRelatedField(
+    location = CachedPrimaryKeyRelatedField(
+        resource='locations',
         queryset = Location.objects.all()
     )
     quantity = serializers.IntegerField(min_value=1)
@@ -54,10 +112,12 @@ class ReceiptSerializer(serializers.Serializer):
     
 
 class ExpenseSerializer(serializers.Serializer):
-    product = serializers.PrimaryKeyRelatedField(
+    product = CachedPrimaryKeyRelatedField(
+        resource='products',
         queryset = Product.objects.filter(is_consumable=True)
     )
-    location = serializers.PrimaryKeyRelatedField(
+    location = CachedPrimaryKeyRelatedField(
+        resource='locations',
         queryset = Location.objects.all()
     )
     quantity = serializers.IntegerField(min_value=1)
@@ -65,13 +125,16 @@ class ExpenseSerializer(serializers.Serializer):
 
 
 class TransferSerializer(serializers.Serializer):
-    product = serializers.PrimaryKeyRelatedField(
+    product = CachedPrimaryKeyRelatedField(
+        resource='products',
         queryset = Product.objects.filter(is_consumable=True)
     )
-    from_location = serializers.PrimaryKeyRelatedField(
+    from_location = CachedPrimaryKeyRelatedField(
+        resource='locations',
         queryset = Location.objects.all()
     )
-    to_location = serializers.PrimaryKeyRelatedField(
+    to_location = CachedPrimaryKeyRelatedField(
+        resource='locations',
         queryset = Location.objects.all()
     )
     quantity = serializers.IntegerField(min_value=1)
@@ -89,3 +152,67 @@ class TransferSerializer(serializers.Serializer):
         return attrs
     
     
+class BulkOperationLineSerializer(serializers.Serializer):
+    """
+    Строка пакетной операции. Связанные объекты передаются id и проверяются
+    сервисом одним запросом на весь пакет (in_bulk), а не запросом на строку.
+    """
+    operation_type = serializers.ChoiceField(
+        choices=StockOperations.OperationChoices.choices
+    )
+    product = serializers.IntegerField(min_value=1)
+    location = serializers.IntegerField(min_value=1, required=False)
+    from_location = serializers.IntegerField(min_value=1, required=False)
+    to_location = serializers.IntegerField(min_value=1, required=False)
+    quantity = serializers.IntegerField(min_value=1)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        operation_type = attrs['operation_type']
+
+        if operation_type == StockOperations.OperationChoices.TRANSFER:
+            if not attrs.get('from_location') or not attrs.get('to_location'):
+                raise serializers.ValidationError(
+                    'Для перемещения необходимы from_location и to_location'
+                )
+            if attrs['from_location'] == attrs['to_location']:
+                raise serializers.ValidationError(
+                    'Локации отправления и назначения должны различаться'
+                )
+        elif not attrs.get('location'):
+            raise serializers.ValidationError(
+                'Для прихода и расхода необходимо указать location'
+            )
+
+        return attrs
+
+
+class BulkOperationSerializer(BulkModeSerializer):
+    MAX_LINES = 10000
+
+
+class StockAsOfQuerySerializer(serializers.Serializer):
+    """Параметры /stock/as-of/: дата (на конец дня) или ISO datetime и локация"""
+    date = serializers.CharField()
+    location = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_date(self, value):
+        try:
+            day = serializers.DateField().to_internal_value(value)
+        except serializers.ValidationError:
+            pass
+        else:
+            return timezone.make_aware(datetime.combine(day, time.max))
+
+        try:
+            return serializers.DateTimeField().to_internal_value(value)
+        except serializers.ValidationError:
+            raise serializers.ValidationError('Ожидается YYYY-MM-DD или ISO datetime')
+
+
+class StockReportFilterSerializer(serializers.Serializer):
+    """Фильтры выгрузки остатков (export и POST /stock/reports/)"""
+    location = serializers.IntegerField(min_value=1, required=False)
+    product = serializers.IntegerField(min_value=1, required=False)
+    category = serializers.IntegerField(min_value=1, required=False)
+    low_only = serializers.BooleanField(required=False, default=False)
@@ -1,13 +1,17 @@
 import logging
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-from .models import Stock, StockOperations
+from .models import Stock, StockOperations, StockSnapshot
+from .ledger import balance_deltas
+from .alerts import StockChange, track_stock_changes
 from apps.products.models import Product
 from apps.references.models import Location
+from apps.core import versioning
+from apps.core.exceptions import InsufficientStockError
 from django.db.models import F
 
 
@@ -15,6 +19,107 @@ logger = logging.getLogger(__name__)
 
 class StockService:
     
+    @staticmethod
+    def increase_stock(product: Product, location: Location, quantity: int) -> int:
+        """
+        Атомарно увеличивает остаток: UPDATE ... SET quantity = quantity + n.
+        Если строки остатка еще нет - создает ее. Возвращает новый остаток.
+        Вызывать внутри transaction.atomic.
+        """
+        updated = Stock.objects.filter(
+            product=product,
+            location=location
+        ).update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+
+        if not updated:
+            try:
+                # Savepoint: параллельная транзакция могла создать строку раньше нас
+                with transaction.atomic():
+                    stock = Stock.create_trusted(
+                        product=product,
+                        location=location,
+                        quantity=quantity
+                    )
+                StockService._track_change(product, location, stock.id, quantity)
+                return quantity
+            except IntegrityError:
+                Stock.objects.filter(
+                    product=product,
+                    location=location
+                ).update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+
+        stock_id, new_quantity = StockService._get_stock_row(product, location)
+        StockService._track_change(product, location, stock_id, new_quantity)
+        return new_quantity
+
+    @staticmethod
+    def decrease_stock(product: Product, location: Location, quantity: int) -> int:
+        """
+        Атомарно уменьшает остаток условным UPDATE:
+        UPDATE ... SET quantity = quantity - n WHERE quantity >= n.
+        Недостаток определяется по числу затронутых строк, а не по значению,
+        прочитанному заранее в Python. Возвращает новый остаток.
+        Вызывать внутри transaction.atomic.
+
+        Raises:
+            InsufficientStockError: остатка нет или его недостаточно
+        """
+        updated = Stock.objects.filter(
+            product=product,
+            location=location,
+            quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity, updated_at=timezone.now())
+
+        stock_id, available = StockService._get_stock_row(product, location)
+
+        if updated:
+            StockService._track_change(product, location, stock_id, available)
+            return available
+
+        if stock_id is None:
+            raise InsufficientStockError(
+                f'Товар "{product.name}" отсутствует в локации "{location}". '
+                f'Доступное количество: 0'
+            )
+
+        raise InsufficientStockError(
+            f'Недостаточное количество товара "{product.name}" в локации "{location}". '
+            f'Доступно: {available}, запрошено: {quantity}'
+        )
+
+    @staticmethod
+    def lock_stock(product: Product, *locations: Location) -> None:
+        """
+        Блокирует строки остатков (SELECT ... FOR UPDATE) в детерминированном
+        порядке location_id, чтобы встречные перемещения A→B и B→A не
+        взаимоблокировались.
+        """
+        list(
+            Stock.objects.select_for_update().filter(
+                product=product,
+                location__in=locations
+            ).order_by('location_id').values_list('id', flat=True)
+        )
+
+    @staticmethod
+    def _get_stock_row(product: Product, location: Location):
+        """(id, quantity) строки остатка или (None, 0)"""
+        row = Stock.objects.filter(
+            product=product,
+            location=location
+        ).values_list('id', 'quantity').first()
+        return row or (None, 0)
+
+    @staticmethod
+    def _track_change(product: Product, location: Location, stock_id: int, quantity: int):
+        """
+        Передать новый остаток в post-commit хук: индекс и уведомления о
+        низких остатках строятся из уже загруженных объектов, без запросов
+        """
+        track_stock_changes([StockChange.build(stock_id, product, location, quantity)])
+        # UPDATE через QuerySet не порождает сигналов - версию меняем явно
+        versioning.bump('stock')
+
     @staticmethod
     @transaction.atomic
     def create_receipt(product: Product, location: Location, quantity: int, comment: str):
@@ -25,7 +130,7 @@ class StockService:
                 f'Продукт "{product.name}" не является расходником.'
             )
         
-        operation = StockOperations.objects.create(
+        operation = StockOperations.create_trusted(
             product=product,
             operation_type=StockOperations.OperationChoices.RECEIPT,
             quantity=quantity,
@@ -33,19 +138,11 @@ class StockService:
             comment=comment
         )
         
-        stock, created = Stock.objects.get_or_create(
-            product=product,
-            location=location,
-            defaults={'quantity': 0}
-        )
-        
-        stock.quantity += quantity
-        
-        stock.save()
+        new_quantity = StockService.increase_stock(product, location, quantity)
         
         logger.info(
             f'Приход: {product.name} ({product.sku}) - {quantity} {product.unit} '
-            f'на склад {location.name}. Новый остаток: {stock.quantity}. '
+            f'на склад {location.name}. Новый остаток: {new_quantity}. '
             f'Операция ID: {operation.id}'
         )
         
@@ -63,23 +160,11 @@ class StockService:
             )
         
         try:
-            stock = Stock.objects.get(
-                product=product,
-                location=location
-            )
-        except Stock.DoesNotExist:
-            raise ValidationError(
-                f'Товар "{product.name}" отсутствует в локации "{location}". '
-                f'Доступное количество: 0'
-            )
+            new_quantity = StockService.decrease_stock(product, location, quantity)
+        except InsufficientStockError as e:
+            raise ValidationError(str(e))
         
-        if stock.quantity < quantity:
-            raise ValidationError(
-                f'Недостаточное количество товара "{product.name}" в локации "{location}". '
-                f'Доступно: {stock.quantity}, запрошено: {quantity}'
-            )
-        
-        operation = StockOperations.objects.create(
+        operation = StockOperations.create_trusted(
             product=product,
             operation_type=StockOperations.OperationChoices.EXPENSE,
             quantity=quantity,
@@ -87,14 +172,10 @@ class StockService:
             comment=comment
         )
         
-        stock.quantity -= quantity
-        
-        stock.save(update_fields=['quantity'])
-        
         logger.info(
             f'Expense operation created: {quantity} units of "{product.name}" '
             f'from location "{location}". '
-            f'Remaining stock: {stock.quantity}. '
+            f'Remaining stock: {new_quantity}. '
             f'Operation ID: {operation.id}'
         )
         
@@ -118,25 +199,14 @@ class StockService:
         if from_location == to_location:
             raise ValidationError('Локации не должны совпадать при перемещении')
         
-
-
+        StockService.lock_stock(product, from_location, to_location)
+        
         try:
-            from_stock = Stock.objects.get(
-                product=product,
-                location=from_location
-            )
-        except Stock.DoesNotExist:
-            raise ValidationError(
-                f'Товар "{product.name}" отсутствует в локации "{from_location}"'
-            )
+            StockService.decrease_stock(product, from_location, quantity)
+        except InsufficientStockError as e:
+            raise ValidationError(str(e))
             
-        if from_stock.quantity < quantity:
-            raise ValidationError(
-                f'Недостаточное количество товара. '
-                f'Доступно: {from_stock.quantity}, запрошено: {quantity}'
-            )
-            
-        operation = StockOperations.objects.create(
+        operation = StockOperations.create_trusted(
             product=product,
             operation_type=StockOperations.OperationChoices.TRANSFER,
             quantity=quantity,
@@ -145,18 +215,7 @@ class StockService:
             comment=comment
         )
         
-        from_stock.quantity -= quantity
-        from_stock.save()
-        
-        to_stock, created = Stock.objects.get_or_create(
-            product=product,
-            location=to_location,
-            defaults={'quantity': 0}
-        )
-        
-        to_stock.quantity += quantity
-        
-        to_stock.save()
+        StockService.increase_stock(product, to_location, quantity)
         
         logger.info(
             f'Transfer created: {quantity} units of {product.name} '
@@ -165,6 +224,182 @@ class StockService:
         
         return operation
         
+    @staticmethod
+    @transaction.atomic
+    def apply_batch(lines: List[Dict[str, Any]], atomic: bool = True) -> Dict[str, Any]:
+        """
+        Пакетное применение приходов, расходов и перемещений.
+
+        Каждая строка - словарь с ключами operation_type, product (id),
+        location или from_location/to_location (id), quantity, comment.
+        Продукты и локации загружаются одним in_bulk на пакет, остатки
+        блокируются одним SELECT ... FOR UPDATE, операции пишутся одним
+        bulk_create, остатки - одним bulk_update (недостающие строки
+        остатков создаются через _lock_new_stocks).
+
+        atomic=True: при любой ошибке ничего не применяется.
+        atomic=False (best-effort): применяются все корректные строки.
+
+        Returns:
+            {'applied': int, 'operations': [id, ...], 'errors': [{'line': i, 'error': str}, ...]}
+        """
+        OperationChoices = StockOperations.OperationChoices
+
+        product_ids = {line['product'] for line in lines}
+        location_ids = set()
+        for line in lines:
+            for key in ('location', 'from_location', 'to_location'):
+                if line.get(key):
+                    location_ids.add(line[key])
+
+        products = Product.objects.in_bulk(product_ids)
+        locations = Location.objects.in_bulk(location_ids)
+
+        stocks = {
+            (stock.product_id, stock.location_id): stock
+            for stock in Stock.objects.select_for_update().filter(
+                product_id__in=product_ids,
+                location_id__in=location_ids
+            ).order_by('product_id', 'location_id')
+        }
+        balances = {key: stock.quantity for key, stock in stocks.items()}
+
+        operations = []
+        errors = []
+
+        for index, line in enumerate(lines):
+            product = products.get(line['product'])
+            quantity = line['quantity']
+            operation_type = line['operation_type']
+
+            if product is None:
+                errors.append({'line': index, 'error': f'Продукт {line["product"]} не найден'})
+                continue
+
+            if not product.is_consumable:
+                errors.append({
+                    'line': index,
+                    'error': f'Продукт "{product.name}" не является расходником.'
+                })
+                continue
+
+            if operation_type == OperationChoices.TRANSFER:
+                location_keys = ('from_location', 'to_location')
+            else:
+                location_keys = ('location',)
+
+            missing = [str(line.get(key)) for key in location_keys if line.get(key) not in locations]
+            if missing:
+                errors.append({
+                    'line': index,
+                    'error': f'Локация {", ".join(missing)} не найдена'
+                })
+                continue
+
+            if operation_type == OperationChoices.TRANSFER:
+                from_location = locations[line['from_location']]
+                to_location = locations[line['to_location']]
+            elif operation_type == OperationChoices.RECEIPT:
+                from_location = None
+                to_location = locations[line['location']]
+            else:
+                from_location = locations[line['location']]
+                to_location = None
+
+            if from_location is not None:
+                key = (product.id, from_location.id)
+                available = balances.get(key, 0)
+                if available < quantity:
+                    errors.append({
+                        'line': index,
+                        'error': (
+                            f'Недостаточное количество товара "{product.name}" '
+                            f'в локации "{from_location}". '
+                            f'Доступно: {available}, запрошено: {quantity}'
+                        )
+                    })
+                    continue
+                balances[key] = available - quantity
+
+            if to_location is not None:
+                key = (product.id, to_location.id)
+                balances[key] = balances.get(key, 0) + quantity
+
+            operations.append(StockOperations(
+                product=product,
+                operation_type=operation_type,
+                quantity=quantity,
+                from_location=from_location,
+                to_location=to_location,
+                comment=line.get('comment', '')
+            ))
+
+        if errors and atomic:
+            return {'applied': 0, 'operations': [], 'errors': errors}
+
+        if operations:
+            StockOperations.objects.bulk_create(operations, batch_size=1000)
+
+            missing = [key for key in balances if key not in stocks]
+            if missing:
+                StockService._lock_new_stocks(missing, stocks, balances)
+
+            now = timezone.now()
+            changed = []
+            for key, quantity in balances.items():
+                stock = stocks[key]
+                if stock.quantity != quantity:
+                    stock.quantity = quantity
+                    stock.updated_at = now
+                    changed.append(stock)
+
+            Stock.objects.bulk_update(changed, ['quantity', 'updated_at'], batch_size=1000)
+
+            track_stock_changes([
+                StockChange.build(
+                    stock.id, products[stock.product_id], locations[stock.location_id], stock.quantity
+                )
+                for stock in changed
+            ])
+            versioning.bump('stock')
+
+        logger.info(
+            f'Batch applied: {len(operations)} operations, {len(errors)} errors '
+            f'(mode: {"atomic" if atomic else "best-effort"})'
+        )
+
+        return {
+            'applied': len(operations),
+            'operations': [operation.id for operation in operations],
+            'errors': errors
+        }
+
+    @staticmethod
+    def _lock_new_stocks(keys: List[tuple], stocks: Dict[tuple, Stock], balances: Dict[tuple, int]):
+        """
+        Строки остатков, которых не было при блокировке пакета. Параллельная
+        транзакция могла вставить тот же (product, location) после нашего
+        SELECT ... FOR UPDATE, поэтому пустые строки вставляются с
+        ignore_conflicts и перечитываются под блокировкой. Баланс по таким
+        ключам считался от нуля - к нему прибавляется фактический остаток.
+        """
+        Stock.objects.bulk_create(
+            [Stock(product_id=product_id, location_id=location_id, quantity=0)
+             for product_id, location_id in keys],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+        keys = set(keys)
+        for stock in Stock.objects.select_for_update().filter(
+            product_id__in={product_id for product_id, _ in keys},
+            location_id__in={location_id for _, location_id in keys}
+        ).order_by('product_id', 'location_id'):
+            key = (stock.product_id, stock.location_id)
+            if key in keys:
+                stocks[key] = stock
+                balances[key] += stock.quantity
+
     @staticmethod
     def get_current_stock(product: Product, location: Location) -> int:
         try:
@@ -182,13 +417,102 @@ class StockService:
         return Stock.objects.filter(
             quantity__lt=F('product__min_stock')
         ).select_related('product', 'location')
-        
 
+    @staticmethod
+    def get_snapshot_boundary(ts):
+        """Ближайшая к ts (не позже) граница снимка или None"""
+        return StockSnapshot.objects.filter(
+            period_end__lte=ts
+        ).order_by('-period_end').values_list('period_end', flat=True).first()
 
-            
-                
-           
+    @staticmethod
+    def get_balance_at(product: Product, location: Location, ts) -> int:
+        """
+        Остаток на момент ts: ближайший снимок + операции после него.
+        Стоимость - O(хвост после снимка), а не O(вся история).
+        """
+        boundary = StockService.get_snapshot_boundary(ts)
+        quantity = 0
 
+        if boundary is not None:
+            quantity = StockSnapshot.objects.filter(
+                period_end=boundary,
+                product=product,
+                location=location
+            ).values_list('quantity', flat=True).first() or 0
 
-        
+        tail = balance_deltas(
+            since=boundary, until=ts,
+            product_ids=[product.id], location_id=location.id
+        )
+        return quantity + tail.get((product.id, location.id), 0)
+
+    @staticmethod
+    def get_balances_at(
+        ts,
+        location: Optional[Location] = None,
+        product_ids: Optional[List[int]] = None) -> Dict[tuple, int]:
+        """
+        Остатки всего склада (или одной локации / набора продуктов) на момент ts:
+        строки снимка + агрегированный хвост операций.
+
+        Returns:
+            {(product_id, location_id): quantity} без нулевых остатков
+        """
+        boundary = StockService.get_snapshot_boundary(ts)
+        balances = {}
+
+        if boundary is not None:
+            snapshot = StockSnapshot.objects.filter(period_end=boundary)
+            if location is not None:
+                snapshot = snapshot.filter(location=location)
+            if product_ids is not None:
+                snapshot = snapshot.filter(product_id__in=product_ids)
+            balances = {
+                (product_id, location_id): quantity
+                for product_id, location_id, quantity in snapshot.values_list(
+                    'product_id', 'location_id', 'quantity'
+                ).iterator(chunk_size=5000)
+            }
+
+        tail = balance_deltas(
+            since=boundary, until=ts,
+            product_ids=product_ids,
+            location_id=location.id if location is not None else None
+        )
+        for key, delta in tail.items():
+            balances[key] = balances.get(key, 0) + delta
+
+        return {key: quantity for key, quantity in balances.items() if quantity}
+
+    @staticmethod
+    @transaction.atomic
+    def create_snapshot(period_end) -> int:
+        """
+        Записывает снимок остатков на границу period_end из предыдущего
+        снимка и операций между ними. Повторный вызов для той же границы
+        ничего не делает. Возвращает число записанных строк.
+        """
+        if StockSnapshot.objects.filter(period_end=period_end).exists():
+            return 0
+
+        balances = StockService.get_balances_at(period_end)
+
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(
+                    product_id=product_id,
+                    location_id=location_id,
+                    quantity=quantity,
+                    period_end=period_end
+                )
+                for (product_id, location_id), quantity in balances.items()
+            ],
+            batch_size=5000
+        )
+
+        logger.info(
+            f'Снимок остатков на {period_end:%Y-%m-%d %H:%M}: {len(balances)} позиций'
+        )
 
+        return len(balances)
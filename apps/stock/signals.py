@@ -1,6 +1,10 @@
 import logging
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from apps.products.models import Product
+from .alerts import StockChange, track_stock_changes
+from .low_stock import LowStockIndex
 from .models import Stock
 
 logger = logging.getLogger(__name__)
@@ -8,9 +12,25 @@ logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Stock)
 def check_low_stock_after_save(sender, instance, **kwargs):
-    if instance.is_low_stock:
-        logger.warning(
-            f'LOW STOCK WARNING: {instance.product.name} в {instance.location.name}. '
-            f'Остаток: {instance.quantity} {instance.product.unit}, минимум: {instance.product.min_stock}'
-        )
-    
+    """
+    Прямые сохранения Stock (админка, create_trusted). Сервисный слой
+    передает изменения сам через track_stock_changes, а bulk_update и
+    QuerySet.update() сигналов не порождают.
+    """
+    track_stock_changes([
+        StockChange.build(instance.id, instance.product, instance.location, instance.quantity)
+    ])
+
+
+@receiver(post_delete, sender=Stock)
+def remove_from_low_stock_index(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: LowStockIndex.remove(instance.product_id, instance.location_id)
+    )
+
+
+@receiver(post_save, sender=Product)
+def reindex_low_stock_on_product_save(sender, instance, created, **kwargs):
+    # min_stock мог измениться - пересчитать позиции продукта в индексе
+    if instance.is_consumable and not created:
+        transaction.on_commit(lambda: LowStockIndex.reindex_product(instance))
@@ -1,14 +1,140 @@
-from celery import shared_task
+import logging
+from collections import defaultdict
+from datetime import datetime, time
+from itertools import islice
+
+from celery import group, shared_task
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .alerts import StockChange, notify_low_stock
+from .models import LowStockAlert, Stock
+from .services import StockService
+from .reconciliation import ReconciliationService
+from .reports import cleanup_reports, generate_report
+
+
+logger = logging.getLogger(__name__)
+
+
+LOW_STOCK_CHUNK_SIZE = 2000
+
+LOW_STOCK_FIELDS = (
+    'id', 'product_id', 'product__name', 'product__unit', 'product__min_stock',
+    'product__category_id',
+    'location_id', 'location__name', 'quantity',
+)
 
 
 @shared_task
-def check_low_stock():
-    """Проверка низких остатков и отправка уведомлений"""
-    pass
+def check_low_stock(chunk_size=LOW_STOCK_CHUNK_SIZE):
+    """
+    Проверка низких остатков и отправка уведомлений.
+
+    Низкие остатки читаются потоком (values_list + iterator), без создания
+    моделей. По каждой пачке одним запросом загружается состояние последних
+    уведомлений: позиции, остаток которых не изменился с прошлого
+    уведомления, пропускаются. Новые уведомления группируются по
+    (локация, категория) и рассылаются параллельными подзадачами.
+    """
+    rows = Stock.objects.filter(
+        quantity__lt=F('product__min_stock')
+    ).order_by().values_list(*LOW_STOCK_FIELDS, named=True).iterator(chunk_size=chunk_size)
+
+    groups = defaultdict(list)
+    total = 0
+    now = timezone.now()
+
+    for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+        total += len(chunk)
+        alerted = dict(
+            LowStockAlert.objects.filter(
+                stock_id__in=[row.id for row in chunk]
+            ).values_list('stock_id', 'quantity')
+        )
+        changed = [row for row in chunk if alerted.get(row.id) != row.quantity]
+
+        LowStockAlert.objects.bulk_create(
+            [LowStockAlert(stock_id=row.id, quantity=row.quantity, alerted_at=now) for row in changed],
+            update_conflicts=True,
+            unique_fields=['stock'],
+            update_fields=['quantity', 'alerted_at']
+        )
+
+        for row in changed:
+            key = (row.location_id, row.product__category_id)
+            groups[key].append({
+                'stock_id': row.id,
+                'product_id': row.product_id,
+                'location_id': row.location_id,
+                'quantity': row.quantity,
+                'min_stock': row.product__min_stock,
+                'product_name': row.product__name,
+                'location_name': row.location__name,
+                'unit': row.product__unit,
+            })
+
+    # Восстановившиеся позиции снова уведомят при следующем падении остатка
+    LowStockAlert.objects.filter(
+        stock__quantity__gte=F('stock__product__min_stock')
+    ).delete()
+
+    if groups:
+        group(
+            send_low_stock_notification.s(items)
+            for items in groups.values()
+        ).apply_async()
+
+    notified = sum(len(items) for items in groups.values())
+    logger.info(
+        f'Проверка низких остатков: {total} позиций, '
+        f'новых уведомлений {notified} в {len(groups)} группах'
+    )
+
+    return {'low_stock': total, 'notified': notified, 'groups': len(groups)}
+
+
+@shared_task
+def send_low_stock_notification(items):
+    """Уведомление по одной группе (локация, категория) низких остатков"""
+    notify_low_stock([StockChange(**item) for item in items])
 
 @shared_task
-def generate_stock_report():
-    """Генерация ежедневного отчета по остаткам на складе"""
-    pass
+def generate_stock_report(file_format='csv', filters=None):
+    """
+    Генерация отчета по остаткам на складе.
 
+    Строки читаются потоком с серверного курсора и сразу пишутся в файл
+    (CSV или XLSX в режиме write_only). Возвращает имя файла, по которому
+    отчет скачивается через /api/v1/stock/reports/<name>/. Заодно удаляются
+    отчеты старше STOCK_REPORT_MAX_AGE_DAYS.
+    """
+    name = generate_report(file_format, filters)
+    removed = cleanup_reports()
+    logger.info(f'Stock report generated: {name}, old reports removed: {removed}')
+    return name
 
+
+@shared_task
+def create_stock_snapshot(period_end=None):
+    """
+    Снимок остатков на границу периода (по умолчанию - начало текущих суток).
+    Запускается с небольшой задержкой после границы, чтобы успели
+    зафиксироваться транзакции, начатые до нее.
+    """
+    if period_end is None:
+        period_end = timezone.make_aware(
+            datetime.combine(timezone.localdate(), time.min)
+        )
+    elif isinstance(period_end, str):
+        period_end = parse_datetime(period_end)
+
+    return StockService.create_snapshot(period_end)
+
+
+@shared_task
+def reconcile_stock(full=False):
+    """Ночная инкрементальная сверка остатков с журналом"""
+    run = ReconciliationService.reconcile(full=full)
+    return {'run': run.id, 'discrepancies': run.discrepancies_found}
@@ -2,36 +2,154 @@ from rest_framework import status, viewsets
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.http import FileResponse, Http404, StreamingHttpResponse
+
+from apps.core.mixins import BulkActionMixin, ConditionalGetMixin, ListActionMixin
+from apps.core.pagination import LedgerCursorPagination
+from apps.products.models import Product
+from apps.references.models import Location
 
 from .models import Stock, StockOperations
 from .services import StockService
+from .low_stock import LowStockIndex
+from . import reports
+from .tasks import generate_stock_report
 from .serializers import (
     StockSerializer, StockOperationSerializer,
+    StockValuesSerializer, StockOperationValuesSerializer,
     ReceiptSerializer, ExpenseSerializer,
-    TransferSerializer
+    TransferSerializer, BulkOperationSerializer,
+    BulkOperationLineSerializer, StockAsOfQuerySerializer,
+    StockReportFilterSerializer
 )
 
 
-class StockViewSet(viewsets.ReadOnlyModelViewSet):
+class StockViewSet(ConditionalGetMixin, ListActionMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Stock.objects.select_related('product', 'location').all()
     serializer_class = StockSerializer
+    values_serializer_class = StockValuesSerializer
+    version_resources = ('stock', 'products', 'locations')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['product', 'location']
     
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
-        queryset = StockService.get_low_stock_items()
-        serializer = self.get_serializer(queryset, many=True)
-        
-        return Response(serializer.data)
+        stock_ids = LowStockIndex.stock_ids()
+
+        if stock_ids is None:
+            queryset = StockService.get_low_stock_items()
+        else:
+            # Повторная проверка условия по k строкам индекса (поиск по PK)
+            # отсекает позиции, устаревшие в индексе
+            queryset = StockService.get_low_stock_items().filter(id__in=stock_ids)
+
+        return self.list_response(queryset, StockValuesSerializer)
+
+    @action(detail=False, methods=['get'], url_path='as-of')
+    def as_of(self, request):
+        """
+        Остатки склада на дату: ?date=YYYY-MM-DD (на конец дня) или ISO datetime.
+        Необязательный ?location= ограничивает одной локацией.
+        """
+        serializer = StockAsOfQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        ts = serializer.validated_data['date']
+
+        location = None
+        if serializer.validated_data.get('location'):
+            location = Location.objects.filter(pk=serializer.validated_data['location']).first()
+            if location is None:
+                return Response({'error': 'Локация не найдена'}, status=status.HTTP_404_NOT_FOUND)
+
+        balances = StockService.get_balances_at(ts, location=location)
+
+        products = Product.objects.in_bulk({product_id for product_id, _ in balances})
+        locations = Location.objects.in_bulk({location_id for _, location_id in balances})
+
+        results = [
+            {
+                'product': product_id,
+                'product_name': products[product_id].name,
+                'product_sku': products[product_id].sku,
+                'location': location_id,
+                'location_name': locations[location_id].name,
+                'quantity': quantity,
+                'unit': products[product_id].unit,
+            }
+            for (product_id, location_id), quantity in sorted(balances.items())
+        ]
+
+        return Response({'as_of': ts, 'results': results})
+
+    @staticmethod
+    def _report_filters(params):
+        serializer = StockReportFilterSerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+        return dict(serializer.validated_data)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Синхронная CSV-выгрузка остатков для небольших выборок
+        (?location=, ?product=, ?category=, ?low_only=true).
+        Большие выборки формируются асинхронно через POST /stock/reports/.
+        """
+        queryset = reports.get_report_queryset(self._report_filters(request.query_params))
+
+        limit = settings.STOCK_REPORT_SYNC_LIMIT
+        if queryset.count() > limit:
+            return Response({
+                'error': f'Выборка больше {limit} строк, используйте POST /stock/reports/'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            reports.stream_csv(reports.iter_report_rows(queryset)),
+            content_type='text/csv; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'attachment; filename="stock.csv"'
+        return response
+
+    @action(detail=False, methods=['get', 'post'], url_path='reports')
+    def report_list(self, request):
+        """
+        GET - список готовых отчетов, POST - постановка генерации в очередь
+        (file_format: csv|xlsx и те же фильтры, что у export).
+        """
+        if request.method == 'GET':
+            return Response(reports.list_reports())
+
+        file_format = request.data.get('file_format', 'csv')
+        if file_format not in reports.FORMATS:
+            return Response({
+                'error': f'Формат должен быть одним из: {", ".join(reports.FORMATS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if file_format == 'xlsx' and not reports.xlsx_available():
+            return Response({
+                'error': 'Формат xlsx недоступен: не установлен openpyxl'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        result = generate_stock_report.delay(file_format, self._report_filters(request.data))
+        return Response({'task_id': result.id}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'reports/(?P<name>[^/]+)')
+    def download_report(self, request, name=None):
+        path = reports.get_report_path(name)
+        if path is None:
+            raise Http404('Отчет не найден')
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
     
 
-class StockOperationViewSet(viewsets.ReadOnlyModelViewSet):
+class StockOperationViewSet(BulkActionMixin, ListActionMixin, viewsets.ReadOnlyModelViewSet):
     queryset = StockOperations.objects.select_related(
         'product', 'from_location', 'to_location'
     ).all()
     serializer_class = StockOperationSerializer
+    values_serializer_class = StockOperationValuesSerializer
+    bulk_serializer_class = BulkOperationSerializer
+    pagination_class = LedgerCursorPagination
+    cursor_ordering = ('-timestamp', '-id')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = [
         'product', 'operation_type', 'from_location', 'to_location'
@@ -116,3 +234,14 @@ class StockOperationViewSet(viewsets.ReadOnlyModelViewSet):
                 }, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Пакетный приход/расход/перемещение.
+        mode=atomic - все или ничего, mode=best_effort - применить корректные строки.
+        В ответе - отчет об ошибках по номеру строки.
+        """
+        return self.bulk_response(
+            request, BulkOperationLineSerializer, StockService.apply_batch, items_key='operations'
+        )
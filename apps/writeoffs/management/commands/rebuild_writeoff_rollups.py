@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.writeoffs.rollups import WriteOffRollupService
+
+
+class Command(BaseCommand):
+    help = 'Пересчет помесячных итогов списаний (всех или одного месяца)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Месяц в формате YYYY-MM')
+
+    def handle(self, *args, **options):
+        month = None
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('Месяц должен быть в формате YYYY-MM')
+
+        keys = WriteOffRollupService.rebuild(month)
+        folded = WriteOffRollupService.update()
+        self.stdout.write(self.style.SUCCESS(
+            f'Итоги пересчитаны: {keys} строк, дополнительно свернуто {folded} списаний'
+        ))
@@ -1,8 +1,10 @@
 from django.db import models
+from django.db.models import Q
 from django.core.exceptions import ValidationError
+from apps.core.models import ValidatedModel
 
 
-class WriteOff(models.Model):
+class WriteOff(ValidatedModel):
     product = models.ForeignKey(
         'products.Product',
         on_delete=models.PROTECT,
@@ -33,10 +35,20 @@ class WriteOff(models.Model):
         verbose_name_plural = 'Списания'
         ordering = ['-date']
         indexes = [
-            models.Index(fields=['date']),
+            models.Index(fields=['date', 'id']),
             models.Index(fields=['product']),
             models.Index(fields=['inventory_item'])
         ]
+        constraints = [
+            # Либо расходник с количеством, либо техника без количества
+            models.CheckConstraint(
+                condition=(
+                    Q(product__isnull=False, inventory_item__isnull=True, quantity__gt=0)
+                    | Q(product__isnull=True, inventory_item__isnull=False, quantity__isnull=True)
+                ),
+                name='writeoff_product_xor_inventory_item'
+            ),
+        ]
         
     def __str__(self):
         if self.inventory_item:
@@ -81,8 +93,68 @@ class WriteOff(models.Model):
                     'Для техники поле quantity должно быть пустым'
                 )
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
-            
-        
+
+class WriteOffRollup(models.Model):
+    """
+    Итоги списаний за месяц по (продукт, категория, локация, вид).
+    Поддерживается инкрементально задачами apps.writeoffs.tasks;
+    last_writeoff_id - максимальный учтенный ID списания (high-water mark).
+    """
+    KIND_CONSUMABLE = 'consumable'
+    KIND_ASSET = 'asset'
+    KIND_CHOICES = [
+        (KIND_CONSUMABLE, 'Расходник'),
+        (KIND_ASSET, 'Техника'),
+    ]
+
+    month = models.DateField(verbose_name='Месяц (первое число)')
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='writeoff_rollups'
+    )
+    category = models.ForeignKey(
+        'references.Category',
+        on_delete=models.CASCADE,
+        related_name='writeoff_rollups'
+    )
+    location = models.ForeignKey(
+        'references.Location',
+        on_delete=models.CASCADE,
+        related_name='writeoff_rollups'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField(default=0, verbose_name='Списано единиц')
+    writeoff_count = models.IntegerField(default=0, verbose_name='Количество списаний')
+    last_writeoff_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'writeoff_rollups'
+        verbose_name = 'Итоги списаний за месяц'
+        verbose_name_plural = 'Итоги списаний за месяц'
+        ordering = ['-month']
+        unique_together = [['month', 'product', 'category', 'location', 'kind']]
+
+    def __str__(self):
+        return f'{self.month:%Y-%m} {self.product_id}@{self.location_id} ({self.kind}): {self.quantity}'
+
+
+class WriteOffRollupState(models.Model):
+    """
+    Состояние итогов списаний - одна строка. last_writeoff_id - high-water
+    mark: списания с ID не больше него уже свернуты в WriteOffRollup.
+    Строка блокируется (SELECT ... FOR UPDATE) на время update()/rebuild(),
+    поэтому параллельные запуски выполняются по очереди.
+    """
+    SINGLETON_ID = 1
+
+    last_writeoff_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'writeoff_rollup_state'
+        verbose_name = 'Состояние итогов списаний'
+        verbose_name_plural = 'Состояние итогов списаний'
+
+    def __str__(self):
+        return f'Итоги списаний до #{self.last_writeoff_id}'
@@ -0,0 +1,255 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, DateField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from .models import WriteOff, WriteOffRollup, WriteOffRollupState
+
+
+logger = logging.getLogger(__name__)
+
+
+# (month, product_id, category_id, location_id, kind)
+RollupKey = Tuple[date, int, int, int, str]
+
+PERIODS = ('month', 'quarter', 'year')
+
+GROUP_BY = {
+    'category': Category,
+    'product': Product,
+    'location': Location,
+    'kind': None,
+}
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def period_bounds(period: str, day: date) -> Tuple[date, date]:
+    """Первый месяц периода и первый месяц следующего периода"""
+    if period == 'month':
+        start = month_start(day)
+        return start, add_months(start, 1)
+    if period == 'quarter':
+        start = date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+        return start, add_months(start, 3)
+    if period == 'year':
+        return date(day.year, 1, 1), date(day.year + 1, 1, 1)
+    raise ValueError(f'Неизвестный период: {period}')
+
+
+def _month_range(start: date, end: date) -> Q:
+    tz = timezone.get_current_timezone()
+    return Q(
+        date__gte=timezone.make_aware(datetime.combine(start, time.min), tz),
+        date__lt=timezone.make_aware(datetime.combine(end, time.min), tz),
+    )
+
+
+class WriteOffRollupService:
+    """
+    Помесячные итоги списаний (WriteOffRollup).
+
+    Новые списания (ID больше high-water mark) сворачиваются в итоги одним
+    GROUP BY-запросом. Сводки за квартал/год суммируют несколько сотен строк
+    итогов и еще не свернутый хвост списаний, поэтому не сканируют историю.
+    High-water mark хранится в WriteOffRollupState; update() и rebuild()
+    блокируют эту строку и не выполняются параллельно.
+    """
+
+    @staticmethod
+    def get_high_water_mark() -> int:
+        hwm = WriteOffRollupState.objects.filter(
+            pk=WriteOffRollupState.SINGLETON_ID
+        ).values_list('last_writeoff_id', flat=True).first()
+        if hwm is None:
+            # Итоги, свернутые до появления строки состояния
+            hwm = WriteOffRollup.objects.aggregate(hwm=Max('last_writeoff_id'))['hwm'] or 0
+        return hwm
+
+    @staticmethod
+    def lock_state() -> WriteOffRollupState:
+        """Строка состояния под SELECT ... FOR UPDATE (создается при первом вызове)"""
+        state = WriteOffRollupState.objects.select_for_update().filter(
+            pk=WriteOffRollupState.SINGLETON_ID
+        ).first()
+        if state is None:
+            WriteOffRollupState.objects.get_or_create(
+                pk=WriteOffRollupState.SINGLETON_ID,
+                defaults={'last_writeoff_id': WriteOffRollupService.get_high_water_mark()}
+            )
+            state = WriteOffRollupState.objects.select_for_update().get(
+                pk=WriteOffRollupState.SINGLETON_ID
+            )
+        return state
+
+    @staticmethod
+    def aggregate(queryset) -> Dict[RollupKey, Dict[str, int]]:
+        """Итоги списаний из queryset по ключу итогов"""
+        rows = queryset.annotate(
+            rollup_month=TruncMonth('date', output_field=DateField()),
+            rollup_product=Coalesce('product_id', 'inventory_item__product_id'),
+            rollup_category=Coalesce(
+                'product__category_id', 'inventory_item__product__category_id'
+            ),
+            rollup_kind=Case(
+                When(product__isnull=False, then=Value(WriteOffRollup.KIND_CONSUMABLE)),
+                default=Value(WriteOffRollup.KIND_ASSET),
+            ),
+        ).order_by().values(
+            'rollup_month', 'rollup_product', 'rollup_category', 'location_id', 'rollup_kind'
+        ).annotate(
+            # У техники quantity пустое: одно списание - одна единица
+            total_quantity=Sum(Coalesce('quantity', Value(1))),
+            total_count=Count('id'),
+            max_id=Max('id'),
+        )
+
+        return {
+            (
+                row['rollup_month'], row['rollup_product'], row['rollup_category'],
+                row['location_id'], row['rollup_kind']
+            ): {
+                'quantity': row['total_quantity'],
+                'writeoff_count': row['total_count'],
+                'last_writeoff_id': row['max_id'],
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def update() -> int:
+        """Сворачивает в итоги списания после high-water mark; возвращает их число"""
+        state = WriteOffRollupService.lock_state()
+        totals = WriteOffRollupService.aggregate(
+            WriteOff.objects.filter(id__gt=state.last_writeoff_id)
+        )
+        if not totals:
+            return 0
+
+        existing = {
+            (row.month, row.product_id, row.category_id, row.location_id, row.kind): row
+            for row in WriteOffRollup.objects.select_for_update().filter(
+                month__in={key[0] for key in totals},
+                product_id__in={key[1] for key in totals},
+            )
+        }
+
+        to_update, to_create = [], []
+        for key, values in totals.items():
+            row = existing.get(key)
+            if row is None:
+                month, product_id, category_id, location_id, kind = key
+                to_create.append(WriteOffRollup(
+                    month=month, product_id=product_id, category_id=category_id,
+                    location_id=location_id, kind=kind, **values
+                ))
+            else:
+                row.quantity += values['quantity']
+                row.writeoff_count += values['writeoff_count']
+                row.last_writeoff_id = max(row.last_writeoff_id, values['last_writeoff_id'])
+                to_update.append(row)
+
+        WriteOffRollup.objects.bulk_update(
+            to_update, ['quantity', 'writeoff_count', 'last_writeoff_id']
+        )
+        WriteOffRollup.objects.bulk_create(to_create)
+
+        state.last_writeoff_id = max(values['last_writeoff_id'] for values in totals.values())
+        state.save(update_fields=['last_writeoff_id', 'updated_at'])
+
+        folded = sum(values['writeoff_count'] for values in totals.values())
+        logger.info(f'Write-off rollups updated: {folded} write-offs, {len(totals)} keys')
+        return folded
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(month: Optional[date] = None) -> int:
+        """
+        Пересчет итогов с нуля: всех или одного месяца. Учитываются только
+        списания до high-water mark - остальные свернет update(); сам
+        high-water mark при пересчете не меняется.
+        """
+        state = WriteOffRollupService.lock_state()
+        rollups = WriteOffRollup.objects.all()
+        writeoffs = WriteOff.objects.filter(id__lte=state.last_writeoff_id)
+
+        if month is not None:
+            month = month_start(month)
+            writeoffs = writeoffs.filter(_month_range(month, add_months(month, 1)))
+            rollups = rollups.filter(month=month)
+
+        totals = WriteOffRollupService.aggregate(writeoffs)
+        rollups.delete()
+        WriteOffRollup.objects.bulk_create([
+            WriteOffRollup(
+                month=month_, product_id=product_id, category_id=category_id,
+                location_id=location_id, kind=kind, **values
+            )
+            for (month_, product_id, category_id, location_id, kind), values in totals.items()
+        ])
+        return len(totals)
+
+    @staticmethod
+    def summary(start: date, end: date, group_by: str = 'category') -> List[dict]:
+        """
+        Итоги за месяцы [start, end) в разрезе group_by и вида списания.
+        Еще не свернутые списания добавляются на лету.
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f'Неизвестная группировка: {group_by}')
+
+        fields = ['kind'] if group_by == 'kind' else [f'{group_by}_id', 'kind']
+        totals = defaultdict(lambda: {'quantity': 0, 'writeoff_count': 0})
+
+        rows = WriteOffRollup.objects.filter(
+            month__gte=start, month__lt=end
+        ).order_by().values(*fields).annotate(
+            total_quantity=Sum('quantity'), total_count=Sum('writeoff_count')
+        )
+        for row in rows:
+            key = tuple(row[field] for field in fields)
+            totals[key]['quantity'] += row['total_quantity']
+            totals[key]['writeoff_count'] += row['total_count']
+
+        tail = WriteOffRollupService.aggregate(WriteOff.objects.filter(
+            _month_range(start, end),
+            id__gt=WriteOffRollupService.get_high_water_mark()
+        ))
+        positions = {'product': 1, 'category': 2, 'location': 3}
+        for rollup_key, values in tail.items():
+            kind = rollup_key[4]
+            key = (kind,) if group_by == 'kind' else (rollup_key[positions[group_by]], kind)
+            totals[key]['quantity'] += values['quantity']
+            totals[key]['writeoff_count'] += values['writeoff_count']
+
+        model = GROUP_BY[group_by]
+        names = {}
+        if model is not None:
+            names = dict(
+                model.objects.filter(pk__in={key[0] for key in totals}).values_list('id', 'name')
+            )
+
+        results = []
+        for key in sorted(totals):
+            if model is None:
+                item = {'kind': key[0]}
+            else:
+                item = {group_by: key[0], f'{group_by}_name': names.get(key[0]), 'kind': key[1]}
+            item.update(totals[key])
+            results.append(item)
+        return results
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from apps.products.models import Product
 from apps.references.models import Location
 from apps.assets.models import Asset
+from apps.core.serializers import ValuesSerializer, datetime_to_representation
 from .models import WriteOff
 
 class WriteOffListSerializer(serializers.ModelSerializer):
@@ -20,6 +21,32 @@ class WriteOffListSerializer(serializers.ModelSerializer):
             'id', 'product', 'inventory_item', 'item_name',
             'quantity', 'location', 'reason', 'date'
         ]
+
+
+
+class WriteOffListValuesSerializer(ValuesSerializer):
+    """Быстрый путь WriteOffListSerializer для списков"""
+    values = (
+        'id', 'product_id', 'product__name', 'inventory_item_id',
+        'inventory_item__inventory_number', 'quantity', 'location_id', 'reason', 'date',
+    )
+
+    def to_representation(self, row):
+        if row['product_id'] is not None:
+            item_name = f"{row['product__name']} x{row['quantity']}"
+        else:
+            item_name = f"{row['inventory_item__inventory_number']}"
+
+        return {
+            'id': row['id'],
+            'product': row['product_id'],
+            'inventory_item': row['inventory_item_id'],
+            'item_name': item_name,
+            'quantity': row['quantity'],
+            'location': row['location_id'],
+            'reason': row['reason'],
+            'date': datetime_to_representation(row['date']),
+        }
         
 
 class WriteOffConsumableSerializer(serializers.Serializer):
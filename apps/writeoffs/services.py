@@ -8,9 +8,8 @@ from typing import Dict, Any, Optional
 from .models import WriteOff
 from apps.assets.models import Asset
 from apps.products.models import Product
-from apps.stock.models import Stock
+from apps.stock.services import StockService
 from apps.references.models import Location
-from apps.core.exceptions import InsufficientStockError
 
 
 logger = logging.getLogger(__name__)
@@ -27,32 +26,14 @@ class WriteOffService:
                 'Для списания техники используйте create_writeoff_asset()'
             )
         
-        try:
-            stock = Stock.objects.get(
-                product=product,
-                location=location
-            )
-        except Stock.DoesNotExist:
-            raise InsufficientStockError(
-                f'Товар "{product.name}" отсутствует в локации "{location}". '
-                f'Доступное количество: 0'
-            )
-        
-        if stock.quantity < quantity:
-            raise InsufficientStockError(
-                f'Недостаточное количество товара "{product.name}" в локации "{location}". '
-                f'Доступно: {stock.quantity}, запрошено: {quantity}'
-            )
+        StockService.decrease_stock(product, location, quantity)
             
-        write_off = WriteOff.objects.create(
+        write_off = WriteOff.create_trusted(
             product=product,
             location=location,
             quantity=quantity,
             reason=reason
         )
-        
-        stock.quantity -= quantity
-        stock.save()
 
         logger.info(
             f'Списан расходник: {product.name} x{quantity} '
@@ -70,7 +51,12 @@ class WriteOffService:
                 'Для списания расходников используйте create_writeoff_consumable()'
             )
 
-        write_off = WriteOff.objects.create(
+        if inventory_item.current_location_id is None:
+            raise ValidationError(
+                f'У актива "{inventory_item.inventory_number}" не указана текущая локация'
+            )
+
+        write_off = WriteOff.create_trusted(
             inventory_item=inventory_item,
             location=inventory_item.current_location,
             reason=reason
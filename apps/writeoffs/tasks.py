@@ -1,7 +1,41 @@
+import logging
+
 from celery import shared_task
+from django.utils import timezone
+
+from .rollups import WriteOffRollupService, add_months, month_start, period_bounds
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def update_writeoff_rollups():
+    """Сворачивание новых списаний в помесячные итоги"""
+    return WriteOffRollupService.update()
 
 
 @shared_task
 def generate_writeoff_report():
-    """Генерация ежеквартального отчета по списаниям"""
-    pass
+    """
+    Отчет по списаниям за прошедший месяц.
+
+    Перед отчетом итоги закрытого месяца пересчитываются с нуля: это
+    исправляет списания, которые были зафиксированы позже high-water mark
+    или изменены вручную.
+    """
+    WriteOffRollupService.update()
+
+    previous_month = add_months(month_start(timezone.localdate()), -1)
+    WriteOffRollupService.rebuild(previous_month)
+
+    start, end = period_bounds('month', previous_month)
+    results = WriteOffRollupService.summary(start, end, group_by='category')
+
+    for item in results:
+        logger.info(
+            f"Write-offs {start:%Y-%m}: {item['category_name']} ({item['kind']}): "
+            f"{item['quantity']} units, {item['writeoff_count']} write-offs"
+        )
+
+    return {'month': start.isoformat(), 'results': results}
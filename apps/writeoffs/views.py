@@ -3,23 +3,66 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from .models import WriteOff
 from .services import WriteOffService
+from .rollups import GROUP_BY, PERIODS, WriteOffRollupService, period_bounds
 from apps.core.exceptions import InsufficientStockError
+from apps.core.mixins import ListActionMixin
+from apps.core.pagination import LedgerCursorPagination
 from .serializers import (
     WriteOffAssetSerializer, WriteOffConsumableSerializer,
-    WriteOffListSerializer
+    WriteOffListSerializer, WriteOffListValuesSerializer
 )
 
 
-class WriteOffViewSet(viewsets.ReadOnlyModelViewSet):
+class WriteOffViewSet(ListActionMixin, viewsets.ReadOnlyModelViewSet):
     queryset = WriteOff.objects.select_related(
         'product', 'inventory_item', 'location'
     ).all()
     serializer_class = WriteOffListSerializer
+    values_serializer_class = WriteOffListValuesSerializer
+    pagination_class = LedgerCursorPagination
+    cursor_ordering = ('-date', '-id')
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['product', 'inventory_item', 'location']
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Итоги списаний за период из помесячных итогов:
+        ?period=month|quarter|year, ?date=YYYY-MM-DD (любой день периода,
+        по умолчанию сегодня), ?group_by=category|product|location|kind.
+        """
+        period = request.query_params.get('period', 'month')
+        group_by = request.query_params.get('group_by', 'category')
+        if period not in PERIODS:
+            return Response({
+                'error': f'period должен быть одним из: {", ".join(PERIODS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if group_by not in GROUP_BY:
+            return Response({
+                'error': f'group_by должен быть одним из: {", ".join(GROUP_BY)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        day = timezone.localdate()
+        if request.query_params.get('date'):
+            day = parse_date(request.query_params['date'])
+            if day is None:
+                return Response({
+                    'error': 'Параметр date должен быть в формате YYYY-MM-DD'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        start, end = period_bounds(period, day)
+
+        return Response({
+            'period': period,
+            'start': start,
+            'end': end,
+            'results': WriteOffRollupService.summary(start, end, group_by=group_by),
+        })
     
     @action(detail=False, methods=['post'])
     def create_consumable(self, request):
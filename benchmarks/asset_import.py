@@ -0,0 +1,48 @@
+"""
+Массовый импорт техники: потоковый разбор CSV, проверка пачек на множествах
+и bulk_create против создания по одной записи через Asset.save() (full_clean
+и SELECT на уникальность для каждой строки).
+
+    python -m benchmarks.asset_import [rows]
+"""
+import io
+import sys
+import time
+
+from benchmarks.common import make_fixtures, setup
+
+
+def main(rows=100000):
+    setup()
+
+    from apps.assets.imports import AssetImportService, iter_csv_rows
+    from apps.assets.models import Asset
+
+    _, (location,), _, (hardware,) = make_fixtures(consumables=0, assets=1, locations=1)
+
+    def make_csv(prefix, count):
+        lines = ['sku,inventory_number,serial_number,current_location']
+        lines += [f'{hardware.sku},{prefix}-{index:06},SN-{index},{location.id}' for index in range(count)]
+        return io.BytesIO('\n'.join(lines).encode())
+
+    sample = min(rows, 2000)
+    started = time.perf_counter()
+    for index in range(sample):
+        Asset.objects.create(
+            product=hardware, inventory_number=f'ONE-{index:06}', current_location=location
+        )
+    per_row = (time.perf_counter() - started) / sample
+
+    started = time.perf_counter()
+    result = AssetImportService.import_rows(iter_csv_rows(make_csv('BULK', rows)))
+    elapsed = time.perf_counter() - started
+    assert result.created == rows and not result.error_count
+
+    print(f'{rows} строк')
+    print(f'Asset.save() по одной: {per_row * rows:.1f} s (оценка по {sample} строкам)')
+    print(f'Импорт пачками:        {elapsed:.1f} s ({rows / elapsed:.0f} строк/с)')
+    print(f'Ускорение:             {per_row * rows / elapsed:.1f}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,65 @@
+"""
+Общая подготовка окружения для бенчмарков.
+
+Запуск из корня проекта: python -m benchmarks.<имя_модуля>
+Бенчмарки работают на временной тестовой БД (как pytest --no-migrations)
+и локальном кэше, поэтому не требуют Redis и не трогают рабочую БД.
+"""
+import logging
+import os
+import time
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.settings')
+    django.setup()
+
+    from django.apps import apps
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    settings.MIGRATION_MODULES = {app.label: None for app in apps.get_app_configs()}
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+    logging.disable(logging.WARNING)
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def timeit(func, repeat=5):
+    """Лучшее время из repeat запусков, в секундах"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def make_fixtures(consumables=1, assets=0, locations=1):
+    """Минимальный набор справочников для бенчмарков"""
+    from apps.products.models import Product
+    from apps.references.models import Category, Location
+
+    category = Category.objects.create(name='Бенчмарк')
+    location_list = [Location.objects.create(name=f'Склад {i}') for i in range(locations)]
+    consumable_list = [
+        Product.objects.create(
+            name=f'Расходник {i}', category=category, sku=f'CONS-{i}',
+            is_consumable=True, unit='шт', min_stock=10
+        )
+        for i in range(consumables)
+    ]
+    asset_products = [
+        Product.objects.create(
+            name=f'Техника {i}', category=category, sku=f'ASSET-{i}',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        for i in range(assets)
+    ]
+    return category, location_list, consumable_list, asset_products
@@ -0,0 +1,59 @@
+"""
+Рендеринг страниц /stock/ и /stock-operation/: стандартный JSONRenderer
+против ORJSONRenderer на одних и тех же данных (вывод сериализаторов).
+
+    python -m benchmarks.json_renderer [rows]
+"""
+import sys
+
+from benchmarks.common import make_fixtures, setup, timeit
+
+
+def main(rows=5000):
+    setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.core.renderers import ORJSONRenderer, orjson
+    from apps.stock.models import Stock, StockOperations
+    from apps.stock.serializers import StockOperationValuesSerializer, StockValuesSerializer
+
+    if orjson is None:
+        print('orjson не установлен: ORJSONRenderer работает как JSONRenderer')
+
+    _, locations, consumables, _ = make_fixtures(consumables=rows // 2, locations=2)
+    Stock.objects.bulk_create([
+        Stock(product=product, location=location, quantity=index % 20)
+        for index, product in enumerate(consumables)
+        for location in locations
+    ])
+    StockOperations.objects.bulk_create([
+        StockOperations(
+            product=consumables[index % len(consumables)], operation_type='receipt',
+            quantity=1, to_location=locations[0], comment='Поставка'
+        )
+        for index in range(rows)
+    ])
+
+    payloads = [
+        ('/stock/', StockValuesSerializer(
+            StockValuesSerializer.prepare(Stock.objects.order_by('pk'))
+        ).data),
+        ('/stock-operation/', StockOperationValuesSerializer(
+            StockOperationValuesSerializer.prepare(StockOperations.objects.order_by('pk'))
+        ).data),
+    ]
+    standard, fast = JSONRenderer(), ORJSONRenderer()
+
+    print(f'{rows} строк')
+    print(f'{"Ответ":<20}{"JSONRenderer":>14}{"orjson":>11}{"ускорение":>11}')
+    for name, data in payloads:
+        assert standard.render(data) == fast.render(data), f'{name}: ответы различаются'
+        slow_time = timeit(lambda: standard.render(data))
+        fast_time = timeit(lambda: fast.render(data))
+        print(f'{name:<20}{slow_time * 1000:>11.1f} ms{fast_time * 1000:>8.1f} ms'
+              f'{slow_time / fast_time:>10.1f}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
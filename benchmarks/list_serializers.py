@@ -0,0 +1,73 @@
+"""
+Сериализация страницы списка: ModelSerializer (модели + select_related)
+против ValuesSerializer (.values() + словари подписей). Время включает
+запрос к БД и рендеринг JSON; проверяется совпадение байтов ответа.
+
+    python -m benchmarks.list_serializers [rows]
+"""
+import sys
+
+from benchmarks.common import make_fixtures, setup, timeit
+
+
+def main(rows=5000):
+    setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.assets.models import Asset
+    from apps.assets.serializers import AssetListSerializer, AssetListValuesSerializer
+    from apps.stock.models import Stock, StockOperations
+    from apps.stock.serializers import (
+        StockOperationSerializer, StockOperationValuesSerializer,
+        StockSerializer, StockValuesSerializer
+    )
+
+    _, locations, consumables, (hardware,) = make_fixtures(
+        consumables=rows // 2, assets=1, locations=2
+    )
+    Stock.objects.bulk_create([
+        Stock(product=product, location=location, quantity=index % 20)
+        for index, product in enumerate(consumables)
+        for location in locations
+    ])
+    StockOperations.objects.bulk_create([
+        StockOperations(
+            product=consumables[index % len(consumables)], operation_type='receipt',
+            quantity=1, to_location=locations[0], comment='Поставка'
+        )
+        for index in range(rows)
+    ])
+    Asset.objects.bulk_create([
+        Asset(product=hardware, inventory_number=f'INV-{index:06}', current_location=locations[0])
+        for index in range(rows)
+    ])
+
+    cases = [
+        ('Asset', Asset.objects.select_related('product', 'current_location').order_by('pk'),
+         AssetListSerializer, AssetListValuesSerializer),
+        ('Stock', Stock.objects.select_related('product', 'location').order_by('pk'),
+         StockSerializer, StockValuesSerializer),
+        ('StockOperations', StockOperations.objects.select_related('product').order_by('pk'),
+         StockOperationSerializer, StockOperationValuesSerializer),
+    ]
+    renderer = JSONRenderer()
+
+    print(f'{rows} строк')
+    print(f'{"Список":<18}{"ModelSerializer":>17}{"values()":>11}{"ускорение":>11}')
+    for name, queryset, serializer_class, values_serializer_class in cases:
+        def model_path():
+            return renderer.render(serializer_class(queryset.all(), many=True).data)
+
+        def values_path():
+            return renderer.render(
+                values_serializer_class(values_serializer_class.prepare(queryset.all())).data
+            )
+
+        assert model_path() == values_path(), f'{name}: ответы различаются'
+        slow, fast = timeit(model_path), timeit(values_path)
+        print(f'{name:<18}{slow * 1000:>14.1f} ms{fast * 1000:>8.1f} ms{slow / fast:>10.1f}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
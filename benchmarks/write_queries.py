@@ -0,0 +1,70 @@
+"""
+Число SQL-запросов на одну запись: save() с full_clean() против
+доверенного пути сервисного слоя (save(validate=False) / create_trusted()).
+
+    python -m benchmarks.write_queries
+"""
+from benchmarks.common import make_fixtures, setup
+
+
+def count_queries(func):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    return len(ctx.captured_queries)
+
+
+def main():
+    setup()
+
+    from apps.assets.models import Asset
+    from apps.issues.models import Issuance
+    from apps.stock.models import Stock, StockOperations
+    from apps.writeoffs.models import WriteOff
+
+    _, locations, (consumable,), (hardware,) = make_fixtures(
+        consumables=1, assets=1, locations=2
+    )
+    numbers = iter(range(1, 10 ** 6))
+
+    # Экземпляры создаются по id без закэшированных FK - как в сервисах,
+    # получающих id из запроса
+    builders = [
+        ('Stock', lambda validate: Stock(
+            product_id=consumable.pk, location_id=locations[validate].pk, quantity=50
+        )),
+        ('StockOperations', lambda validate: StockOperations(
+            product_id=consumable.pk, operation_type='receipt',
+            quantity=1, to_location_id=locations[0].pk
+        )),
+        ('Asset', lambda validate: Asset(
+            product_id=hardware.pk, inventory_number=f'INV-{next(numbers)}',
+            current_location_id=locations[0].pk
+        )),
+        ('Issuance', lambda validate: Issuance(
+            inventory_item_id=Asset.create_trusted(
+                product_id=hardware.pk, inventory_number=f'INV-{next(numbers)}'
+            ).pk,
+            recipient='Иванов И.'
+        )),
+        ('WriteOff', lambda validate: WriteOff(
+            product_id=consumable.pk, location_id=locations[0].pk,
+            quantity=1, reason='Брак'
+        )),
+    ]
+
+    print(f'{"Модель":<18}{"full_clean()":>14}{"trusted":>10}')
+    for name, build in builders:
+        results = []
+        for validate in (True, False):
+            obj = build(validate)
+            results.append(count_queries(
+                lambda: obj.save(force_insert=True, validate=validate)
+            ))
+        print(f'{name:<18}{results[0]:>14}{results[1]:>10}')
+
+
+if __name__ == '__main__':
+    main()
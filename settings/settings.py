@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework_simplejwt',
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
     'apps.core',
     'apps.issues',
     'apps.writeoffs',
+    'apps.search',
 
 ]
 
@@ -138,7 +140,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.OptionalCountPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -146,10 +148,10 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
-        'rest_framework.parsers.JSONParser',
+        'apps.core.parsers.ORJSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
@@ -210,11 +212,54 @@ LOGGING = {
 
 os.makedirs(BASE_DIR / 'logs', exist_ok=True)
 
+# Получатели агрегированных уведомлений о низких остатках (apps.stock.alerts)
+STOCK_LOW_STOCK_NOTIFIERS = [
+    'apps.stock.alerts.LoggingNotifier',
+]
+
+# Срок возврата техники по умолчанию и интервал повторных напоминаний о просрочке
+ISSUANCE_DEFAULT_TERM_DAYS = config('ISSUANCE_DEFAULT_TERM_DAYS', default=365, cast=int)
+ISSUANCE_REMINDER_INTERVAL_DAYS = config('ISSUANCE_REMINDER_INTERVAL_DAYS', default=7, cast=int)
+
+# Получатели напоминаний о просроченной технике (apps.issues.reminders)
+ISSUANCE_OVERDUE_NOTIFIERS = [
+    'apps.issues.reminders.LoggingNotifier',
+]
+
+# Лимит строк для синхронной выгрузки /api/v1/stock/export/
+STOCK_REPORT_SYNC_LIMIT = config('STOCK_REPORT_SYNC_LIMIT', default=50000, cast=int)
+
+# Срок хранения файлов отчетов в MEDIA_ROOT/reports/stock/ (чистит generate_stock_report)
+STOCK_REPORT_MAX_AGE_DAYS = config('STOCK_REPORT_MAX_AGE_DAYS', default=30, cast=int)
+
+# Максимум кодов в одном пакетном запросе /api/v1/assets/lookup/
+ASSET_LOOKUP_BATCH_LIMIT = config('ASSET_LOOKUP_BATCH_LIMIT', default=1000, cast=int)
+
 CELERY_BEAT_SCHEDULE = {
     'check-low-stock-daily': {
         'task': 'apps.stock.tasks.check_low_stock',
         'schedule': crontab(hour=9, minute=0),
     },
+    'daily-stock-report': {
+        'task': 'apps.stock.tasks.generate_stock_report',
+        'schedule': crontab(hour=7, minute=0),
+    },
+    'daily-stock-snapshot': {
+        'task': 'apps.stock.tasks.create_stock_snapshot',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'nightly-stock-reconciliation': {
+        'task': 'apps.stock.tasks.reconcile_stock',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'hourly-writeoff-rollups': {
+        'task': 'apps.writeoffs.tasks.update_writeoff_rollups',
+        'schedule': crontab(minute=5),
+    },
+    'daily-overdue-equipment-reminder': {
+        'task': 'apps.issues.tasks.send_overdue_equipment_reminder',
+        'schedule': crontab(hour=10, minute=0),
+    },
     'monthly-writeoff-report': {
         'task': 'apps.writeoffs.tasks.generate_writeoff_report',
         'schedule': crontab(day_of_month=1, hour=8, minute=0),
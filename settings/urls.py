@@ -13,6 +13,7 @@ urlpatterns = [
     path('api/v1/', include('apps.stock.urls', namespace='stock')),
     path('api/v1/', include('apps.issues.urls', namespace='issues')),
     path('api/v1/', include('apps.writeoffs.urls', namespace='writeoffs')),
+    path('api/v1/', include('apps.search.urls', namespace='search')),
     
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
@@ -0,0 +1,26 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """Тесты не зависят от Redis: кэш по умолчанию - локальная память"""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_celery():
+    """Задачи, поставленные через .delay() (в том числе из on_commit), выполняются синхронно"""
+    from celery import current_app
+
+    previous = current_app.conf.task_always_eager
+    current_app.conf.task_always_eager = True
+    yield
+    current_app.conf.task_always_eager = previous
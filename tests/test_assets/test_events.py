@@ -0,0 +1,158 @@
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.assets.events import AssetEventService
+from apps.assets.models import Asset, AssetEvent
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from django.contrib.auth.models import User
+
+T0 = datetime(2025, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+@pytest.mark.django_db
+class TestAssetEvents:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.location = Location.objects.create(name='Склад')
+        self.office = Location.objects.create(name='Офис')
+        category = Category.objects.create(name='Ноутбуки')
+        self.product = Product.objects.create(
+            name='Ноутбук Dell', category=category, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+
+    def make_history(self, inventory_number, transitions):
+        """Техника без автоматических событий и журнал с заданными ts"""
+        (asset,) = Asset.objects.bulk_create([
+            Asset(product=self.product, inventory_number=inventory_number)
+        ])
+        previous = None
+        events = []
+        for offset, status in transitions:
+            events.append(AssetEvent.build(asset.id, previous, status, ts=T0 + offset * HOUR))
+            previous = status
+        AssetEvent.objects.bulk_create(events)
+        return asset
+
+    def test_transitions_are_logged(self):
+        asset = Asset.objects.create(
+            product=self.product, inventory_number='INV-001', current_location=self.location
+        )
+        issuance = IssuancesService.create_issuance(asset, 'Иванов И.')
+        IssuancesService.create_return(issuance, self.office)
+        response = self.client.post(f'/api/v1/assets/{asset.id}/mark_maintenance/')
+        asset.refresh_from_db()
+        asset.serial_number = 'SN-1'
+        asset.save()
+
+        assert response.status_code == 200
+        assert list(asset.events.order_by('ts', 'id').values_list(
+            'from_status', 'to_status', 'location__name'
+        )) == [
+            (None, 'in_stock', 'Склад'),
+            ('in_stock', 'issued', 'Склад'),
+            ('issued', 'in_stock', 'Офис'),
+            ('in_stock', 'maintenance', 'Офис'),
+        ]
+
+    def test_bulk_transitions_are_logged(self):
+        assets = [
+            Asset.objects.create(product=self.product, inventory_number=f'INV-{index}')
+            for index in range(3)
+        ]
+        result = IssuancesService.create_issuances_bulk([
+            {'inventory_item': asset.id, 'recipient': 'Новичок'} for asset in assets
+        ])
+        IssuancesService.return_bulk([
+            {'issuance': issuance_id, 'location': self.office.id} for issuance_id in result['issuances']
+        ])
+
+        assert AssetEvent.objects.filter(from_status='in_stock', to_status='issued').count() == 3
+        assert AssetEvent.objects.filter(
+            from_status='issued', to_status='in_stock', location=self.office
+        ).count() == 3
+
+    def test_events_are_append_only(self):
+        asset = Asset.objects.create(product=self.product, inventory_number='INV-001')
+        event = asset.events.get()
+
+        event.to_status = Asset.StatusChoices.ISSUED
+        with pytest.raises(ValueError):
+            event.save()
+
+    def test_seed_initial_events_for_existing_assets(self):
+        legacy = Asset.objects.bulk_create([
+            Asset(
+                product=self.product, inventory_number=f'OLD-{index}',
+                status=Asset.StatusChoices.MAINTENANCE, current_location=self.office
+            )
+            for index in range(3)
+        ])
+        logged = self.make_history('A', [(0, 'in_stock'), (1, 'maintenance')])
+        out = io.StringIO()
+
+        call_command('seed_asset_events', '--batch-size', '2', stdout=out)
+
+        assert 'Записано начальных событий: 3' in out.getvalue()
+        event = AssetEvent.objects.get(asset=legacy[0])
+        assert (event.from_status, event.to_status, event.location) == (None, 'maintenance', self.office)
+        assert event.ts == Asset.objects.get(pk=legacy[0].pk).created_at
+        assert logged.events.count() == 2
+        assert AssetEventService.seed_initial_events() == 0
+
+    def test_time_in_status_clips_to_period(self, django_assert_num_queries):
+        self.make_history('A', [(0, 'in_stock'), (1, 'maintenance'), (3, 'in_stock')])
+        self.make_history('B', [(0, 'in_stock'), (2, 'issued')])
+
+        with django_assert_num_queries(1):
+            totals = AssetEventService.time_in_status(end=T0 + 5 * HOUR)
+
+        assert totals['maintenance'] == {'seconds': 2 * 3600, 'intervals': 1}
+        assert totals['in_stock']['seconds'] == (1 + 2 + 2) * 3600
+        assert totals['issued']['seconds'] == 3 * 3600
+
+        totals = AssetEventService.time_in_status(start=T0 + 2 * HOUR, end=T0 + 4 * HOUR)
+        assert totals['maintenance']['seconds'] == 3600
+        assert totals['in_stock']['seconds'] == 3600
+        assert totals['issued']['seconds'] == 2 * 3600
+        assert totals['written_off'] == {'seconds': 0, 'intervals': 0}
+
+    def test_timeline_and_fleet_endpoints(self):
+        asset = self.make_history('A', [(0, 'in_stock'), (1, 'maintenance'), (3, 'in_stock')])
+        self.make_history('B', [(0, 'in_stock'), (2, 'maintenance')])
+
+        timeline = self.client.get(f'/api/v1/assets/{asset.id}/timeline/').json()
+        assert [event['to_status'] for event in timeline['events']] == [
+            'in_stock', 'maintenance', 'in_stock'
+        ]
+        assert timeline['events'][1]['duration'] == 2 * 3600
+        assert timeline['events'][1]['until'] == '2025-01-01T12:00:00Z'
+
+        response = self.client.get('/api/v1/assets/time_in_status/', {
+            'start': '2025-01-01T09:00:00Z', 'end': '2025-01-01T13:00:00Z'
+        })
+        statuses = {item['status']: item for item in response.json()['statuses']}
+        assert statuses['maintenance']['seconds'] == (2 + 2) * 3600
+        assert statuses['maintenance']['status_display'] == 'На обслуживании'
+
+        response = self.client.get('/api/v1/assets/time_in_status/', {
+            'start': '2025-01-01T09:00:00Z', 'end': '2025-01-01T13:00:00Z',
+            'search': 'B'
+        })
+        statuses = {item['status']: item for item in response.json()['statuses']}
+        assert statuses['maintenance']['seconds'] == 2 * 3600
+
+        response = self.client.get('/api/v1/assets/time_in_status/', {
+            'start': '2025-01-02T00:00:00Z', 'end': '2025-01-01T00:00:00Z'
+        })
+        assert response.status_code == 400
@@ -0,0 +1,149 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+
+from apps.assets.imports import AssetImportService, iter_json_rows
+from apps.assets.models import Asset, AssetEvent
+from apps.core import versioning
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.search.models import SearchEntry
+from django.contrib.auth.models import User
+
+
+@pytest.mark.django_db
+class TestAssetImport:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Техника')
+        self.product = Product.objects.create(
+            name='Ноутбук', category=category, sku='NB-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        self.consumable = Product.objects.create(
+            name='Бумага', category=category, sku='PAPER-A4',
+            is_consumable=True, unit='пачка', min_stock=10
+        )
+        self.location = Location.objects.create(name='Склад')
+        Asset.objects.create(product=self.product, inventory_number='INV-EXISTS')
+
+    def csv_upload(self, lines, name='assets.csv'):
+        content = '\n'.join(lines).encode('utf-8-sig')
+        return SimpleUploadedFile(name, content, content_type='text/csv')
+
+    def test_csv_import_reports_errors_per_line(self, django_capture_on_commit_callbacks):
+        upload = self.csv_upload([
+            'sku,product,inventory_number,serial_number,current_location',
+            f'NB-001,,inv-1, SN-1 ,{self.location.id}',
+            f',{self.product.id},INV-2,,',
+            'PAPER-A4,,INV-3,,',
+            'NB-001,,inv-exists,,',
+            'NB-001,,INV-1,,',
+            'NB-001,,,,',
+            'UNKNOWN,,INV-4,,',
+            f'NB-001,,INV-5,,{self.location.id + 100}',
+        ])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post('/api/v1/assets/import/', {'file': upload})
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data['total'] == 8
+        assert data['created'] == 2
+        assert [error['line'] for error in data['errors']] == [3, 4, 5, 6, 7, 8]
+        asset = Asset.objects.get(inventory_number='INV-1')
+        assert asset.serial_number == 'SN-1'
+        assert asset.current_location == self.location
+        assert SearchEntry.objects.filter(kind='asset', object_id=asset.id).exists()
+        assert versioning.get_versions(['assets'])['assets'] > 0
+
+    def test_atomic_mode_creates_nothing_on_error(self):
+        upload = self.csv_upload([
+            'sku,inventory_number',
+            'NB-001,INV-1',
+            'PAPER-A4,INV-2',
+        ])
+
+        response = self.client.post('/api/v1/assets/import/', {'file': upload, 'mode': 'atomic'})
+
+        assert response.status_code == 400
+        assert response.json()['created'] == 0
+        assert not Asset.objects.filter(inventory_number='INV-1').exists()
+
+    def test_json_array_import(self):
+        payload = json.dumps([
+            {'product': self.product.id, 'inventory_number': 'J-1'},
+            {'sku': 'NB-001', 'inventory_number': 'J-2', 'serial_number': 'S-2'},
+        ]).encode()
+        upload = SimpleUploadedFile('assets.json', payload, content_type='application/json')
+
+        response = self.client.post('/api/v1/assets/import/', {'file': upload})
+
+        assert response.status_code == 201
+        assert response.json()['created'] == 2
+        assert Asset.objects.filter(inventory_number__in=['J-1', 'J-2']).count() == 2
+        assert AssetEvent.objects.filter(
+            asset__inventory_number__in=['J-1', 'J-2'], from_status=None, to_status='in_stock'
+        ).count() == 2
+
+    def test_malformed_file_is_rejected(self):
+        upload = SimpleUploadedFile('assets.json', b'[{"sku": "NB-001", ', content_type='application/json')
+
+        response = self.client.post('/api/v1/assets/import/', {'file': upload})
+
+        assert response.status_code == 400
+        assert 'error' in response.json()
+
+    def test_chunks_share_duplicate_detection(self):
+        rows = [{'sku': 'NB-001', 'inventory_number': f'C-{index % 5}'} for index in range(12)]
+
+        result = AssetImportService.import_rows(rows, chunk_size=4)
+
+        assert result.created == 5
+        assert result.error_count == 7
+
+    def test_persistent_conflict_reported_per_line(self, monkeypatch):
+        create = AssetImportService._create
+
+        def conflicting_create(parsed):
+            if any(number.startswith('BAD-') for _, number, *_ in parsed):
+                raise IntegrityError('UNIQUE constraint failed: assets.inventory_number')
+            return create(parsed)
+
+        monkeypatch.setattr(AssetImportService, '_create', staticmethod(conflicting_create))
+        rows = [{'sku': 'NB-001', 'inventory_number': number} for number in ('OK-1', 'OK-2', 'BAD-1', 'BAD-2')]
+
+        result = AssetImportService.import_rows(rows, chunk_size=2)
+
+        assert result.created == 2
+        assert [error['line'] for error in result.errors] == [3, 4]
+        assert Asset.objects.filter(inventory_number__startswith='OK-').count() == 2
+
+    def test_command(self, tmp_path):
+        path = tmp_path / 'assets.ndjson'
+        path.write_text('\n'.join(
+            json.dumps({'sku': 'NB-001', 'inventory_number': f'CMD-{index}'}) for index in range(3)
+        ))
+        out = io.StringIO()
+
+        call_command('import_assets', str(path), stdout=out)
+
+        assert Asset.objects.filter(inventory_number__startswith='CMD-').count() == 3
+        assert 'создано 3' in out.getvalue()
+
+
+def test_iter_json_rows_handles_chunk_boundaries():
+    items = [{'inventory_number': f'INV-{index}', 'name': 'Ноутбук «Б»'} for index in range(50)]
+    payload = json.dumps(items, ensure_ascii=False).encode()
+
+    assert list(iter_json_rows(io.BytesIO(payload), chunk_size=7)) == items
+    assert list(iter_json_rows(io.BytesIO(b'1\n23\n'), chunk_size=1)) == [1, 23]
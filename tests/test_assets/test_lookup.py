@@ -0,0 +1,107 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.assets.lookup import CACHE_PREFIX, AssetLookupService
+from apps.assets.models import Asset
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from django.contrib.auth.models import User
+
+
+@pytest.mark.django_db
+class TestAssetLookup:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Техника')
+        self.product = Product.objects.create(
+            name='Ноутбук',
+            category=category,
+            sku='NB-001',
+            is_consumable=False,
+            unit='шт',
+            min_stock=0
+        )
+        self.location = Location.objects.create(name='Склад')
+        self.asset = Asset.objects.create(
+            product=self.product,
+            serial_number='SN-100',
+            inventory_number='INV-100',
+            current_location=self.location
+        )
+        self.other = Asset.objects.create(
+            product=self.product,
+            serial_number='SN-200',
+            inventory_number='INV-200'
+        )
+
+    def test_lookup_by_code_normalizes(self):
+        response = self.client.get('/api/v1/assets/lookup/', {'code': '  inv-100 '})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['id'] == self.asset.id
+        assert data['location_name'] == 'Склад'
+
+    def test_lookup_by_serial_number(self):
+        response = self.client.get('/api/v1/assets/lookup/', {'code': 'sn-200'})
+
+        assert response.status_code == 200
+        assert response.json()['id'] == self.other.id
+
+    def test_lookup_serial_number_stored_in_lowercase(self):
+        legacy = Asset.objects.create(
+            product=self.product, serial_number=' sn-abc1 ', inventory_number='INV-300'
+        )
+
+        assert AssetLookupService.lookup(['SN-ABC1'])['SN-ABC1']['id'] == legacy.id
+        # Повторный запрос - через кэш, с перепроверкой по id
+        assert AssetLookupService.lookup(['sn-abc1'])['SN-ABC1']['id'] == legacy.id
+
+    def test_lookup_not_found_and_missing_code(self):
+        assert self.client.get('/api/v1/assets/lookup/', {'code': 'NOPE'}).status_code == 404
+        assert self.client.get('/api/v1/assets/lookup/').status_code == 400
+
+    def test_batch_lookup_keeps_order(self):
+        response = self.client.post(
+            '/api/v1/assets/lookup/',
+            {'codes': ['inv-200', 'NOPE', 'SN-100', 'INV-200']},
+            format='json'
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['code'] for item in data['results']] == ['INV-200', 'NOPE', 'SN-100']
+        assert [item['asset'] and item['asset']['id'] for item in data['results']] == [
+            self.other.id, None, self.asset.id
+        ]
+        assert data['not_found'] == ['NOPE']
+
+    def test_batch_limit(self, settings):
+        codes = [f'INV-{i}' for i in range(settings.ASSET_LOOKUP_BATCH_LIMIT + 1)]
+
+        response = self.client.post('/api/v1/assets/lookup/', {'codes': codes}, format='json')
+
+        assert response.status_code == 400
+        assert self.client.post('/api/v1/assets/lookup/', {'codes': []}, format='json').status_code == 400
+
+    def test_cached_codes_skip_index_lookup(self, django_assert_num_queries):
+        AssetLookupService.lookup(['INV-100', 'SN-200'])
+        assert cache.get(CACHE_PREFIX + 'INV-100') == self.asset.id
+
+        with django_assert_num_queries(1):
+            result = AssetLookupService.lookup(['INV-100', 'SN-200'])
+
+        assert result['INV-100']['id'] == self.asset.id
+        assert result['SN-200']['id'] == self.other.id
+
+    def test_stale_cache_entry_is_revalidated(self):
+        AssetLookupService.lookup(['INV-100'])
+        self.asset.inventory_number = 'INV-101'
+        self.asset.save()
+
+        assert AssetLookupService.lookup(['INV-100']) == {'INV-100': None}
+        assert AssetLookupService.lookup(['INV-101'])['INV-101']['id'] == self.asset.id
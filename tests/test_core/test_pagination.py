@@ -0,0 +1,72 @@
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.stock.services import StockService
+
+
+@pytest.mark.django_db
+class TestPagination:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='testuser', password='pass'))
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.products = [
+            Product.objects.create(
+                name=f'Бумага {i}', category=self.category, sku=f'PAPER-{i:03}',
+                is_consumable=True, unit='шт', min_stock=0
+            )
+            for i in range(5)
+        ]
+
+    def test_ledger_cursor_walks_all_rows_once(self):
+        for product in self.products:
+            StockService.create_receipt(product, self.location, 1, '')
+
+        ids, url = [], '/api/v1/stock-operation/?page_size=2'
+        while url:
+            body = self.client.get(url).json()
+            assert 'count' not in body
+            ids.extend(item['id'] for item in body['results'])
+            url = body['next']
+
+        assert ids == sorted(ids, reverse=True)
+        assert len(ids) == 5
+
+    def test_page_number_without_count(self):
+        Product.objects.bulk_create([
+            Product(
+                name=f'Тонер {i}', category=self.category, sku=f'TONER-{i:03}',
+                is_consumable=True, unit='шт', min_stock=0
+            )
+            for i in range(20)
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/products/', {'count': 'false'})
+        body = response.json()
+
+        assert response.status_code == 200
+        assert body['count'] is None
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+        assert body['previous'] is None
+        assert 'page=2' in body['next']
+
+    def test_page_number_without_count_last_page(self):
+        response = self.client.get('/api/v1/products/', {'count': 'false', 'page': 2})
+        body = response.json()
+
+        assert len(body['results']) == 0
+        assert body['next'] is None
+        assert body['previous'] is not None
+
+    def test_page_number_with_count_unchanged(self):
+        body = self.client.get('/api/v1/products/').json()
+
+        assert body['count'] == 5
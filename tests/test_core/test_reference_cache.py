@@ -0,0 +1,91 @@
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.reference_cache import TwoTierCache
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.stock.serializers import ReceiptSerializer
+
+
+class TestTwoTierCache:
+
+    def test_local_tier_survives_shared_cache_loss(self):
+        tiers = TwoTierCache('test:')
+        key = tiers.make_key({'products': 1}, 'a')
+        tiers.set(key, {'id': 1})
+        cache.clear()
+
+        assert tiers.get(key) == {'id': 1}
+
+    def test_version_change_changes_key(self):
+        tiers = TwoTierCache('test:')
+
+        assert tiers.make_key({'products': 1}, 'a') != tiers.make_key({'products': 2}, 'a')
+
+    def test_local_tier_is_bounded(self):
+        tiers = TwoTierCache('test:', max_local_items=2)
+        for key in ('a', 'b', 'c'):
+            tiers.set(key, key)
+        cache.clear()
+
+        assert [tiers.get(key) for key in ('a', 'b', 'c')] == [None, 'b', 'c']
+
+
+@pytest.mark.django_db
+class TestReferenceCache:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='testuser', password='pass'))
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Бумага A4', category=self.category, sku='PAPER-A4',
+            is_consumable=True, unit='пачка', min_stock=10
+        )
+
+    def test_list_served_from_cache_until_change(self, django_capture_on_commit_callbacks):
+        self.client.get('/api/v1/categories/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/categories/')
+        assert len(queries) == 0
+        assert response.json()['count'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Category.objects.create(name='Бумага')
+
+        assert self.client.get('/api/v1/categories/').json()['count'] == 2
+
+    def test_write_serializer_resolves_pk_from_cache(self):
+        data = {'product': self.product.id, 'location': self.location.id, 'quantity': 5}
+        assert ReceiptSerializer(data=data).is_valid()
+
+        with CaptureQueriesContext(connection) as queries:
+            serializer = ReceiptSerializer(data=data)
+            assert serializer.is_valid()
+
+        assert len(queries) == 0
+        assert serializer.validated_data['product'] == self.product
+
+    def test_cached_field_keeps_queryset_restriction(self, django_capture_on_commit_callbacks):
+        data = {'product': self.product.id, 'location': self.location.id, 'quantity': 5}
+        assert ReceiptSerializer(data=data).is_valid()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.product.is_consumable = False
+            self.product.save()
+
+        serializer = ReceiptSerializer(data=data)
+        assert not serializer.is_valid()
+        assert 'product' in serializer.errors
+
+    def test_cached_field_rejects_bad_pk(self):
+        serializer = ReceiptSerializer(data={'product': 'abc', 'location': 999, 'quantity': 5})
+
+        assert not serializer.is_valid()
+        assert set(serializer.errors) == {'product', 'location'}
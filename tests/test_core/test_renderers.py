@@ -0,0 +1,59 @@
+import io
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.assets.models import Asset
+from apps.core import parsers, renderers
+from apps.core.parsers import ORJSONParser
+from apps.core.renderers import ORJSONRenderer
+
+
+PAYLOAD = {
+    'created_at': datetime(2024, 1, 15, 12, 30, 45, 123456, tzinfo=dt_timezone.utc),
+    'day': date(2024, 1, 15),
+    'price': Decimal('10.50'),
+    'label': _('Выдана'),
+    'status': Asset.StatusChoices.ISSUED,
+    'comment': 'строка\u2028с разделителем',
+    'by_id': {1: 'a', 2: None},
+    'items': [1, 2.5, True, None],
+}
+
+
+class TestORJSONRenderer:
+
+    def test_output_matches_json_renderer(self):
+        assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+    def test_indent_falls_back_to_json_renderer(self):
+        media_type = 'application/json; indent=4'
+
+        assert ORJSONRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(PAYLOAD, media_type)
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+
+        assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+class TestORJSONParser:
+
+    def test_parse(self):
+        body = '{"recipient": "Иванов", "items": [1, 2]}'.encode()
+
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    def test_invalid_json(self):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"recipient": '))
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(parsers, 'orjson', None)
+
+        assert ORJSONParser().parse(io.BytesIO(b'{"a": 1}')) == {'a': 1}
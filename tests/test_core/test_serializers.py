@@ -0,0 +1,87 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from apps.assets.models import Asset
+from apps.assets.serializers import AssetListSerializer, AssetListValuesSerializer
+from apps.issues.models import Issuance
+from apps.issues.serializers import IssuanceListSerializer, IssuanceListValuesSerializer
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.stock.models import Stock, StockOperations
+from apps.stock.serializers import (
+    StockOperationSerializer, StockOperationValuesSerializer,
+    StockSerializer, StockValuesSerializer
+)
+from apps.stock.services import StockService
+from apps.writeoffs.models import WriteOff
+from apps.writeoffs.serializers import WriteOffListSerializer, WriteOffListValuesSerializer
+from apps.writeoffs.services import WriteOffService
+
+
+@pytest.mark.django_db
+class TestValuesSerializers:
+    """Быстрые сериализаторы дают тот же JSON, что и ModelSerializer"""
+
+    def setup_method(self):
+        self.location = Location.objects.create(name='Склад 1')
+        self.other = Location.objects.create(name='Склад 2')
+        category = Category.objects.create(name='Разное')
+        self.paper = Product.objects.create(
+            name='Бумага A4', category=category, sku='PAPER-A4',
+            is_consumable=True, unit='пачка', min_stock=10
+        )
+        self.laptop = Product.objects.create(
+            name='Ноутбук Dell', category=category, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+
+        StockService.create_receipt(self.paper, self.location, 20, 'Поставка')
+        StockService.create_transfer(self.paper, self.location, self.other, 15, '')
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 2, 'Брак')
+
+        issued = Asset.objects.create(
+            product=self.laptop, inventory_number='INV-001', current_location=self.location
+        )
+        returned = Asset.objects.create(
+            product=self.laptop, inventory_number='INV-002', current_location=self.location
+        )
+        Asset.objects.create(product=self.laptop, inventory_number='INV-003')
+        broken = Asset.objects.create(
+            product=self.laptop, inventory_number='INV-004', current_location=self.other
+        )
+        IssuancesService.create_issuance(issued, 'Иванов И.И.')
+        IssuancesService.create_return(
+            IssuancesService.create_issuance(returned, 'Петров П.П.'), self.other
+        )
+        WriteOffService.create_writeoff_asset(broken, 'Сломан')
+
+    def assert_identical(self, queryset, serializer_class, values_serializer_class):
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = JSONRenderer().render(
+            values_serializer_class(values_serializer_class.prepare(queryset)).data
+        )
+        assert actual == expected
+
+    def test_assets(self):
+        self.assert_identical(
+            Asset.objects.order_by('pk'), AssetListSerializer, AssetListValuesSerializer
+        )
+
+    def test_stock(self):
+        self.assert_identical(Stock.objects.order_by('pk'), StockSerializer, StockValuesSerializer)
+
+    def test_stock_operations(self):
+        self.assert_identical(
+            StockOperations.objects.all(), StockOperationSerializer, StockOperationValuesSerializer
+        )
+
+    def test_issuances(self):
+        self.assert_identical(
+            Issuance.objects.all(), IssuanceListSerializer, IssuanceListValuesSerializer
+        )
+
+    def test_writeoffs(self):
+        self.assert_identical(
+            WriteOff.objects.all(), WriteOffListSerializer, WriteOffListValuesSerializer
+        )
@@ -0,0 +1,75 @@
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core import versioning
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.stock.services import StockService
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='testuser', password='pass'))
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Бумага A4', category=self.category, sku='PAPER-A4',
+            is_consumable=True, unit='пачка', min_stock=10
+        )
+
+    def test_not_modified_without_queries(self):
+        etag = self.client.get('/api/v1/stock/')['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/stock/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert len(queries) == 0
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get('/api/v1/stock/')['ETag']
+
+        assert self.client.get('/api/v1/stock/?page=1')['ETag'] != first
+
+    def test_service_update_changes_etag(self, django_capture_on_commit_callbacks):
+        etag = self.client.get('/api/v1/stock/')['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.create_receipt(self.product, self.location, 5, '')
+
+        response = self.client.get('/api/v1/stock/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['quantity'] == 5
+
+    def test_related_resource_changes_etag(self, django_capture_on_commit_callbacks):
+        etag = self.client.get('/api/v1/products/')['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.category.name = 'Бумага'
+            self.category.save()
+
+        assert self.client.get('/api/v1/products/', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get('/api/v1/products/')['Last-Modified']
+
+        response = self.client.get('/api/v1/products/', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 304
+
+    def test_bump_waits_for_commit(self, django_capture_on_commit_callbacks):
+        before = versioning.get_versions(['stock'])
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            versioning.bump('stock')
+            assert versioning.get_versions(['stock']) == before
+
+        callbacks[0]()
+        assert versioning.get_versions(['stock']) != before
@@ -0,0 +1,159 @@
+import pytest
+from rest_framework.test import APIClient
+
+from apps.assets.models import Asset
+from apps.core import versioning
+from apps.issues.models import Issuance
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from django.contrib.auth.models import User
+
+
+@pytest.mark.django_db
+class TestBulkIssuance:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.location = Location.objects.create(name='Склад 1')
+        self.office = Location.objects.create(name='Офис')
+        category = Category.objects.create(name='Ноутбуки')
+        self.product = Product.objects.create(
+            name='Ноутбук Dell', category=category, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        self.assets = [
+            Asset.objects.create(
+                product=self.product, inventory_number=f'INV-{index:03}',
+                current_location=self.location
+            )
+            for index in range(5)
+        ]
+
+    def test_bulk_issue_uses_constant_queries(self, django_assert_max_num_queries):
+        lines = [
+            {'inventory_item': asset.id, 'recipient': f'Сотрудник {index}'}
+            for index, asset in enumerate(self.assets)
+        ]
+
+        # Блокировка, открытые выдачи, сотрудники (SELECT/INSERT/SELECT),
+        # bulk_create под savepoint, UPDATE, журнал событий - независимо от размера пакета
+        with django_assert_max_num_queries(12):
+            result = IssuancesService.create_issuances_bulk(lines)
+
+        assert result['applied'] == 5
+        assert not result['errors']
+        assert Asset.objects.filter(status=Asset.StatusChoices.ISSUED).count() == 5
+        issuance = Issuance.objects.get(inventory_item=self.assets[0])
+        assert issuance.recipient == 'Сотрудник 0'
+        assert issuance.due_date is not None
+
+    def test_bulk_issue_atomic_reports_errors(self):
+        IssuancesService.create_issuance(self.assets[0], 'Иванов')
+        lines = [
+            {'inventory_item': self.assets[0].id, 'recipient': 'Петров'},
+            {'inventory_item': self.assets[1].id, 'recipient': 'Сидоров'},
+            {'inventory_item': self.assets[1].id, 'recipient': 'Сидоров'},
+            {'inventory_item': 999999, 'recipient': 'Никто'},
+            {'recipient': 'Без техники'},
+        ]
+
+        response = self.client.post('/api/v1/issues/bulk_issue/', {'lines': lines}, format='json')
+
+        assert response.status_code == 400
+        assert [error['line'] for error in response.json()['errors']] == [4]
+        response = self.client.post(
+            '/api/v1/issues/bulk_issue/', {'lines': lines[:4]}, format='json'
+        )
+        assert [error['line'] for error in response.json()['errors']] == [0, 2, 3]
+        assert Issuance.objects.count() == 1
+
+    def test_bulk_issue_best_effort(self, django_capture_on_commit_callbacks):
+        self.assets[2].status = Asset.StatusChoices.MAINTENANCE
+        self.assets[2].save()
+        lines = [
+            {'inventory_item': asset.id, 'recipient': 'Новичок'}
+            for asset in self.assets[1:4]
+        ]
+        before = versioning.get_versions(['assets'])['assets']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.client.post(
+                '/api/v1/issues/bulk_issue/',
+                {'lines': lines, 'mode': 'best_effort'},
+                format='json'
+            )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data['applied'] == 2
+        assert [error['line'] for error in data['errors']] == [1]
+        assert versioning.get_versions(['assets'])['assets'] > before
+
+    @pytest.mark.parametrize('mode', ['atomic', 'best_effort'])
+    def test_bulk_issue_reports_concurrent_issuance(self, mode, monkeypatch):
+        insert_issuances = IssuancesService._insert_issuances
+
+        def concurrent_issue(pending, errors, atomic):
+            # Одиночная выдача технику не блокирует - успевает между проверкой и вставкой пакета
+            Issuance.create_trusted(inventory_item=self.assets[1], recipient='Иванов')
+            return insert_issuances(pending, errors, atomic)
+
+        monkeypatch.setattr(IssuancesService, '_insert_issuances', staticmethod(concurrent_issue))
+        lines = [{'inventory_item': asset.id, 'recipient': 'Новичок'} for asset in self.assets[:3]]
+        response = self.client.post(
+            '/api/v1/issues/bulk_issue/', {'lines': lines, 'mode': mode}, format='json'
+        )
+
+        data = response.json()
+        assert [error['line'] for error in data['errors']] == [1]
+        assert 'уже выдана пользователю Иванов' in data['errors'][0]['error']
+        if mode == 'atomic':
+            assert response.status_code == 400
+            assert Issuance.objects.filter(recipient='Новичок').count() == 0
+        else:
+            assert response.status_code == 201
+            assert data['applied'] == 2
+            assert Issuance.objects.filter(recipient='Новичок').count() == 2
+
+    def test_bulk_return(self, django_assert_max_num_queries):
+        issuances = IssuancesService.create_issuances_bulk([
+            {'inventory_item': asset.id, 'recipient': 'Уволенный'} for asset in self.assets
+        ])['issuances']
+        lines = [
+            {'issuance': issuance_id, 'location': self.office.id if index % 2 else self.location.id}
+            for index, issuance_id in enumerate(issuances)
+        ]
+
+        with django_assert_max_num_queries(8):
+            result = IssuancesService.return_bulk(lines)
+
+        assert result['applied'] == 5
+        assert not Issuance.objects.filter(return_date__isnull=True).exists()
+        assert Asset.objects.filter(
+            status=Asset.StatusChoices.IN_STOCK, current_location=self.office
+        ).count() == 2
+
+    def test_bulk_return_endpoint_reports_errors(self):
+        issuance = IssuancesService.create_issuance(self.assets[0], 'Иванов')
+        lines = [
+            {'issuance': issuance.id, 'location': self.office.id, 'comment': 'Переезд'},
+            {'issuance': issuance.id, 'location': self.office.id},
+            {'issuance': 999999, 'location': self.office.id},
+        ]
+
+        response = self.client.post(
+            '/api/v1/issues/bulk_return/',
+            {'lines': lines, 'mode': 'best_effort'},
+            format='json'
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['applied'] == 1
+        assert [error['line'] for error in data['errors']] == [1, 2]
+        issuance.refresh_from_db()
+        assert issuance.return_comment == 'Переезд'
+        assert issuance.inventory_item.current_location == self.office
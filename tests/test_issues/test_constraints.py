@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connection
+
+from apps.assets.models import Asset
+from apps.core.exceptions import AssetNotAvailableError
+from apps.issues.models import Issuance
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+def make_asset():
+    category = Category.objects.create(name='Ноутбуки')
+    product = Product.objects.create(
+        name='Ноутбук Dell', category=category, sku='DELL-001',
+        is_consumable=False, unit='шт', min_stock=0
+    )
+    return Asset.objects.create(product=product, inventory_number='INV-001')
+
+
+@pytest.mark.django_db
+class TestSingleOpenIssuance:
+
+    def setup_method(self):
+        self.asset = make_asset()
+        self.location = Location.objects.create(name='Склад')
+
+    def test_issuance_runs_no_select(self, django_assert_max_num_queries):
+        with django_assert_max_num_queries(7) as captured:
+            IssuancesService.create_issuance(self.asset, 'Иванов')
+
+        statements = [query['sql'].split()[0].upper() for query in captured.captured_queries]
+        assert 'SELECT' not in statements
+        # Выдача и событие AssetEvent
+        assert statements.count('INSERT') == 2
+        assert statements.count('UPDATE') == 1
+
+    def test_second_open_issuance_is_rejected(self):
+        IssuancesService.create_issuance(self.asset, 'Иванов')
+        stale = Asset.objects.get(pk=self.asset.pk)
+        stale.status = Asset.StatusChoices.IN_STOCK
+
+        with pytest.raises(AssetNotAvailableError, match='Иванов'):
+            IssuancesService.create_issuance(stale, 'Петров')
+
+        assert Issuance.objects.filter(inventory_item=self.asset).count() == 1
+
+    def test_reissue_after_return(self):
+        issuance = IssuancesService.create_issuance(self.asset, 'Иванов')
+        IssuancesService.create_return(issuance, self.location)
+
+        IssuancesService.create_issuance(self.asset, 'Петров')
+
+        assert Issuance.objects.filter(inventory_item=self.asset).count() == 2
+
+    def test_full_clean_validates_constraint(self):
+        IssuancesService.create_issuance(self.asset, 'Иванов')
+
+        with pytest.raises(ValidationError, match='незакрытая выдача'):
+            Issuance(inventory_item=self.asset, recipient='Петров').full_clean()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_issuances_of_same_asset():
+    asset = make_asset()
+    workers = 4
+    barrier = threading.Barrier(workers)
+    outcomes = []
+
+    def issue(recipient):
+        try:
+            # Все потоки видят технику в наличии - отказ дает только индекс
+            stale = Asset.objects.get(pk=asset.pk)
+            barrier.wait()
+            for _ in range(100):
+                try:
+                    IssuancesService.create_issuance(stale, recipient)
+                    outcomes.append('ok')
+                    return
+                except AssetNotAvailableError:
+                    outcomes.append('rejected')
+                    return
+                except OperationalError:
+                    # Тестовая SQLite в shared cache не ждет блокировку, а сразу
+                    # откатывает транзакцию - повторяем, как повторил бы клиент
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=issue, args=(f'Сотрудник {i}',)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes.count('ok') == 1
+    assert outcomes.count('rejected') == workers - 1
+    assert Issuance.objects.filter(inventory_item=asset, return_date__isnull=True).count() == 1
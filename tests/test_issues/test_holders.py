@@ -0,0 +1,110 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.assets.models import Asset
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from django.contrib.auth.models import User
+
+
+@pytest.mark.django_db
+class TestAssetCurrentHolder:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.location = Location.objects.create(name='Склад')
+        category = Category.objects.create(name='Ноутбуки')
+        self.product = Product.objects.create(
+            name='Ноутбук Dell', category=category, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        self.assets = [
+            Asset.objects.create(
+                product=self.product, inventory_number=f'INV-{index:03}',
+                current_location=self.location
+            )
+            for index in range(3)
+        ]
+
+    def test_issue_and_return_maintain_holder(self):
+        issuance = IssuancesService.create_issuance(self.assets[0], 'Иванов И.И.')
+
+        asset = Asset.objects.get(pk=self.assets[0].pk)
+        assert asset.current_issuance_id == issuance.id
+        assert asset.current_holder == 'Иванов И.И.'
+        assert asset.issued_at == issuance.issue_date
+
+        IssuancesService.create_return(issuance, self.location)
+
+        asset.refresh_from_db()
+        assert (asset.current_issuance_id, asset.current_holder, asset.issued_at) == (None, None, None)
+
+    def test_leaving_issued_status_clears_holder(self):
+        IssuancesService.create_issuance(self.assets[0], 'Иванов И.И.')
+        IssuancesService.create_issuance(self.assets[1], 'Петров П.П.')
+
+        response = self.client.post(f'/api/v1/assets/{self.assets[0].id}/mark_maintenance/')
+        assert response.status_code == 200
+
+        asset = Asset.objects.get(pk=self.assets[1].pk)
+        asset.status = Asset.StatusChoices.IN_STOCK
+        asset.save(update_fields=['status'])
+
+        for asset in Asset.objects.filter(pk__in=[self.assets[0].pk, self.assets[1].pk]):
+            assert not asset.has_holder
+        assert not Asset.objects.filter(holder_key__isnull=False).exists()
+
+        # Пересборка не возвращает держателя технике, которая не в статусе ISSUED
+        call_command('rebuild_asset_holders', stdout=io.StringIO())
+        assert not Asset.objects.filter(current_holder__isnull=False).exists()
+
+    def test_bulk_paths_maintain_holder(self):
+        result = IssuancesService.create_issuances_bulk([
+            {'inventory_item': asset.id, 'recipient': f'Сотрудник {index}'}
+            for index, asset in enumerate(self.assets)
+        ])
+
+        holders = dict(Asset.objects.values_list('inventory_number', 'current_holder'))
+        assert holders == {'INV-000': 'Сотрудник 0', 'INV-001': 'Сотрудник 1', 'INV-002': 'Сотрудник 2'}
+
+        IssuancesService.return_bulk([
+            {'issuance': issuance_id, 'location': self.location.id}
+            for issuance_id in result['issuances']
+        ])
+
+        assert not Asset.objects.filter(current_holder__isnull=False).exists()
+
+    def test_holder_filter(self):
+        IssuancesService.create_issuance(self.assets[0], 'Иванов И.И.')
+        IssuancesService.create_issuance(self.assets[1], 'Петров П.П.')
+
+        response = self.client.get('/api/v1/assets/', {'holder': ' иванов и.и. '})
+
+        assert response.status_code == 200
+        assert [item['inventory_number'] for item in response.json()['results']] == ['INV-000']
+        # Ключ тот же, что у сотрудника - латиница находит кириллическое написание
+        response = self.client.get('/api/v1/assets/', {'holder': 'Ivanov I.I.'})
+        assert [item['inventory_number'] for item in response.json()['results']] == ['INV-000']
+        detail = self.client.get(f'/api/v1/assets/{self.assets[0].id}/').json()
+        assert detail['current_holder'] == 'Иванов И.И.'
+
+    def test_rebuild_command(self):
+        issuance = IssuancesService.create_issuance(self.assets[0], 'Иванов И.И.')
+        Asset.objects.filter(pk=self.assets[0].pk).update(current_issuance=None, current_holder=None)
+        Asset.objects.filter(pk=self.assets[1].pk).update(current_holder='Призрак')
+        out = io.StringIO()
+
+        call_command('rebuild_asset_holders', '--batch-size', '2', stdout=out)
+
+        assert 'Исправлено единиц техники: 2' in out.getvalue()
+        holders = dict(Asset.objects.values_list('id', 'current_holder'))
+        assert holders[self.assets[0].id] == 'Иванов И.И.'
+        assert holders[self.assets[1].id] is None
+        assert Asset.objects.get(pk=self.assets[0].pk).current_issuance_id == issuance.id
+        assert IssuancesService.rebuild_current_holders() == 0
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.assets.models import Asset
+from apps.issues.models import Issuance
+from apps.issues.reminders import OverdueReminderService
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+class CollectingNotifier:
+    digests = []
+
+    def notify(self, digests):
+        self.digests.extend(digests)
+
+
+class FailingNotifier:
+
+    def notify(self, digests):
+        raise RuntimeError('SMTP недоступен')
+
+
+@pytest.mark.django_db
+class TestOverdueReminders:
+
+    @pytest.fixture(autouse=True)
+    def notifiers(self, settings):
+        settings.ISSUANCE_OVERDUE_NOTIFIERS = [f'{__name__}.CollectingNotifier']
+        CollectingNotifier.digests = []
+
+    def setup_method(self):
+        self.location = Location.objects.create(name='Склад 1')
+        category = Category.objects.create(name='Ноутбуки')
+        self.product = Product.objects.create(
+            name='Ноутбук Dell', category=category, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        self.counter = 0
+
+    def issue(self, recipient, days_overdue):
+        self.counter += 1
+        asset = Asset.objects.create(
+            product=self.product, inventory_number=f'INV-{self.counter:03}',
+            current_location=self.location
+        )
+        issuance = IssuancesService.create_issuance(asset, recipient)
+        Issuance.objects.filter(pk=issuance.pk).update(
+            due_date=timezone.now() - timedelta(days=days_overdue)
+        )
+        return issuance
+
+    def test_default_due_date_from_settings(self, settings):
+        settings.ISSUANCE_DEFAULT_TERM_DAYS = 30
+        self.counter += 1
+        asset = Asset.objects.create(
+            product=self.product, inventory_number='INV-DUE', current_location=self.location
+        )
+
+        issuance = IssuancesService.create_issuance(asset, 'Иванов И.И.')
+
+        assert timedelta(days=29) < issuance.due_date - timezone.now() <= timedelta(days=30)
+
+    def test_one_digest_per_recipient_across_pages(self):
+        for days in (1, 2, 3):
+            self.issue('Иванов И.И.', days)
+        self.issue('Петров П.П.', 5)
+        self.issue('Сидоров С.С.', -5)  # срок еще не наступил
+        returned = self.issue('Петров П.П.', 10)
+        IssuancesService.create_return(returned, self.location)
+
+        result = OverdueReminderService.send_reminders(page_size=2)
+
+        assert result == {'digests': 2, 'failed': 0, 'issuances': 4}
+        assert [(d.recipient, len(d.items)) for d in CollectingNotifier.digests] == [
+            ('Иванов И.И.', 3), ('Петров П.П.', 1)
+        ]
+
+    def test_issuance_without_due_date_uses_default_term(self, settings):
+        settings.ISSUANCE_DEFAULT_TERM_DAYS = 30
+        old = self.issue('Иванов И.И.', 0)
+        recent = self.issue('Петров П.П.', 0)
+        Issuance.objects.filter(pk=old.pk).update(
+            due_date=None, issue_date=timezone.now() - timedelta(days=31)
+        )
+        Issuance.objects.filter(pk=recent.pk).update(
+            due_date=None, issue_date=timezone.now() - timedelta(days=29)
+        )
+
+        result = OverdueReminderService.send_reminders()
+
+        assert result['issuances'] == 1
+        [digest] = CollectingNotifier.digests
+        assert digest.recipient == 'Иванов И.И.'
+        assert digest.items[0].due_date == Issuance.objects.get(pk=old.pk).issue_date + timedelta(days=30)
+
+    def test_recipient_spellings_share_digest(self):
+        self.issue('Иванов И.И.', 3)
+        self.issue('иванов  и.и.', 1)
+        self.issue('Ivanov I.I.', 2)
+
+        OverdueReminderService.send_reminders()
+
+        assert [(d.recipient, len(d.items)) for d in CollectingNotifier.digests] == [
+            ('Иванов И.И.', 3)
+        ]
+
+    def test_rerun_does_not_duplicate(self):
+        self.issue('Иванов И.И.', 1)
+
+        OverdueReminderService.send_reminders()
+        result = OverdueReminderService.send_reminders()
+
+        assert result['digests'] == 0
+        assert len(CollectingNotifier.digests) == 1
+
+    def test_reminds_again_after_interval(self, settings):
+        settings.ISSUANCE_REMINDER_INTERVAL_DAYS = 7
+        self.issue('Иванов И.И.', 1)
+        OverdueReminderService.send_reminders()
+
+        OverdueReminderService.send_reminders(now=timezone.now() + timedelta(days=8))
+
+        assert len(CollectingNotifier.digests) == 2
+
+    def test_failed_delivery_is_retried(self, settings):
+        settings.ISSUANCE_OVERDUE_NOTIFIERS = [f'{__name__}.FailingNotifier']
+        issuance = self.issue('Иванов И.И.', 1)
+
+        result = OverdueReminderService.send_reminders()
+
+        assert result['failed'] == 1
+        issuance.refresh_from_db()
+        assert issuance.reminded_at is None
+
+    def test_one_failing_notifier_does_not_block_others(self, settings, caplog):
+        settings.ISSUANCE_OVERDUE_NOTIFIERS = [
+            f'{__name__}.FailingNotifier', f'{__name__}.CollectingNotifier'
+        ]
+        issuance = self.issue('Иванов И.И.', 1)
+
+        result = OverdueReminderService.send_reminders()
+        OverdueReminderService.send_reminders()
+
+        assert result == {'digests': 1, 'failed': 0, 'issuances': 1}
+        assert len(CollectingNotifier.digests) == 1
+        assert 'FailingNotifier' in caplog.text
+        issuance.refresh_from_db()
+        assert issuance.reminded_at is not None
@@ -0,0 +1,125 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from apps.assets.models import Asset
+from apps.issues.models import Issuance
+from apps.issues.services import IssuancesService
+from apps.products.models import Product
+from apps.references.models import Category, Employee, Location
+from apps.references.services import EmployeeService
+from django.contrib.auth.models import User
+
+
+@pytest.mark.django_db
+class TestEmployees:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.location = Location.objects.create(name='Склад')
+        category = Category.objects.create(name='Ноутбуки')
+        self.product = Product.objects.create(
+            name='Ноутбук Dell', category=category, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        self.counter = 0
+
+    def make_asset(self):
+        self.counter += 1
+        return Asset.objects.create(product=self.product, inventory_number=f'INV-{self.counter:03}')
+
+    def test_spellings_resolve_to_one_employee(self):
+        first = EmployeeService.resolve('Иванов  И.')
+        second = EmployeeService.resolve('Ivanov I.')
+
+        assert first.pk == second.pk
+        assert first.name == 'Иванов И.'
+        assert first.search_key == 'ivanov i'
+        assert EmployeeService.resolve('   ') is None
+
+    def test_issuance_links_employee(self, django_capture_on_commit_callbacks):
+        existing = Employee.objects.create(name='Иванов И.')
+
+        # Существующий сотрудник связывается в транзакции выдачи на обоих путях,
+        # новый - создается задачей после коммита
+        with django_capture_on_commit_callbacks() as callbacks:
+            single = IssuancesService.create_issuance(self.make_asset(), 'Ivanov I.')
+            new_single = IssuancesService.create_issuance(self.make_asset(), 'Сидоров С.')
+            result = IssuancesService.create_issuances_bulk([
+                {'inventory_item': self.make_asset().id, 'recipient': 'ИВАНОВ И.'},
+                {'inventory_item': self.make_asset().id, 'recipient': 'Петров П.'},
+            ])
+
+        assert single.employee == existing
+        assert new_single.employee_id is None
+        assert existing.issuances.count() == 2
+        assert not Issuance.objects.filter(pk__in=result['issuances'], recipient='Петров П.',
+                                           employee__isnull=False).exists()
+
+        for callback in callbacks:
+            callback()
+
+        assert not Issuance.objects.filter(employee__isnull=True).exists()
+        assert Employee.objects.count() == 3
+
+    def test_search_and_issuances_endpoints(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            issuance = IssuancesService.create_issuance(self.make_asset(), 'Иванов И.')
+            IssuancesService.create_return(issuance, self.location)
+            IssuancesService.create_issuance(self.make_asset(), 'Ivanov I.')
+            IssuancesService.create_issuance(self.make_asset(), 'Петров П.')
+
+        response = self.client.get('/api/v1/employees/', {'q': 'иванов'})
+        assert [item['name'] for item in response.json()['results']] == ['Иванов И.']
+
+        employee_id = response.json()['results'][0]['id']
+        history = self.client.get(f'/api/v1/employees/{employee_id}/issuances/').json()
+        active = self.client.get(
+            f'/api/v1/employees/{employee_id}/issuances/', {'active': 'true'}
+        ).json()
+        assert history['count'] == 2
+        assert [item['inventory_number'] for item in active['results']] == ['INV-002']
+
+    def test_create_rejects_duplicate_spelling(self):
+        Employee.objects.create(name='Иванов И.')
+
+        response = self.client.post('/api/v1/employees/', {'name': 'IVANOV I'}, format='json')
+
+        assert response.status_code == 400
+
+    def test_issue_by_employee_id(self):
+        employee = Employee.objects.create(name='Сидоров С.')
+        asset = self.make_asset()
+
+        response = self.client.post(
+            '/api/v1/issues/create_issuance/',
+            {'inventory_item': asset.id, 'employee': employee.id},
+            format='json'
+        )
+
+        assert response.status_code == 201
+        assert response.json()['recipient'] == 'Сидоров С.'
+        assert response.json()['employee'] == employee.id
+
+    def test_backfill_command_dedupes_and_links(self):
+        assets = [self.make_asset() for _ in range(4)]
+        for asset, recipient in zip(assets, ['Иванов И.', 'ivanov i', 'Петров П.']):
+            Issuance.create_trusted(inventory_item=asset, recipient=recipient)
+        survivor = Employee.objects.create(name='Петров П.')
+        # Дубль с ключом, построенным по старому правилу нормализации
+        (duplicate,) = Employee.objects.bulk_create([Employee(name='Petrov P.', search_key='petrov-p')])
+        Issuance.create_trusted(inventory_item=assets[3], recipient='Petrov P.', employee=duplicate)
+        out = io.StringIO()
+
+        call_command('backfill_employees', '--dedupe', '--batch-size', '2', stdout=out)
+
+        assert not Issuance.objects.filter(employee__isnull=True).exists()
+        assert not Employee.objects.filter(pk=duplicate.pk).exists()
+        assert Employee.objects.get(search_key='ivanov i').issuances.count() == 2
+        assert survivor.issuances.count() == 2
+        assert 'Слито дублей сотрудников: 1' in out.getvalue()
+        assert 'Связано выдач с сотрудниками: 3' in out.getvalue()
@@ -1,3 +1,4 @@
+import json
 import pytest
 from rest_framework.test import APIClient
 
@@ -171,7 +172,7 @@ class TestProductView:
         response = self.client.get('/api/v1/products/consumables/')
 
         assert response.status_code == 200
-        data = response.json()
+        data = response.json()['results']
         assert len(data) == 1
         assert data[0]['is_consumable'] is True
 
@@ -196,7 +197,7 @@ class TestProductView:
         response = self.client.get('/api/v1/products/assets/')
 
         assert response.status_code == 200
-        data = response.json()
+        data = response.json()['results']
         assert len(data) == 1
         assert data[0]['is_consumable'] is False
 
@@ -225,3 +226,24 @@ class TestProductView:
 
         assert response.status_code == 200
         assert data['count'] == 1
+
+    def test_consumables_action_filters_and_streams(self):
+        for sku, category in (('CONS-001', self.category), ('CONS-002', None)):
+            Product.objects.create(
+                name=f'Расходник {sku}',
+                category=category or Category.objects.create(name='Другая'),
+                sku=sku,
+                is_consumable=True,
+                unit='шт',
+                min_stock=10
+            )
+
+        response = self.client.get(
+            '/api/v1/products/consumables/', {'category': self.category.id}
+        )
+        assert [item['sku'] for item in response.json()['results']] == ['CONS-001']
+
+        response = self.client.get('/api/v1/products/consumables/', {'all': 'true'})
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert sorted(json.loads(line)['sku'] for line in lines) == ['CONS-001', 'CONS-002']
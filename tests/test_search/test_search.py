@@ -0,0 +1,132 @@
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from apps.assets.models import Asset
+from apps.products.models import Product
+from apps.references.models import Category
+from apps.search import tasks
+from apps.search.models import SearchEntry
+from apps.search.services import SearchService
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    @pytest.fixture(autouse=True)
+    def catalog(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            self.category = Category.objects.create(name='Ноутбуки')
+            self.laptop = Product.objects.create(
+                name='Ноутбук Dell Latitude', category=self.category, sku='DELL-LAT-5420',
+                is_consumable=False, unit='шт', min_stock=0,
+                description='Рабочий ноутбук для офиса'
+            )
+            self.printer = Product.objects.create(
+                name='Принтер HP LaserJet', category=self.category, sku='HP-LJ-1020',
+                is_consumable=False, unit='шт', min_stock=0
+            )
+            self.assets = [
+                Asset.objects.create(
+                    product=self.laptop, inventory_number=f'INV-2024-{i:03}', serial_number=f'SN{i}XYZ'
+                )
+                for i in range(1, 4)
+            ]
+        self.capture = django_capture_on_commit_callbacks
+
+    def ids(self, results, kind):
+        return [result.object_id for result in results if result.kind == kind]
+
+    def test_documents_maintained_by_signals(self):
+        assert SearchEntry.objects.filter(kind=SearchEntry.KIND_PRODUCT).count() == 2
+        assert SearchEntry.objects.filter(kind=SearchEntry.KIND_ASSET).count() == 3
+
+        with self.capture(execute=True):
+            self.laptop.name = 'Ноутбук Lenovo ThinkPad'
+            self.laptop.save()
+
+        entry = SearchEntry.objects.get(kind=SearchEntry.KIND_ASSET, object_id=self.assets[0].id)
+        assert 'lenovo' in entry.document
+
+    def test_reindex_only_on_document_fields(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(tasks.reindex_products, 'delay', lambda ids: calls.append(('product', ids)))
+        monkeypatch.setattr(tasks.reindex_assets, 'delay', lambda ids: calls.append(('asset', ids)))
+        product = Product.objects.get(pk=self.laptop.pk)
+        asset = Asset.objects.get(pk=self.assets[0].pk)
+
+        with self.capture(execute=True):
+            product.min_stock = 5
+            product.save()
+            asset.status = Asset.StatusChoices.MAINTENANCE
+            asset.save()
+            Product.objects.get(pk=self.printer.pk).save(update_fields=['unit'])
+        assert calls == []
+
+        with self.capture(execute=True):
+            product.sku = 'DELL-LAT-7420'
+            product.save(update_fields=['sku'])
+            asset.serial_number = 'SN9XYZ'
+            asset.save()
+        assert calls == [('product', [self.laptop.id]), ('asset', [self.assets[0].id])]
+
+    def test_category_rename_reindexed_after_commit(self):
+        with self.capture() as callbacks:
+            self.category.name = 'Портативные компьютеры'
+            self.category.save()
+        entry = SearchEntry.objects.get(kind=SearchEntry.KIND_PRODUCT, object_id=self.laptop.id)
+        assert 'портативные' not in entry.document
+
+        for callback in callbacks:
+            callback()
+
+        entry.refresh_from_db()
+        assert 'портативные' in entry.document
+
+    def test_ranked_words(self):
+        results = SearchService.search('ноутбук dell', kinds=[SearchEntry.KIND_PRODUCT])
+
+        # Принтер тоже в категории «Ноутбуки», но совпадает хуже
+        assert self.ids(results, 'product') == [self.laptop.id, self.printer.id]
+        assert results[0].score > results[1].score
+
+    def test_typo_tolerance(self):
+        results = SearchService.search('ноутбк', kinds=[SearchEntry.KIND_PRODUCT])
+
+        assert self.ids(results, 'product')[0] == self.laptop.id
+
+    def test_inventory_number_prefix(self):
+        results = SearchService.search('inv-2024-00', kinds=[SearchEntry.KIND_ASSET])
+
+        assert sorted(self.ids(results, 'asset')) == sorted(asset.id for asset in self.assets)
+
+    def test_exact_serial_ranks_first(self):
+        results = SearchService.search('SN2XYZ')
+
+        assert (results[0].kind, results[0].object_id) == ('asset', self.assets[1].id)
+
+    def test_deleted_asset_removed(self):
+        with self.capture(execute=True):
+            self.assets[0].delete()
+
+        results = SearchService.search('inv-2024-001', kinds=[SearchEntry.KIND_ASSET])
+        assert self.assets[0].id not in self.ids(results, 'asset')
+
+    def test_rebuild_command(self, capsys):
+        SearchEntry.objects.all().delete()
+
+        call_command('rebuild_search_index')
+
+        assert '5 документов' in capsys.readouterr().out
+        assert SearchEntry.objects.count() == 5
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='testuser', password='pass'))
+
+        response = client.get('/api/v1/search/', {'q': 'принтер', 'kind': 'product'})
+
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == [self.printer.id]
+        assert client.get('/api/v1/search/').status_code == 400
@@ -0,0 +1,85 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from apps.stock.services import StockService
+from apps.stock.models import StockOperations, StockSnapshot
+from apps.writeoffs.services import WriteOffService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+@pytest.mark.django_db
+class TestStockLedger:
+
+    def setup_method(self):
+        self.category = Category.objects.create(name='Расходники')
+        self.location1 = Location.objects.create(name='Склад 1')
+        self.location2 = Location.objects.create(name='Склад 2')
+        self.product = Product.objects.create(
+            name='Картридж HP',
+            category=self.category,
+            sku='HP-CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+        self.now = timezone.now()
+
+    def backdate(self, operation, days):
+        StockOperations.objects.filter(pk=operation.pk).update(
+            timestamp=self.now - timedelta(days=days)
+        )
+
+    def test_balance_at_uses_snapshot_and_tail(self):
+        self.backdate(StockService.create_receipt(self.product, self.location1, 100, ''), 10)
+        self.backdate(StockService.create_expense(self.product, self.location1, 30, ''), 6)
+        self.backdate(
+            StockService.create_transfer(self.product, self.location1, self.location2, 20, ''), 2
+        )
+        WriteOffService.create_writeoff_consumable(self.product, self.location1, 5, 'Брак')
+
+        assert StockService.create_snapshot(self.now - timedelta(days=5)) == 1
+        assert StockService.create_snapshot(self.now - timedelta(days=5)) == 0
+
+        # Снимок не должен пересчитываться из истории до него
+        StockOperations.objects.filter(timestamp__lt=self.now - timedelta(days=5)).delete()
+
+        balance = StockService.get_balance_at
+        assert balance(self.product, self.location1, self.now - timedelta(days=4)) == 70
+        assert balance(self.product, self.location1, self.now - timedelta(days=1)) == 50
+        assert balance(self.product, self.location2, self.now - timedelta(days=1)) == 20
+        assert balance(self.product, self.location1, self.now + timedelta(seconds=1)) == 45
+
+    def test_balances_at_without_snapshots(self):
+        self.backdate(StockService.create_receipt(self.product, self.location1, 10, ''), 3)
+        StockService.create_receipt(self.product, self.location2, 7, '')
+
+        balances = StockService.get_balances_at(self.now - timedelta(days=1))
+
+        assert balances == {(self.product.id, self.location1.id): 10}
+        assert not StockSnapshot.objects.exists()
+
+    def test_as_of_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='testuser', password='pass'))
+
+        self.backdate(StockService.create_receipt(self.product, self.location1, 10, ''), 3)
+        StockService.create_receipt(self.product, self.location2, 7, '')
+
+        day = (self.now - timedelta(days=2)).date().isoformat()
+        response = client.get(f'/api/v1/stock/as-of/?date={day}')
+
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == 1
+        assert results[0]['location_name'] == 'Склад 1'
+        assert results[0]['quantity'] == 10
+
+        assert client.get('/api/v1/stock/as-of/').status_code == 400
+        assert client.get('/api/v1/stock/as-of/?date=2024-02-30').status_code == 400
+        assert client.get('/api/v1/stock/as-of/?date=2024-02-30T10:00:00').status_code == 400
+        assert client.get(f'/api/v1/stock/as-of/?date={day}&location=abc').status_code == 400
+        assert client.get(f'/api/v1/stock/as-of/?date={day}&location=999999').status_code == 404
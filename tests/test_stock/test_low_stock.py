@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from apps.stock.low_stock import LowStockIndex
+from apps.stock.services import StockService
+from apps.stock.models import Stock
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+@pytest.mark.django_db
+class TestLowStockIndex:
+
+    def setup_method(self):
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Картридж HP', category=self.category, sku='HP-CART-001',
+            is_consumable=True, unit='шт', min_stock=10
+        )
+
+    def test_service_mutations_maintain_index(self, django_capture_on_commit_callbacks):
+        LowStockIndex.rebuild()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.create_receipt(self.product, self.location, 20, '')
+        assert LowStockIndex.stock_ids() == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.create_expense(self.product, self.location, 15, '')
+        stock = Stock.objects.get(product=self.product, location=self.location)
+        assert LowStockIndex.stock_ids() == [stock.id]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.create_receipt(self.product, self.location, 5, '')
+        assert LowStockIndex.stock_ids() == []
+
+    def test_min_stock_change_reindexes_product(self, django_capture_on_commit_callbacks):
+        stock = Stock.objects.create(product=self.product, location=self.location, quantity=15)
+        LowStockIndex.rebuild()
+        assert LowStockIndex.stock_ids() == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.product.min_stock = 20
+            self.product.save()
+
+        assert LowStockIndex.stock_ids() == [stock.id]
+
+    def test_index_rebuilt_when_missing(self):
+        stock = Stock.objects.create(product=self.product, location=self.location, quantity=3)
+        cache.clear()
+
+        assert LowStockIndex.stock_ids() == [stock.id]
+
+    def test_endpoint_and_rebuild_command(self, capsys):
+        Stock.objects.create(product=self.product, location=self.location, quantity=3)
+        call_command('rebuild_low_stock_index')
+        assert '1 позиций' in capsys.readouterr().out
+
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create_user(username='testuser', password='pass'))
+        response = client.get('/api/v1/stock/low_stock/')
+
+        assert response.status_code == 200
+        assert [item['product_sku'] for item in response.json()['results']] == ['HP-CART-001']
@@ -0,0 +1,56 @@
+import pytest
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.stock.models import Stock, StockOperations
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+@pytest.mark.django_db
+class TestStockConstraints:
+
+    def setup_method(self):
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Картридж HP',
+            category=self.category,
+            sku='HP-CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+
+    def test_negative_quantity_rejected_by_database(self):
+        stock = Stock.create_trusted(product=self.product, location=self.location, quantity=1)
+
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                Stock.objects.filter(pk=stock.pk).update(quantity=-1)
+
+    def test_operation_locations_must_match_type(self):
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                StockOperations.create_trusted(
+                    product=self.product,
+                    operation_type=StockOperations.OperationChoices.EXPENSE,
+                    quantity=1,
+                    to_location=self.location
+                )
+
+    def test_trusted_write_skips_validation_queries(self):
+        product = Product.objects.get(pk=self.product.pk)
+
+        def write(validate):
+            with CaptureQueriesContext(connection) as ctx:
+                StockOperations(
+                    product_id=product.pk,
+                    operation_type=StockOperations.OperationChoices.RECEIPT,
+                    quantity=1,
+                    to_location_id=self.location.pk
+                ).save(validate=validate)
+            return len(ctx.captured_queries)
+
+        assert write(validate=False) == 1
+        assert write(validate=True) > 1
@@ -0,0 +1,70 @@
+import pytest
+from django.core.management import call_command
+
+from apps.stock.reconciliation import ReconciliationService
+from apps.stock.services import StockService
+from apps.stock.models import Stock, StockDiscrepancy
+from apps.writeoffs.services import WriteOffService
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+@pytest.mark.django_db
+class TestReconciliation:
+
+    def setup_method(self):
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product1 = Product.objects.create(
+            name='Картридж HP', category=self.category, sku='HP-CART-001',
+            is_consumable=True, unit='шт', min_stock=0
+        )
+        self.product2 = Product.objects.create(
+            name='Бумага A4', category=self.category, sku='PAPER-A4-001',
+            is_consumable=True, unit='пачка', min_stock=0
+        )
+
+    def test_consistent_ledger_has_no_discrepancies(self):
+        StockService.create_receipt(self.product1, self.location, 10, '')
+        StockService.create_expense(self.product1, self.location, 3, '')
+        WriteOffService.create_writeoff_consumable(self.product1, self.location, 2, 'Брак')
+
+        run = ReconciliationService.reconcile()
+
+        assert run.is_full
+        assert run.products_checked == 2
+        assert run.discrepancies_found == 0
+
+    def test_detects_direct_stock_edit(self):
+        StockService.create_receipt(self.product1, self.location, 10, '')
+        ReconciliationService.reconcile()
+
+        stock = Stock.objects.get(product=self.product1, location=self.location)
+        stock.quantity = 15
+        stock.save()
+
+        run = ReconciliationService.reconcile()
+
+        assert not run.is_full
+        assert run.products_checked == 1
+        discrepancy = StockDiscrepancy.objects.get(run=run)
+        assert (discrepancy.expected, discrepancy.actual) == (10, 15)
+
+    def test_incremental_run_checks_only_new_activity(self):
+        StockService.create_receipt(self.product1, self.location, 10, '')
+        StockService.create_receipt(self.product2, self.location, 10, '')
+        ReconciliationService.reconcile()
+
+        StockService.create_expense(self.product2, self.location, 1, '')
+        run = ReconciliationService.reconcile()
+
+        assert run.products_checked == 1
+        assert run.discrepancies_found == 0
+
+    def test_management_command(self, capsys):
+        Stock.objects.create(product=self.product1, location=self.location, quantity=4)
+
+        call_command('reconcile_stock', '--full')
+
+        output = capsys.readouterr().out
+        assert 'HP-CART-001 / Склад 1: журнал 0, Stock 4' in output
@@ -1,6 +1,8 @@
 import pytest
+from django.db import connection
 from django.core.exceptions import ValidationError
 from apps.stock.services import StockService
+from apps.core.exceptions import InsufficientStockError
 from apps.stock.models import Stock, StockOperations
 from apps.products.models import Product
 from apps.references.models import Category, Location
@@ -463,3 +465,174 @@ class TestStockService:
         # Проверяем что остаток не изменился
         stock = Stock.objects.get(product=product, location=location)
         assert stock.quantity == 10
+
+    def test_expense_does_not_overwrite_concurrent_change(self):
+        category = Category.objects.create(name='Расходники')
+        location = Location.objects.create(name='Склад 1')
+        product = Product.objects.create(
+            name='Картридж HP',
+            category=category,
+            sku='HP-CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+
+        stale = Stock.objects.create(product=product, location=location, quantity=10)
+
+        # Параллельный запрос уже списал 8 штук, stale хранит устаревшее значение
+        Stock.objects.filter(pk=stale.pk).update(quantity=2)
+
+        with pytest.raises(ValidationError) as excinfo:
+            StockService.create_expense(
+                product=product,
+                location=location,
+                quantity=5,
+                comment='Устаревший остаток в памяти'
+            )
+
+        assert 'Доступно: 2' in str(excinfo.value)
+        stale.refresh_from_db()
+        assert stale.quantity == 2
+
+    def test_decrease_stock_returns_new_quantity(self):
+        category = Category.objects.create(name='Расходники')
+        location = Location.objects.create(name='Склад 1')
+        product = Product.objects.create(
+            name='Бумага A4',
+            category=category,
+            sku='PAPER-A4-001',
+            is_consumable=True,
+            unit='пачка',
+            min_stock=0
+        )
+
+        Stock.objects.create(product=product, location=location, quantity=10)
+
+        assert StockService.decrease_stock(product, location, 10) == 0
+
+        with pytest.raises(InsufficientStockError):
+            StockService.decrease_stock(product, location, 1)
+
+        assert StockService.get_current_stock(product, location) == 0
+
+    def test_create_transfer_creates_destination_stock(self):
+        category = Category.objects.create(name='Расходники')
+        location1 = Location.objects.create(name='Склад 1')
+        location2 = Location.objects.create(name='Склад 2')
+        product = Product.objects.create(
+            name='Картридж',
+            category=category,
+            sku='CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+
+        Stock.objects.create(product=product, location=location1, quantity=5)
+
+        StockService.create_transfer(
+            product=product,
+            from_location=location1,
+            to_location=location2,
+            quantity=5,
+            comment=''
+        )
+        StockService.create_transfer(
+            product=product,
+            from_location=location2,
+            to_location=location1,
+            quantity=2,
+            comment=''
+        )
+
+        assert StockService.get_current_stock(product, location1) == 2
+        assert StockService.get_current_stock(product, location2) == 3
+
+    def test_apply_batch_groups_lines(self):
+        category = Category.objects.create(name='Расходники')
+        location1 = Location.objects.create(name='Склад 1')
+        location2 = Location.objects.create(name='Склад 2')
+        product = Product.objects.create(
+            name='Картридж',
+            category=category,
+            sku='CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+
+        Stock.objects.create(product=product, location=location1, quantity=5)
+
+        result = StockService.apply_batch([
+            {'operation_type': 'receipt', 'product': product.id, 'location': location1.id, 'quantity': 10},
+            {'operation_type': 'expense', 'product': product.id, 'location': location1.id, 'quantity': 12},
+            {'operation_type': 'transfer', 'product': product.id,
+             'from_location': location1.id, 'to_location': location2.id, 'quantity': 3},
+        ])
+
+        assert result['applied'] == 3
+        assert result['errors'] == []
+        assert StockOperations.objects.count() == 3
+        assert StockService.get_current_stock(product, location1) == 0
+        assert StockService.get_current_stock(product, location2) == 3
+
+    def test_apply_batch_atomic_and_best_effort(self):
+        category = Category.objects.create(name='Расходники')
+        location = Location.objects.create(name='Склад 1')
+        product = Product.objects.create(
+            name='Картридж',
+            category=category,
+            sku='CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+
+        lines = [
+            {'operation_type': 'receipt', 'product': product.id, 'location': location.id, 'quantity': 5},
+            {'operation_type': 'expense', 'product': product.id, 'location': location.id, 'quantity': 6},
+            {'operation_type': 'receipt', 'product': 999999, 'location': location.id, 'quantity': 1},
+        ]
+
+        result = StockService.apply_batch(lines, atomic=True)
+
+        assert result['applied'] == 0
+        assert [error['line'] for error in result['errors']] == [1, 2]
+        assert StockOperations.objects.count() == 0
+        assert not Stock.objects.exists()
+
+        result = StockService.apply_batch(lines, atomic=False)
+
+        assert result['applied'] == 1
+        assert 'Доступно: 5' in result['errors'][0]['error']
+        assert StockService.get_current_stock(product, location) == 5
+
+    def test_apply_batch_merges_concurrently_created_stock(self):
+        category = Category.objects.create(name='Расходники')
+        location = Location.objects.create(name='Склад 1')
+        product = Product.objects.create(
+            name='Картридж',
+            category=category,
+            sku='CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+        inserted = []
+
+        def concurrent_insert(execute, sql, params, many, context):
+            # Строка остатка появляется после блокировки пакета, до записи остатков
+            if not inserted and sql.startswith(f'INSERT INTO "{StockOperations._meta.db_table}"'):
+                inserted.append(True)
+                Stock.objects.create(product=product, location=location, quantity=4)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(concurrent_insert):
+            result = StockService.apply_batch([
+                {'operation_type': 'receipt', 'product': product.id, 'location': location.id, 'quantity': 5},
+            ])
+
+        assert inserted
+        assert result['applied'] == 1
+        assert StockService.get_current_stock(product, location) == 9
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from apps.stock.services import StockService
 from apps.stock.models import Stock, StockOperations
@@ -9,7 +11,7 @@ from apps.references.models import Category, Location
 @pytest.mark.django_db
 class TestStockSignals:
 
-    def test_low_stock_signal(self, caplog):
+    def test_low_stock_signal(self, caplog, django_capture_on_commit_callbacks):
         """Проверка что при создании Stock с низким остатком логируется WARNING"""
         # Arrange - подготовка данных
         category = Category.objects.create(name='Расходники')
@@ -24,12 +26,13 @@ class TestStockSignals:
         )
 
         # Act - создаём Stock с количеством меньше минимума
-        with caplog.at_level('WARNING', logger='apps.stock.signals'):
-            Stock.objects.create(
-                product=product,
-                location=location,
-                quantity=5  # Меньше min_stock=10
-            )
+        with caplog.at_level('WARNING', logger='apps.stock.alerts'):
+            with django_capture_on_commit_callbacks(execute=True):
+                Stock.objects.create(
+                    product=product,
+                    location=location,
+                    quantity=5  # Меньше min_stock=10
+                )
 
         # Assert - проверяем что залогировано предупреждение
         assert len(caplog.records) == 1
@@ -40,7 +43,7 @@ class TestStockSignals:
         assert 'Остаток: 5' in caplog.text
         assert 'минимум: 10' in caplog.text
 
-    def test_no_warning_for_sufficient_stock(self, caplog):
+    def test_no_warning_for_sufficient_stock(self, caplog, django_capture_on_commit_callbacks):
         """Проверка что при достаточном остатке WARNING не логируется"""
         category = Category.objects.create(name='Расходники')
         location = Location.objects.create(name='Склад 1')
@@ -53,14 +56,117 @@ class TestStockSignals:
             min_stock=10
         )
 
-        with caplog.at_level('WARNING', logger='apps.stock.signals'):
-            Stock.objects.create(
-                product=product,
-                location=location,
-                quantity=15  # Больше min_stock=10
-            )
+        with caplog.at_level('WARNING', logger='apps.stock.alerts'):
+            with django_capture_on_commit_callbacks(execute=True):
+                Stock.objects.create(
+                    product=product,
+                    location=location,
+                    quantity=15  # Больше min_stock=10
+                )
 
         # Не должно быть WARNING
         assert len(caplog.records) == 0
 
 
+
+
+class CollectingNotifier:
+    events = []
+
+    def notify(self, items):
+        self.events.append(items)
+
+
+@pytest.mark.django_db
+class TestLowStockAlerts:
+
+    def setup_method(self):
+        CollectingNotifier.events = []
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Картридж HP',
+            category=self.category,
+            sku='HP-CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=10
+        )
+        self.other = Product.objects.create(
+            name='Бумага A4',
+            category=self.category,
+            sku='PAPER-A4-001',
+            is_consumable=True,
+            unit='пачка',
+            min_stock=10
+        )
+
+    @pytest.fixture(autouse=True)
+    def collecting_notifier(self, settings):
+        settings.STOCK_LOW_STOCK_NOTIFIERS = [f'{__name__}.CollectingNotifier']
+
+    def test_one_event_per_transaction(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.apply_batch([
+                {'operation_type': 'receipt', 'product': self.product.id,
+                 'location': self.location.id, 'quantity': 20},
+                {'operation_type': 'expense', 'product': self.product.id,
+                 'location': self.location.id, 'quantity': 15},
+                {'operation_type': 'receipt', 'product': self.other.id,
+                 'location': self.location.id, 'quantity': 3},
+            ])
+
+        assert len(CollectingNotifier.events) == 1
+        items = sorted(CollectingNotifier.events[0], key=lambda item: item.product_id)
+        assert [(item.product_name, item.quantity) for item in items] == [
+            ('Картридж HP', 5), ('Бумага A4', 3)
+        ]
+
+    def test_changes_deduplicated_within_transaction(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                Stock.objects.create(product=self.product, location=self.location, quantity=30)
+                StockService.create_expense(self.product, self.location, 15, '')
+                StockService.create_expense(self.product, self.location, 10, '')
+
+        assert len(CollectingNotifier.events) == 1
+        assert [item.quantity for item in CollectingNotifier.events[0]] == [5]
+
+    def test_rolled_back_changes_are_not_reported(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            Stock.objects.create(product=self.product, location=self.location, quantity=30)
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    StockService.create_expense(self.product, self.location, 25, '')
+                    raise RuntimeError
+            StockService.create_receipt(self.other, self.location, 20, '')
+
+        assert CollectingNotifier.events == []
+
+    def test_batch_rescheduled_after_flush_hook_rolled_back(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            Stock.objects.create(product=self.product, location=self.location, quantity=30)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            # Первое изменение (и колбэк пакета) - в откаченном savepoint'е
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    StockService.create_expense(self.product, self.location, 25, '')
+                    raise RuntimeError
+            StockService.create_receipt(self.other, self.location, 3, '')
+
+        assert len(CollectingNotifier.events) == 1
+        assert [(item.product_name, item.quantity) for item in CollectingNotifier.events[0]] == [
+            ('Бумага A4', 3)
+        ]
+
+    def test_expense_hot_path_adds_no_queries(self):
+        Stock.objects.create(product=self.product, location=self.location, quantity=30)
+
+        with CaptureQueriesContext(connection) as ctx:
+            StockService.create_expense(self.product, self.location, 25, '')
+
+        # UPDATE остатка, SELECT нового остатка, INSERT операции (+ SAVEPOINT/RELEASE)
+        statements = [query['sql'].split()[0] for query in ctx.captured_queries]
+        assert statements.count('SELECT') == 1
+        assert not any('"products"' in query['sql'] for query in ctx.captured_queries)
@@ -0,0 +1,74 @@
+import pytest
+from celery import current_app
+
+from apps.stock.tasks import check_low_stock
+from apps.stock.models import LowStockAlert, Stock
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+class CollectingNotifier:
+    events = []
+
+    def notify(self, items):
+        self.events.append(items)
+
+
+@pytest.mark.django_db
+class TestCheckLowStockTask:
+
+    @pytest.fixture(autouse=True)
+    def eager_celery(self, settings):
+        settings.STOCK_LOW_STOCK_NOTIFIERS = [f'{__name__}.CollectingNotifier']
+        CollectingNotifier.events = []
+        current_app.conf.task_always_eager = True
+        yield
+        current_app.conf.task_always_eager = False
+
+    def setup_method(self):
+        self.location1 = Location.objects.create(name='Склад 1')
+        self.location2 = Location.objects.create(name='Склад 2')
+        self.paper = Category.objects.create(name='Бумага')
+        self.cartridges = Category.objects.create(name='Картриджи')
+
+        def product(name, sku, category):
+            return Product.objects.create(
+                name=name, category=category, sku=sku,
+                is_consumable=True, unit='шт', min_stock=10
+            )
+
+        self.a4 = product('Бумага A4', 'PAPER-A4', self.paper)
+        self.a3 = product('Бумага A3', 'PAPER-A3', self.paper)
+        self.hp = product('Картридж HP', 'HP-CART', self.cartridges)
+
+    def test_groups_notifications_by_location_and_category(self):
+        Stock.objects.create(product=self.a4, location=self.location1, quantity=1)
+        Stock.objects.create(product=self.a3, location=self.location1, quantity=2)
+        Stock.objects.create(product=self.hp, location=self.location1, quantity=3)
+        Stock.objects.create(product=self.hp, location=self.location2, quantity=50)
+
+        result = check_low_stock(chunk_size=2)
+
+        assert result == {'low_stock': 3, 'notified': 3, 'groups': 2}
+        assert sorted(len(items) for items in CollectingNotifier.events) == [1, 2]
+        assert LowStockAlert.objects.count() == 3
+
+    def test_does_not_realert_unchanged_items(self):
+        stock = Stock.objects.create(product=self.a4, location=self.location1, quantity=1)
+        check_low_stock()
+
+        assert check_low_stock()['notified'] == 0
+
+        Stock.objects.filter(pk=stock.pk).update(quantity=0)
+        assert check_low_stock()['notified'] == 1
+
+    def test_recovered_items_reset_alert_state(self):
+        stock = Stock.objects.create(product=self.a4, location=self.location1, quantity=1)
+        check_low_stock()
+
+        Stock.objects.filter(pk=stock.pk).update(quantity=20)
+        check_low_stock()
+        assert not LowStockAlert.objects.exists()
+
+        Stock.objects.filter(pk=stock.pk).update(quantity=1)
+        assert check_low_stock()['notified'] == 1
@@ -0,0 +1,155 @@
+import os
+import time
+
+import pytest
+from celery import current_app
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from apps.stock.models import Stock, StockOperations
+from apps.products.models import Product
+from apps.references.models import Category, Location
+
+
+@pytest.mark.django_db
+class TestStockOperationView:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Картридж HP',
+            category=self.category,
+            sku='HP-CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=0
+        )
+
+    def test_bulk_best_effort_reports_line_errors(self):
+        data = {
+            'mode': 'best_effort',
+            'lines': [
+                {'operation_type': 'receipt', 'product': self.product.id,
+                 'location': self.location.id, 'quantity': 10},
+                {'operation_type': 'expense', 'product': self.product.id, 'quantity': 1},
+                {'operation_type': 'expense', 'product': self.product.id,
+                 'location': self.location.id, 'quantity': 4},
+            ]
+        }
+
+        response = self.client.post('/api/v1/stock-operation/bulk/', data, format='json')
+
+        assert response.status_code == 201
+        body = response.json()
+        assert body['applied'] == 2
+        assert [error['line'] for error in body['errors']] == [1]
+        assert Stock.objects.get(product=self.product, location=self.location).quantity == 6
+
+    def test_bulk_atomic_rejects_whole_batch(self):
+        data = {
+            'lines': [
+                {'operation_type': 'receipt', 'product': self.product.id,
+                 'location': self.location.id, 'quantity': 10},
+                {'operation_type': 'expense', 'product': self.product.id,
+                 'location': self.location.id, 'quantity': 11},
+            ]
+        }
+
+        response = self.client.post('/api/v1/stock-operation/bulk/', data, format='json')
+
+        assert response.status_code == 400
+        assert response.json()['errors'][0]['line'] == 1
+        assert StockOperations.objects.count() == 0
+
+
+@pytest.mark.django_db
+class TestStockReportView:
+
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        current_app.conf.task_always_eager = True
+        yield
+        current_app.conf.task_always_eager = False
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='pass')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Расходники')
+        self.location = Location.objects.create(name='Склад 1')
+        self.product = Product.objects.create(
+            name='Картридж HP',
+            category=self.category,
+            sku='HP-CART-001',
+            is_consumable=True,
+            unit='шт',
+            min_stock=5
+        )
+        Stock.objects.create(product=self.product, location=self.location, quantity=3)
+
+    def test_export_streams_csv(self):
+        response = self.client.get('/api/v1/stock/export/', {'low_only': 'true'})
+
+        assert response.status_code == 200
+        assert response.streaming
+        content = b''.join(response.streaming_content)
+        assert content.startswith(b'\xef\xbb\xbf')
+        lines = content.decode('utf-8-sig').splitlines()
+        assert lines[0].startswith('SKU,Продукт,Категория,Локация,Остаток')
+        assert lines[1].startswith('HP-CART-001,Картридж HP,Расходники,Склад 1,3,шт,5,')
+
+    def test_export_rejects_invalid_filters(self):
+        response = self.client.get('/api/v1/stock/export/', {'product': 'abc'})
+        assert response.status_code == 400
+
+        response = self.client.post(
+            '/api/v1/stock/reports/', {'file_format': 'csv', 'location': 'x'}, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_export_rejects_large_selection(self, settings):
+        settings.STOCK_REPORT_SYNC_LIMIT = 0
+
+        response = self.client.get('/api/v1/stock/export/')
+
+        assert response.status_code == 400
+
+    def test_generate_and_download_report(self):
+        response = self.client.post('/api/v1/stock/reports/', {'file_format': 'csv'}, format='json')
+        assert response.status_code == 202
+
+        reports = self.client.get('/api/v1/stock/reports/').json()
+        assert len(reports) == 1
+
+        response = self.client.get(f"/api/v1/stock/reports/{reports[0]['name']}/")
+        assert response.status_code == 200
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        assert 'HP-CART-001' in content
+
+    def test_old_reports_are_removed(self, settings, tmp_path):
+        settings.STOCK_REPORT_MAX_AGE_DAYS = 30
+        directory = tmp_path / 'reports' / 'stock'
+        directory.mkdir(parents=True)
+        old = directory / 'stock_20200101_070000_000000.csv'
+        old.write_text('old')
+        month_ago = time.time() - 31 * 86400
+        os.utime(old, (month_ago, month_ago))
+        (directory / 'notes.txt').write_text('не отчет')
+
+        self.client.post('/api/v1/stock/reports/', {'file_format': 'csv'}, format='json')
+
+        assert not old.exists()
+        assert (directory / 'notes.txt').exists()
+        assert len(self.client.get('/api/v1/stock/reports/').json()) == 1
+
+    def test_download_rejects_path_traversal(self, tmp_path):
+        (tmp_path / 'secret.csv').write_text('secret')
+
+        response = self.client.get('/api/v1/stock/reports/..%2Fsecret.csv/')
+
+        assert response.status_code == 404
@@ -0,0 +1,125 @@
+from datetime import date
+
+import pytest
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+
+from apps.assets.models import Asset
+from apps.products.models import Product
+from apps.references.models import Category, Location
+from apps.stock.models import Stock
+from apps.writeoffs.models import WriteOff, WriteOffRollup, WriteOffRollupState
+from apps.writeoffs.rollups import WriteOffRollupService, period_bounds
+from apps.writeoffs.services import WriteOffService
+
+
+class TestPeriodBounds:
+
+    def test_quarter(self):
+        assert period_bounds('quarter', date(2024, 5, 17)) == (date(2024, 4, 1), date(2024, 7, 1))
+
+    def test_year_end_month(self):
+        assert period_bounds('month', date(2024, 12, 31)) == (date(2024, 12, 1), date(2025, 1, 1))
+
+
+@pytest.mark.django_db
+class TestWriteOffRollups:
+
+    def setup_method(self):
+        self.location = Location.objects.create(name='Склад 1')
+        self.supplies = Category.objects.create(name='Расходники')
+        self.laptops = Category.objects.create(name='Ноутбуки')
+        self.paper = Product.objects.create(
+            name='Бумага A4', category=self.supplies, sku='PAPER-A4',
+            is_consumable=True, unit='шт', min_stock=0
+        )
+        self.laptop = Product.objects.create(
+            name='Ноутбук Dell', category=self.laptops, sku='DELL-001',
+            is_consumable=False, unit='шт', min_stock=0
+        )
+        Stock.objects.create(product=self.paper, location=self.location, quantity=100)
+
+    def write_off_asset(self, number):
+        asset = Asset.objects.create(
+            product=self.laptop, inventory_number=number,
+            current_location=self.location
+        )
+        return WriteOffService.create_writeoff_asset(asset, reason='Сломан')
+
+    def test_update_is_incremental(self):
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 5)
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 7)
+        self.write_off_asset('INV-001')
+
+        assert WriteOffRollupService.update() == 3
+        assert WriteOffRollupService.update() == 0
+
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 3)
+        assert WriteOffRollupService.update() == 1
+
+        consumable = WriteOffRollup.objects.get(kind=WriteOffRollup.KIND_CONSUMABLE)
+        assert (consumable.quantity, consumable.writeoff_count) == (15, 3)
+        asset = WriteOffRollup.objects.get(kind=WriteOffRollup.KIND_ASSET)
+        assert (asset.category_id, asset.quantity) == (self.laptops.id, 1)
+
+    def test_summary_includes_unfolded_tail(self):
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 5)
+        WriteOffRollupService.update()
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 2)
+
+        start, end = period_bounds('year', WriteOff.objects.first().date.date())
+        results = WriteOffRollupService.summary(start, end, group_by='category')
+
+        assert results == [{
+            'category': self.supplies.id, 'category_name': 'Расходники',
+            'kind': 'consumable', 'quantity': 7, 'writeoff_count': 2,
+        }]
+
+    def test_rebuild_month_matches_incremental(self):
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 5)
+        self.write_off_asset('INV-001')
+        WriteOffRollupService.update()
+        before = list(WriteOffRollup.objects.order_by('kind').values_list('kind', 'quantity'))
+
+        WriteOffRollupService.rebuild(WriteOff.objects.first().date.date())
+
+        assert list(WriteOffRollup.objects.order_by('kind').values_list('kind', 'quantity')) == before
+        assert WriteOffRollupService.update() == 0
+
+    def test_high_water_mark_is_stored_in_state_row(self):
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 5)
+        self.write_off_asset('INV-001')
+        WriteOffRollupService.update()
+        last_id = WriteOff.objects.order_by('-id').values_list('id', flat=True).first()
+
+        assert WriteOffRollupState.objects.get().last_writeoff_id == last_id
+
+        # Пересчет месяца без списаний не сдвигает high-water mark назад
+        WriteOffRollupService.rebuild(date(2000, 1, 1))
+        WriteOffRollup.objects.all().delete()
+        assert WriteOffRollupService.get_high_water_mark() == last_id
+        assert WriteOffRollupService.update() == 0
+
+        WriteOffRollupService.rebuild()
+        assert WriteOffRollupService.update() == 0
+        assert WriteOffRollup.objects.get(kind=WriteOffRollup.KIND_CONSUMABLE).quantity == 5
+
+    def test_summary_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='testuser', password='pass'))
+        WriteOffService.create_writeoff_consumable(self.paper, self.location, 5)
+
+        response = client.get('/api/v1/writeoffs/summary/', {'period': 'quarter', 'group_by': 'kind'})
+
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'kind': 'consumable', 'quantity': 5, 'writeoff_count': 1}
+        ]
+
+    def test_summary_endpoint_rejects_unknown_period(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='testuser', password='pass'))
+
+        response = client.get('/api/v1/writeoffs/summary/', {'period': 'week'})
+
+        assert response.status_code == 400